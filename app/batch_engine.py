@@ -0,0 +1,259 @@
+"""
+Vectorized batch engine: N independent registers of the same width, clocked
+in lockstep with NumPy.
+
+State is a (N, words) uint64 matrix, words = ceil(num_bits / 64). Bit i of a
+row holds Q(i+1), exactly like the packed integer in register_engine.py, so
+word 0 holds Q1..Q64. Serial inputs are given as a cycles x N matrix of 0/1
+values; up to 63 cycles are packed per register and applied with a single
+multi-word shift, so the per-cycle cost is a handful of array operations
+shared by the whole fleet.
+"""
+import numpy as np
+
+from register_engine import state_to_list
+
+WORD_BITS = 64
+MAX_CHUNK = WORD_BITS - 1  # NumPy shifts by >= 64 are undefined, so chunks stay below a word
+INPUT_SLAB_BYTES = 8 << 20  # Packed input chunks per slab; step()'s temporaries stay within about three times this
+
+
+def _as_bit_matrix(values, rows, cols, name):
+    matrix = np.asarray(values, dtype=np.uint8)
+    if matrix.shape != (rows, cols):
+        raise ValueError(f"{name} must have shape ({rows}, {cols}), got {matrix.shape}")
+    return matrix
+
+
+# --- 1. ABSTRACT BATCH ENGINE ---
+class BatchEngine:
+    """
+    Base class holding the packed state of the whole fleet.
+    Children implement step(), the multi-cycle clock.
+    """
+    kind = None
+
+    def __init__(self, num_registers, num_bits=4):
+        if num_registers < 1 or num_bits < 1:
+            raise ValueError("num_registers and num_bits must be at least 1")
+        self.num_registers = num_registers
+        self.num_bits = num_bits
+        self.words = -(-num_bits // WORD_BITS)
+        top_bits = num_bits - WORD_BITS * (self.words - 1)
+        self.top_mask = np.uint64((1 << top_bits) - 1)
+        self.state = np.zeros((num_registers, self.words), dtype=np.uint64)
+        self.serial_in = np.zeros(num_registers, dtype=np.uint8)
+        self.cycle = 0
+
+    def reset(self):
+        self.state[:] = 0
+        self.cycle = 0
+
+    # --- Conversions between 0/1 matrices and packed words ---
+    def pack(self, bits):
+        """Packs an (N, num_bits) 0/1 matrix ([Q1, Q2, ...] per row) into an (N, words) uint64 matrix."""
+        bits = _as_bit_matrix(bits, self.num_registers, self.num_bits, "bits")
+        padded = np.zeros((self.num_registers, self.words * WORD_BITS), dtype=np.uint8)
+        padded[:, :self.num_bits] = bits
+        packed = np.packbits(padded, axis=1, bitorder="little")
+        return packed.view("<u8").astype(np.uint64)
+
+    def unpack(self, words):
+        """Inverse of pack()."""
+        as_bytes = np.ascontiguousarray(words.astype("<u8")).view(np.uint8)
+        return np.unpackbits(as_bytes, axis=1, bitorder="little")[:, :self.num_bits]
+
+    @property
+    def bits(self):
+        """The fleet as an (N, num_bits) 0/1 matrix, one [Q1, Q2, ...] row per register."""
+        return self.unpack(self.state)
+
+    @bits.setter
+    def bits(self, values):
+        self.state = self.pack(values)
+
+    def register_state(self, index):
+        """Returns one register as a packed Python int, compatible with register_engine."""
+        value = 0
+        for w in reversed(range(self.words)):
+            value = (value << WORD_BITS) | int(self.state[index, w])
+        return value
+
+    def register_bits(self, index):
+        return state_to_list(self.register_state(index), self.num_bits)
+
+    @property
+    def serial_out(self):
+        """Qn of every register as a length-N uint8 array."""
+        top = self.num_bits - 1
+        word = self.state[:, top // WORD_BITS]
+        return ((word >> np.uint64(top % WORD_BITS)) & np.uint64(1)).astype(np.uint8)
+
+    # --- Vectorized shifting ---
+    def _extract(self, lo, k):
+        """Returns bits lo..lo+k-1 of every register as a uint64 array (k <= 63)."""
+        w, off = divmod(lo, WORD_BITS)
+        value = self.state[:, w] >> np.uint64(off)
+        if off + k > WORD_BITS and w + 1 < self.words:
+            value = value | (self.state[:, w + 1] << np.uint64(WORD_BITS - off))
+        return value & np.uint64((1 << k) - 1)
+
+    def _shift(self, k, chunk):
+        """Shifts k (< 64) packed input bits per register in at Q1, all registers at once."""
+        shift = np.uint64(k)
+        if self.words > 1:
+            carry = self.state[:, :-1] >> np.uint64(WORD_BITS - k)
+            self.state[:, 1:] = (self.state[:, 1:] << shift) | carry
+        self.state[:, 0] = (self.state[:, 0] << shift) | chunk
+        self.state[:, -1] &= self.top_mask
+
+    def _chunk_size(self, collect_output):
+        # The bits leaving Qn can only be read back before the shift when they are all still inside the register
+        return min(MAX_CHUNK, self.num_bits) if collect_output else MAX_CHUNK
+
+    def _pack_inputs(self, inputs, k):
+        """
+        Packs a cycles x N input slab into (ceil(cycles / k), N) chunks of k bits,
+        first cycle as MSB, padding a short last chunk with zeros at the bottom.
+        """
+        n = inputs.shape[0]
+        chunks = np.zeros((-(-n // k), self.num_registers), dtype=np.uint64)
+        # One bit position at a time, so only one chunk-sized uint64 temporary exists besides the result
+        for j in range(min(k, n)):
+            bits = (inputs[j::k] & 1).astype(np.uint64)
+            bits <<= np.uint64(k - 1 - j)
+            chunks[:len(bits)] |= bits
+        return chunks
+
+    def _input_chunks(self, n, inputs, k):
+        """Yields (size, chunk) pairs covering n cycles, packing the input matrix one slab at a time."""
+        if inputs is None:
+            # Constant serial_in: every chunk is all zeros or all ones per register
+            fill = self.serial_in.astype(bool)
+            for done in range(0, n, k):
+                size = min(k, n - done)
+                yield size, np.where(fill, np.uint64((1 << size) - 1), np.uint64(0))
+            return
+        inputs = np.asarray(inputs, dtype=np.uint8)
+        if inputs.shape != (n, self.num_registers):
+            raise ValueError(f"inputs must have shape ({n}, {self.num_registers}), got {inputs.shape}")
+        slab = k * max(1, INPUT_SLAB_BYTES // (8 * self.num_registers))
+        for start in range(0, n, slab):
+            part = inputs[start:start + slab]
+            remaining = part.shape[0]
+            for chunk in self._pack_inputs(part, k):
+                size = min(k, remaining)
+                yield size, (chunk >> np.uint64(k - size) if size < k else chunk)
+                remaining -= size
+
+    def _shift_cycles(self, n, inputs, collect_output):
+        """Shifts n cycles of inputs through every register; returns an n x N serial-out matrix or None."""
+        outputs = np.empty((n, self.num_registers), dtype=np.uint8) if collect_output else None
+        done = 0
+        for size, chunk in self._input_chunks(n, inputs, self._chunk_size(collect_output)):
+            if collect_output:
+                leaving = self._extract(self.num_bits - size, size)
+                shifts = np.arange(size - 1, -1, -1, dtype=np.uint64)[:, None]
+                outputs[done:done + size] = (leaving[None, :] >> shifts) & np.uint64(1)
+            self._shift(size, chunk)
+            done += size
+        self.cycle += n
+        return outputs
+
+    def step(self, n=1, inputs=None, collect_output=False):
+        raise NotImplementedError("Subclass must implement step")
+
+
+# --- 2. SERIAL IN (SISO / SIPO) ---
+class SISO_BatchEngine(BatchEngine):
+    """
+    Every register shifts its own serial input stream in at Q1.
+    inputs is a cycles x N 0/1 matrix; without it each register shifts serial_in.
+    """
+    kind = "SISO"
+
+    def step(self, n=1, inputs=None, collect_output=False):
+        """Advances n cycles. With collect_output, returns the n x N matrix of bits leaving Qn."""
+        if n <= 0:
+            return np.empty((0, self.num_registers), dtype=np.uint8) if collect_output else None
+        return self._shift_cycles(n, inputs, collect_output)
+
+
+class SIPO_BatchEngine(SISO_BatchEngine):
+    kind = "SIPO"
+
+
+# --- 3. PARALLEL IN, SERIAL OUT (PISO) ---
+class PISO_BatchEngine(BatchEngine):
+    """
+    Same semantics as PISO_Register.clock_pulse: registers flagged in
+    `loading` take parallel_in on the next clock and switch to shifting;
+    the rest shift their serial input.
+    """
+    kind = "PISO"
+
+    def __init__(self, num_registers, num_bits=4):
+        super().__init__(num_registers, num_bits)
+        self.parallel_in = np.zeros((num_registers, self.words), dtype=np.uint64)
+        self.loading = np.ones(num_registers, dtype=bool)
+
+    def reset(self):
+        super().reset()
+        self.loading[:] = True
+
+    def set_parallel_bits(self, bits):
+        self.parallel_in = self.pack(bits)
+
+    def step(self, n=1, inputs=None, collect_output=False):
+        if n <= 0:
+            return np.empty((0, self.num_registers), dtype=np.uint8) if collect_output else None
+        if not self.loading.any():
+            return self._shift_cycles(n, inputs, collect_output)
+        # First cycle: loaders load, everybody else shifts its first input bit
+        first = None if inputs is None else np.asarray(inputs)[:1]
+        loaders = self.loading.copy()
+        head = self._shift_cycles(1, first, collect_output)
+        self.state[loaders] = self.parallel_in[loaders]
+        self.loading[:] = False
+        if collect_output:
+            head[0, loaders] = 0
+        if n == 1:
+            return head
+        rest = None if inputs is None else np.asarray(inputs)[1:]
+        tail = self._shift_cycles(n - 1, rest, collect_output)
+        return np.concatenate([head, tail]) if collect_output else None
+
+
+# --- 4. PARALLEL IN, PARALLEL OUT (PIPO) ---
+class PIPO_BatchEngine(BatchEngine):
+    """Every clock copies parallel_in into every register."""
+    kind = "PIPO"
+
+    def __init__(self, num_registers, num_bits=4):
+        super().__init__(num_registers, num_bits)
+        self.parallel_in = np.zeros((num_registers, self.words), dtype=np.uint64)
+
+    def set_parallel_bits(self, bits):
+        self.parallel_in = self.pack(bits)
+
+    def step(self, n=1, inputs=None, collect_output=False):
+        if n > 0:
+            self.state[:] = self.parallel_in
+            self.cycle += n
+        return np.zeros((max(n, 0), self.num_registers), dtype=np.uint8) if collect_output else None
+
+
+BATCH_ENGINE_TYPES = {
+    "SISO": SISO_BatchEngine,
+    "SIPO": SIPO_BatchEngine,
+    "PISO": PISO_BatchEngine,
+    "PIPO": PIPO_BatchEngine,
+}
+
+
+def create_batch_engine(kind, num_registers, num_bits=4):
+    """Builds a batch engine from its short type name ('SISO', 'SIPO', 'PISO' or 'PIPO')."""
+    try:
+        return BATCH_ENGINE_TYPES[kind.upper()](num_registers, num_bits)
+    except KeyError:
+        raise ValueError(f"Unknown register type: {kind!r}") from None
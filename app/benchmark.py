@@ -0,0 +1,347 @@
+"""
+Benchmarks for the engines and the register windows.
+
+    python app/benchmark.py run --suite quick -o results.json
+    python app/benchmark.py run --suite full --backend xvfb --baseline baseline.json
+    python app/benchmark.py compare baseline.json results.json --tolerance 0.15
+
+Engine scenarios time RegisterEngine.step() for every register type, both
+in bulk (cycles/s over up to 10^8 cycles) and one cycle per call, at widths
+from 4 bits to 1M. GUI scenarios open a register window and time
+recording its diagram (draw_diagram() with no template cached), replaying
+the cached template into a window, window construction, clock_pulse() with
+its repaint, and update_display() on its own. They run on fake_tk (no display needed), a
+private Xvfb server, or the current display (--backend tk).
+
+The startup scenario times a fresh interpreter from launch to the first
+painted window (and the GUI imports within it), and the mean time to open
+one more window while many are already open side by side.
+
+Every metric is the best of --repeat runs and records whether higher or
+lower is better; `compare` flags metrics that got worse than the baseline
+by more than the tolerance and exits with status 1.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+from bit_stream import GeneratorBitSource
+from register_engine import create_engine
+
+KINDS = ("SISO", "SIPO", "PISO", "PIPO")
+BULK_BATCH = 1 << 16        # Cycles per step() call in bulk scenarios
+SUITES = {
+    # engine widths, bulk cycles, GUI widths, clock pulses per GUI scenario
+    # and windows opened side by side by the startup scenario
+    "quick": {"widths": (4, 1024, 1 << 16), "cycles": 10 ** 6, "gui_widths": (4, 1024), "pulses": 500,
+              "windows": 20},
+    "full": {"widths": (4, 64, 1024, 1 << 16, 1 << 20), "cycles": 10 ** 8,
+             "gui_widths": (4, 1024, 1 << 20), "pulses": 5000, "windows": 100},
+}
+# Fresh interpreter: imports the GUI, opens the menu and a SISO window, and paints the first frame
+STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {app_dir!r})
+if {fake!r}:
+    import fake_tk
+    fake_tk.install()
+import tkinter as tk
+import shift_register_gui as gui
+imported = time.perf_counter()
+root = tk.Tk()
+gui.MainMenu(root).open_simulation(gui.SISO_Register)
+root.update()
+print(imported - start, flush=True)
+"""
+
+
+def metric(value, unit, better):
+    return {"value": value, "unit": unit, "better": better}
+
+
+def best_of(repeat, run):
+    """Seconds of the fastest of `repeat` runs of run()."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+# --- 1. ENGINE SCENARIOS ---
+def bench_engine(kind, width, cycles, repeat):
+    engine = create_engine(kind, width)
+    engine.serial_in = 1
+    if hasattr(engine, "parallel_in"):
+        engine.parallel_in = engine.mask // 3   # 0101... so loads move bits
+
+    batches, rest = divmod(cycles, BULK_BATCH)
+
+    def bulk():
+        for _ in range(batches):
+            engine.step(BULK_BATCH)
+        engine.step(rest)
+
+    single_cycles = max(1000, min(10 ** 6, 10 ** 9 // width, cycles))
+
+    def single():
+        step = engine.step
+        for _ in range(single_cycles):
+            step(1)
+
+    return {
+        "bulk_cycles_per_s": metric(cycles / best_of(repeat, bulk), "cycles/s", "higher"),
+        "single_steps_per_s": metric(single_cycles / best_of(repeat, single), "steps/s", "higher"),
+    }
+
+
+# --- 2. GUI SCENARIOS ---
+def start_xvfb():
+    """Starts a private Xvfb server and points DISPLAY at it; the server dies with this process."""
+    if not shutil.which("Xvfb"):
+        raise SystemExit("Xvfb is not installed; use --backend fake")
+    for number in range(99, 199):
+        if not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+            break
+    server = subprocess.Popen(["Xvfb", f":{number}", "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+        if server.poll() is not None or time.monotonic() > deadline:
+            raise SystemExit("Xvfb did not start")
+        time.sleep(0.05)
+    os.environ["DISPLAY"] = f":{number}"
+    import atexit
+    atexit.register(server.terminate)
+
+
+def load_gui(backend):
+    """Imports the GUI on the chosen backend; returns (tkinter module, root window, gui module)."""
+    if backend == "fake":
+        import fake_tk
+        fake_tk.install()
+    elif backend == "xvfb":
+        start_xvfb()
+    import tkinter as tk
+    import shift_register_gui as gui
+    root = tk.Tk()
+    if backend != "fake":
+        root.withdraw()
+    return tk, root, gui
+
+
+def _timed_class(cls, timings):
+    """Subclass of a register window whose create_diagram() appends its duration to timings."""
+    def create_diagram(self):
+        start = time.perf_counter()
+        count = cls.create_diagram(self)
+        timings.append(time.perf_counter() - start)
+        return count
+    return type(cls.__name__, (cls,), {"create_diagram": create_diagram})
+
+
+def stimulus(view, kind):
+    """Drives a window's inputs so every clock flips every visible Q; returns the per-pulse input change."""
+    engine = view.engine
+    if kind in ("SISO", "SIPO"):
+        view.set_input_source(GeneratorBitSource(itertools.cycle("10")))
+        return lambda: None
+    if kind == "PISO":
+        engine.load_shift_mode = "Shift"  # So the toggling serial input reaches Q1 on every clock
+        view.sync_controls()
+        var = view.serial_in_var
+        return lambda: var.set("1" if var.get() == "0" else "0")
+
+    def flip():
+        engine.parallel_in ^= engine.mask
+    return flip
+
+
+def bench_gui(tk, root, gui, kind, width, pulses, repeat):
+    classes = {"SISO": gui.SISO_Register, "SIPO": gui.SIPO_Register,
+               "PISO": gui.PISO_Register, "PIPO": gui.PIPO_Register}
+    replay_times, open_times = [], []
+    cls = _timed_class(classes[kind], replay_times)
+    view = None
+    for _ in range(repeat):
+        if view is not None:
+            view.master.destroy()
+        start = time.perf_counter()
+        view = cls(tk.Toplevel(root), width)
+        root.update_idletasks()   # First repaint
+        open_times.append(time.perf_counter() - start)
+
+    # What the first window of a layout pays: draw_diagram() itself, bypassing the template cache
+    layout = (classes[kind], view.visible_bits, view.num_bits > view.visible_bits)
+    record_time = best_of(repeat, lambda: gui.diagram_template.__wrapped__(*layout))
+
+    change_inputs = stimulus(view, kind)
+    root.update_idletasks()
+    canvas = view.canvas
+    created = getattr(canvas, "created", None)
+    configured = getattr(canvas, "configured", None)
+
+    def pulse_loop():
+        for _ in range(pulses):
+            change_inputs()
+            view.clock_pulse()
+            root.update_idletasks()
+
+    pulse_time = best_of(repeat, pulse_loop)
+    latencies = []
+    for _ in range(pulses):
+        change_inputs()
+        view.advance(1)
+        start = time.perf_counter()
+        view.update_display()
+        root.update_idletasks()
+        latencies.append(time.perf_counter() - start)
+    results = {
+        "open_ms": metric(1000 * min(open_times), "ms", "lower"),
+        "diagram_record_ms": metric(1000 * record_time, "ms", "lower"),
+        "diagram_replay_ms": metric(1000 * min(replay_times), "ms", "lower"),
+        "clock_pulse_per_s": metric(pulses / pulse_time, "pulses/s", "higher"),
+        "update_display_ms": metric(1000 * statistics.median(latencies), "ms", "lower"),
+    }
+    if created is not None:  # fake_tk counts canvas work
+        runs = pulses * (repeat + 1)
+        results["items_created_per_pulse"] = metric((canvas.created - created) / runs, "items", "lower")
+        results["items_configured_per_pulse"] = metric((canvas.configured - configured) / runs, "items", "lower")
+    view.master.destroy()
+    return results
+
+
+# --- 3. STARTUP SCENARIO ---
+def bench_startup(tk, root, gui, backend, windows, repeat):
+    script = STARTUP_SCRIPT.format(app_dir=os.path.dirname(os.path.abspath(__file__)), fake=backend == "fake")
+    cold, imports = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+        cold.append(time.perf_counter() - start)
+        imports.append(float(output))
+
+    classes = (gui.SISO_Register, gui.SIPO_Register, gui.PISO_Register, gui.PIPO_Register)
+    views = []
+    start = time.perf_counter()
+    for k in range(windows):
+        views.append(classes[k % len(classes)](tk.Toplevel(root), 4))
+        root.update_idletasks()
+    open_time = (time.perf_counter() - start) / windows
+    for view in views:
+        view.master.destroy()
+    return {
+        "cold_start_ms": metric(1000 * min(cold), "ms", "lower"),
+        "import_ms": metric(1000 * min(imports), "ms", "lower"),
+        "window_open_ms": metric(1000 * open_time, "ms", "lower"),
+    }
+
+
+# --- 4. RUNNING AND COMPARING ---
+def run_suite(suite, backend, repeat, select=None, gui=True):
+    config = SUITES[suite]
+    scenarios = {}
+    wanted = (lambda name: select in name) if select else (lambda name: True)
+    for kind in KINDS:
+        for width in config["widths"]:
+            name = f"engine/{kind}/w{width}"
+            if wanted(name):
+                scenarios[name] = bench_engine(kind, width, config["cycles"], repeat)
+                report(name, scenarios[name])
+    if gui:
+        names = [(kind, width, f"gui/{kind}/w{width}") for kind in KINDS for width in config["gui_widths"]]
+        names = [n for n in names if wanted(n[2])]
+        startup = wanted("gui/startup")
+        if names or startup:
+            tk, root, gui_module = load_gui(backend)
+            if startup:
+                scenarios["gui/startup"] = bench_startup(tk, root, gui_module, backend, config["windows"], repeat)
+                report("gui/startup", scenarios["gui/startup"])
+            for kind, width, name in names:
+                scenarios[name] = bench_gui(tk, root, gui_module, kind, width, config["pulses"], repeat)
+                report(name, scenarios[name])
+    return {
+        "meta": {
+            "suite": suite,
+            "backend": backend if gui else None,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "scenarios": scenarios,
+    }
+
+
+def report(name, metrics):
+    for key, m in metrics.items():
+        print(f"{name:<28} {key:<28} {m['value']:>14,.3f} {m['unit']}")
+    sys.stdout.flush()
+
+
+def compare(baseline, current, tolerance):
+    """Prints metric changes; returns the list of regressions beyond tolerance."""
+    regressions = []
+    for name, metrics in current["scenarios"].items():
+        for key, m in metrics.items():
+            base = baseline["scenarios"].get(name, {}).get(key)
+            if base is None or not base["value"]:
+                continue
+            ratio = m["value"] / base["value"]
+            worse = ratio < 1 - tolerance if m["better"] == "higher" else ratio > 1 + tolerance
+            flag = "REGRESSION" if worse else ""
+            print(f"{name:<28} {key:<28} {base['value']:>14,.3f} -> {m['value']:>14,.3f} ({ratio - 1:+.1%}) {flag}")
+            if worse:
+                regressions.append((name, key, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shift register simulator benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run a benchmark suite")
+    run.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    run.add_argument("--backend", choices=("fake", "xvfb", "tk"), default="fake",
+                     help="GUI backend: fake_tk, a private Xvfb server, or the current display")
+    run.add_argument("--no-gui", action="store_true", help="only run the engine scenarios")
+    run.add_argument("-k", dest="select", help="only scenarios whose name contains this text")
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("-o", "--output", help="write the results as JSON")
+    run.add_argument("--baseline", help="compare against a saved results file")
+    run.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown before a regression is flagged")
+    cmp = commands.add_parser("compare", help="compare two results files")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_suite(args.suite, args.backend, args.repeat, args.select, gui=not args.no_gui)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+        if not args.baseline:
+            return 0
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            results = json.load(f)
+    regressions = compare(baseline, results, args.tolerance)
+    print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Streaming serial input sources.
+
+Every source hands out bits through a bounded read-ahead block of ASCII
+'0'/'1' bytes, so read(n) costs O(n) whatever the stream length and memory
+stays constant. Files are memory-mapped and decoded one block at a time,
+which lets multi-gigabyte serial test streams feed SISO/SIPO engines.
+
+Sources plug into register_engine through `engine.input_source`.
+"""
+import itertools
+import mmap
+
+READ_AHEAD_BITS = 1 << 16   # Bits decoded ahead of the reader
+SNIFF_BYTES = 4096          # Bytes inspected by open_bit_source to tell ASCII from binary
+_WHITESPACE = b" \t\r\n"
+
+
+# --- 1. ABSTRACT SOURCE ---
+class BitSource:
+    """
+    Base class: children implement _next_block(), returning the next block of
+    ASCII '0'/'1' bytes (empty at the end of the stream). Streams only move
+    forward; history.py rewinds them by wrapping them in a PrefixedBitSource.
+    """
+
+    def __init__(self):
+        self.block = b""
+        self.index = 0       # Next unread bit inside block
+        self.position = 0    # Bits consumed since the start of the stream
+
+    def _next_block(self):
+        raise NotImplementedError("Subclass must implement _next_block")
+
+    def _fill(self):
+        """Loads the next block once the current one is used up; False at end of stream."""
+        if self.index < len(self.block):
+            return True
+        self.block = self._next_block()
+        self.index = 0
+        return bool(self.block)
+
+    def read(self, n):
+        """
+        Consumes up to n bits. Returns (value, count): count bits packed with the
+        first bit as MSB, count < n only at the end of the stream.
+        """
+        pieces = []
+        count = 0
+        while count < n and self._fill():
+            piece = self.block[self.index:self.index + n - count]
+            self.index += len(piece)
+            count += len(piece)
+            pieces.append(piece)
+        self.position += count
+        if not count:
+            return 0, 0
+        return int(b"".join(pieces), 2), count
+
+    def peek(self):
+        """Next bit without consuming it, or None at the end of the stream."""
+        if not self._fill():
+            return None
+        return self.block[self.index] - 48
+
+    def close(self):
+        pass
+
+
+# --- 2. IN-MEMORY AND GENERATOR SOURCES ---
+class StringBitSource(BitSource):
+    """Bits from a '0'/'1' string, e.g. the SISO serial input entry."""
+
+    def __init__(self, text):
+        super().__init__()
+        data = text.encode("ascii") if isinstance(text, str) else bytes(text)
+        data = data.translate(None, _WHITESPACE)
+        if data.strip(b"01"):
+            raise ValueError("Input must contain only 0s and 1s.")
+        self.block = data
+
+    def _next_block(self):
+        return b""
+
+
+class GeneratorBitSource(BitSource):
+    """Bits pulled from any iterable of 0/1 values or '0'/'1' characters, READ_AHEAD_BITS at a time."""
+
+    def __init__(self, iterable):
+        super().__init__()
+        self.iterator = iter(iterable)
+
+    def _next_block(self):
+        chunk = bytes(48 + (int(b) & 1) for b in itertools.islice(self.iterator, READ_AHEAD_BITS))
+        return chunk
+
+
+class PrefixedBitSource(BitSource):
+    """
+    Replays `count` already-consumed bits (packed, first bit as MSB) and then
+    continues with source; history.py uses it to rewind the input cursor.
+    """
+
+    def __init__(self, prefix, count, source):
+        super().__init__()
+        self.source = source
+        self.block = format(prefix, f"0{count}b").encode("ascii") if count else b""
+        self.position = source.position - count
+
+    def _next_block(self):
+        if not self.source._fill():
+            return b""
+        block = self.source.block[self.source.index:]
+        self.source.index = len(self.source.block)
+        self.source.position += len(block)
+        return block
+
+    def close(self):
+        self.source.close()
+
+
+# --- 3. MEMORY-MAPPED FILE SOURCES ---
+class _MappedFileSource(BitSource):
+    """Shared mmap handling; an empty file is an empty stream."""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty files cannot be mapped
+            self.map = b""
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+
+class AsciiFileBitSource(_MappedFileSource):
+    """
+    '0'/'1' text files; whitespace and newlines are skipped.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.offset = 0  # File offset of the next undecoded byte
+
+    def _next_block(self):
+        while self.offset < len(self.map):
+            raw = self.map[self.offset:self.offset + READ_AHEAD_BITS]
+            block = raw.translate(None, _WHITESPACE)
+            bad = block.translate(None, b"01")
+            if bad:
+                at = self.offset + raw.index(bad[:1])
+                raise ValueError(f"{self.path}: expected only 0s, 1s and whitespace, found {bad[:1]!r} at byte {at}")
+            self.offset += len(raw)
+            if block:
+                return block
+        return b""
+
+
+class BinaryFileBitSource(_MappedFileSource):
+    """Packed binary files, 8 bits per byte, most significant bit first."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.offset = 0  # File offset of the next undecoded byte
+
+    def _next_block(self):
+        raw = self.map[self.offset:self.offset + READ_AHEAD_BITS // 8]
+        self.offset += len(raw)
+        if not raw:
+            return b""
+        return format(int.from_bytes(raw, "big"), f"0{8 * len(raw)}b").encode("ascii")
+
+
+def open_bit_source(path):
+    """Opens a bitstream file, sniffing its first bytes to pick ASCII '0'/'1' or packed binary."""
+    with open(path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+    if head and not head.translate(None, _WHITESPACE).strip(b"01"):
+        return AsciiFileBitSource(path)
+    return BinaryFileBitSource(path)
@@ -0,0 +1,582 @@
+"""
+Local control server for scripting many simulations at once.
+
+    python app/control_server.py --port 8765          # TCP on 127.0.0.1 (0 picks a free port)
+    python app/control_server.py --unix /tmp/sr.sock  # Unix socket
+    python app/control_server.py --gui               # also allow live viewer windows
+
+One asyncio loop serves every client and registers are headless engines, so
+hundreds of connections cost a socket each rather than a thread. The protocol
+is JSON lines: a request is an object on one line and gets one reply line, in
+order. A line holding a JSON list is a batch and gets one list of replies.
+Clients may pipeline, sending many lines before reading any replies.
+
+    > {"id": 1, "op": "create", "type": "SISO", "width": 8}
+    < {"id": 1, "ok": true, "reg": "r1", "type": "SISO", "width": 8}
+    > {"id": 2, "op": "clock", "reg": "r1", "serial": "1011", "out": true}
+    < {"id": 2, "ok": true, "cycle": 4, "serial_out": 0, "q": "11010000", "out": "0000"}
+
+A failed request replies {"ok": false, "error": ...}; "id" is echoed whenever
+the request has one. Bit strings are '0'/'1', Q1 or first clock first.
+
+    create   type, width, initial, parallel, mode, taps, serial, serial_in as in
+             vector_runner.py; name (default r1, r2, ...); keep (outlive the
+             connection that created it); view (open its viewer window)
+    load     reg and any of q, parallel, serial (queued serial input), serial_in,
+             mode, taps; reset first when reset is true
+    clock    reg, n (default len(serial) or 1), serial, out (also return the
+             serial out after each cycle), q (return Q, default true)
+    read     reg: cycle, serial_out, q and mode
+    reset    reg
+    delete   reg
+    list     every register
+    watch    reg: push {"event": "clock" | "load" | "reset" | "delete", ...} when
+             any client changes the register; unwatch stops
+    view     reg: open the register's live viewer window, or raise it when it is
+             already open (server started with --gui)
+
+Requests are served one at a time on the shared loop, so their size is
+bounded: registers hold at most MAX_WIDTH flip-flops and a clock at most
+MAX_CYCLES cycles; clocks the engine must step one cycle at a time (an out
+probe or viewer trace outside the shift modes, or short LFSR runs) are held
+to about MAX_LOOP_WORK words, and LFSR jumps (more than 2 x width cycles) to
+registers of at most MAX_JUMP_WIDTH flip-flops. Larger jobs are split into
+several requests.
+
+Replies and events carrying q take "fmt": "hex" for the packed state (bit 0
+is Q1) instead of a bit string. Events reach a client between replies; while
+a client leaves more than MAX_BACKLOG bytes unread its events are dropped and
+the next one it gets carries a "dropped" count.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from bit_stream import StringBitSource
+from register_engine import LFSR_MODES, MAX_JUMP_WIDTH
+from vector_runner import SerialOutProbe, build_engine, parse_mode, parse_taps, set_mode, set_taps
+
+DEFAULT_PORT = 8765
+READ_SIZE = 1 << 16      # Bytes per socket read; every complete line in a read is answered with one write
+MAX_LINE = 64 << 20      # Longest request line, in bytes
+MAX_BACKLOG = 1 << 20    # Unsent bytes to a client beyond which its events are dropped
+MAX_WIDTH = 1 << 20      # Flip-flops per register
+MAX_CYCLES = 1 << 24     # Cycles per clock request
+MAX_LOOP_WORK = 1 << 22  # Words touched by a clock stepped cycle by cycle
+TK_INTERVAL = 0.01       # Seconds between Tk event pumps with --gui
+OPERATIONS = ("create", "load", "clock", "read", "reset", "delete", "list", "watch", "unwatch", "view")
+FORMATS = ("bits", "hex")
+
+
+def _encode(message):
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+# --- 1. REQUEST FIELDS ---
+def _bits(request, field):
+    """The '0'/'1' string in request[field], or None when it is missing."""
+    value = request.get(field)
+    if value is None:
+        return None
+    if not isinstance(value, str) or value.strip("01"):
+        raise ValueError(f"{field} must be a string of 0s and 1s")
+    return value
+
+
+def _count(request, field, default):
+    value = request.get(field)
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError(f"{field} must be a whole number of at least 0")
+    return value
+
+
+def _check_clock(engine, n, probe):
+    """Refuses clocks that would hold the loop (and every other client) for seconds."""
+    if n > MAX_CYCLES:
+        raise ValueError(f"n is limited to {MAX_CYCLES} cycles per request")
+    w = engine.num_bits
+    mode = getattr(engine, "mode", None)
+    # A trace records every cycle, and so does an out probe outside the shift and load modes
+    looping = engine.recorder is not None or (probe and mode not in (None, "Shift Right", "Parallel Load"))
+    if mode in LFSR_MODES:
+        if n > 2 * w and w > MAX_JUMP_WIDTH:
+            raise ValueError(f"LFSR jumps are limited to registers of {MAX_JUMP_WIDTH} flip-flops; "
+                             f"clock at most {2 * w} cycles per request")
+        looping = looping or n <= 2 * w
+    if looping and n * (w // 64 + 16) > MAX_LOOP_WORK:
+        limit = max(1, MAX_LOOP_WORK // (w // 64 + 16))
+        raise ValueError(f"This register steps one cycle at a time here; clock at most {limit} cycles per request")
+
+
+def _format(request):
+    fmt = request.get("fmt", "bits")
+    if fmt not in FORMATS:
+        raise ValueError(f"fmt must be one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def _q(engine, fmt):
+    if fmt == "hex":
+        return format(engine.state, "x")
+    return format(engine.state, f"0{engine.num_bits}b")[::-1]
+
+
+def _restart(engine):
+    """The trace and history restart after the state was set directly, as after Universal_Engine.jump."""
+    if engine.recorder is not None:
+        engine.recorder.attach(engine)
+    if engine.history is not None:
+        engine.history.attach(engine)
+
+
+class _Tee:
+    """Recorder feeding a clock request's serial-out probe and the engine's own recorder."""
+
+    def __init__(self, *recorders):
+        self.recorders = recorders
+
+    def record_shift(self, old_state, n, chunk):
+        for recorder in self.recorders:
+            recorder.record_shift(old_state, n, chunk)
+
+    def record(self, state, serial_in, serial_out):
+        for recorder in self.recorders:
+            recorder.record(state, serial_in, serial_out)
+
+    def record_repeat(self, state, n, serial_in=0):
+        for recorder in self.recorders:
+            recorder.record_repeat(state, n, serial_in)
+
+
+# --- 2. SERVER STATE ---
+class Register:
+    """A served engine with its owning connection (None when kept), watchers and viewer window."""
+
+    def __init__(self, name, engine, owner):
+        self.name = name
+        self.engine = engine
+        self.owner = owner
+        self.watchers = {}   # Connection -> fmt of its events
+        self.viewer = None   # The ShiftRegisterGUI window showing this engine; one per engine, as it owns the trace and history
+
+
+class Connection:
+    def __init__(self, writer):
+        self.writer = writer
+        self.owned = set()
+        self.watching = set()
+        self.held = None     # Events raised while this client's own requests run, sent after their replies
+        self.dropped = 0
+
+    def push(self, event):
+        """Sends an unsolicited event, or drops it while the client is not reading."""
+        if self.held is not None:
+            self.held.append(_encode(event))
+            return
+        transport = self.writer.transport
+        if transport.is_closing() or transport.get_write_buffer_size() > MAX_BACKLOG:
+            self.dropped += 1
+            return
+        if self.dropped:
+            event["dropped"] = self.dropped
+            self.dropped = 0
+        self.writer.write(_encode(event))
+
+
+class ControlServer:
+    """Registers shared by every connection; root is a Tk root when viewer windows are allowed."""
+
+    def __init__(self, root=None):
+        self.root = root
+        self.registers = {}
+        self.connections = set()
+        self.created = 0
+        self.status_label = None
+        self.status_text = None
+
+    # --- Connections ---
+    async def handle(self, reader, writer):
+        conn = Connection(writer)
+        self.connections.add(conn)
+        buffer = bytearray()
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                end = data.rfind(b"\n")
+                if end < 0:
+                    buffer += data
+                    if len(buffer) > MAX_LINE:
+                        writer.write(_encode({"ok": False, "error": f"Request lines are limited to {MAX_LINE} bytes"}))
+                        break
+                    continue
+                lines = (bytes(buffer) + data[:end]).split(b"\n")
+                buffer = bytearray(data[end + 1:])
+                replies = []
+                conn.held = []
+                for line in lines:
+                    if line.strip():
+                        replies.append(_encode(self.handle_line(conn, line)))
+                        replies.extend(conn.held)
+                        conn.held.clear()
+                conn.held = None
+                writer.write(b"".join(replies))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.disconnect(conn)
+            writer.close()
+
+    def disconnect(self, conn):
+        self.connections.discard(conn)
+        for reg in conn.watching:
+            reg.watchers.pop(conn, None)
+        for reg in list(conn.owned):
+            self.remove(reg)
+
+    def handle_line(self, conn, line):
+        try:
+            request = json.loads(line)
+        except (ValueError, RecursionError) as e:
+            return {"ok": False, "error": f"Invalid JSON: {e}"}
+        if isinstance(request, list):
+            return [self.execute(conn, item) for item in request]
+        return self.execute(conn, request)
+
+    def execute(self, conn, request):
+        """Runs one request; bad input becomes an error reply."""
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "A request must be a JSON object"}
+        reply = {"id": request["id"]} if "id" in request else {}
+        op = request.get("op")
+        try:
+            if op not in OPERATIONS:
+                raise ValueError(f"op must be one of {', '.join(OPERATIONS)}")
+            result = getattr(self, f"op_{op}")(conn, request)
+        except (ValueError, TypeError) as e:
+            reply.update(ok=False, error=str(e))
+        except Exception as e:  # A bug or MemoryError must not drop the connection or the loop
+            reply.update(ok=False, error=f"{type(e).__name__}: {e}")
+        else:
+            reply["ok"] = True
+            reply.update(result)
+        return reply
+
+    # --- Operations ---
+    def register(self, request):
+        name = request.get("reg")
+        if not isinstance(name, str) or name not in self.registers:
+            raise ValueError(f"No register named {name!r}")
+        return self.registers[name]
+
+    def op_create(self, conn, request):
+        name = request.get("name")
+        if name is not None and (not isinstance(name, str) or not name or name in self.registers):
+            raise ValueError(f"Register name {name!r} is invalid or taken")
+        if request.get("view") and self.root is None:
+            raise ValueError("Viewer windows need a server started with --gui")
+        try:
+            width = int(request.get("width") or 0)
+        except (TypeError, ValueError):
+            raise ValueError("width must be a whole number") from None
+        for field in ("initial", "parallel", "expected_q"):
+            value = request.get(field)
+            width = max(width, len(value) if isinstance(value, str) else 0)
+        if width > MAX_WIDTH:
+            raise ValueError(f"Registers are limited to {MAX_WIDTH} flip-flops")
+        engine, serial, *_ = build_engine(request)
+        if serial:
+            engine.input_source = StringBitSource(serial)
+        if name is None:
+            while name is None or name in self.registers:
+                self.created += 1
+                name = f"r{self.created}"
+        reg = Register(name, engine, None if request.get("keep") else conn)
+        self.registers[name] = reg
+        if reg.owner is not None:
+            conn.owned.add(reg)
+        if request.get("view"):
+            self.open_viewer(reg)
+        return {"reg": name, "type": engine.kind, "width": engine.num_bits}
+
+    def op_load(self, conn, request):
+        reg = self.register(request)
+        engine = reg.engine
+        q = _bits(request, "q")
+        parallel = _bits(request, "parallel")
+        serial = _bits(request, "serial")
+        for field, bits in (("q", q), ("parallel", parallel)):
+            if bits is not None and len(bits) > engine.num_bits:
+                raise ValueError(f"{field} has {len(bits)} bits for a {engine.num_bits}-bit register")
+        if parallel is not None and not hasattr(engine, "parallel_in"):
+            raise ValueError(f"{engine.kind} registers have no parallel input")
+        serial_in = request.get("serial_in")
+        if serial_in is not None and serial_in not in (0, 1, "0", "1"):
+            raise ValueError("serial_in must be 0 or 1")
+        mode = request.get("mode")
+        if mode is not None:
+            mode = parse_mode(engine, mode)
+        taps = request.get("taps")
+        if taps is not None:
+            taps = parse_taps(engine, taps)
+
+        # Everything is valid: apply it all, so a failed load changes nothing
+        self.settle(reg)
+        if request.get("reset"):
+            engine.reset()
+        if q is not None:
+            engine.state = int(q[::-1], 2) if q else 0
+        if parallel is not None:
+            engine.parallel_in = int(parallel[::-1], 2) if parallel else 0
+        if serial is not None:
+            if engine.input_source is not None:
+                engine.input_source.close()
+            engine.input_source = StringBitSource(serial) if serial else None
+        if serial_in is not None:
+            engine.serial_in = int(serial_in)
+        if mode is not None:
+            set_mode(engine, mode)
+        if taps is not None:
+            set_taps(engine, taps)
+        # History checkpoints hold the state, the input cursor and PISO's mode, so changing any of
+        # them directly starts it afresh (the universal mode and taps are logged with every run)
+        if q is not None or serial is not None or (mode is not None and hasattr(engine, "load_shift_mode")):
+            _restart(engine)
+        self.changed(reg, "load")
+        return {"cycle": engine.cycle}
+
+    def op_clock(self, conn, request):
+        reg = self.register(request)
+        engine = reg.engine
+        serial = _bits(request, "serial")
+        n = _count(request, "n", len(serial) if serial else 1)
+        fmt = _format(request)
+        _check_clock(engine, n, bool(request.get("out")))
+        self.settle(reg)
+        probe = SerialOutProbe(engine.num_bits) if request.get("out") else None
+        recorder = engine.recorder
+        if probe is not None:
+            engine.recorder = probe if recorder is None else _Tee(probe, recorder)
+        try:
+            engine.step(n, serial or None)
+        finally:
+            engine.recorder = recorder
+        reply = {"cycle": engine.cycle, "serial_out": engine.serial_out}
+        if request.get("q", True):
+            reply["q"] = _q(engine, fmt)
+        if probe is not None:
+            reply["out"] = probe.bits()
+        self.changed(reg, "clock")
+        return reply
+
+    def op_read(self, conn, request):
+        engine = self.register(request).engine
+        reply = {"cycle": engine.cycle, "serial_out": engine.serial_out, "q": _q(engine, _format(request))}
+        mode = getattr(engine, "load_shift_mode", None) or getattr(engine, "mode", None)
+        if mode is not None:
+            reply["mode"] = mode
+        return reply
+
+    def op_reset(self, conn, request):
+        reg = self.register(request)
+        self.settle(reg)
+        reg.engine.reset()
+        self.changed(reg, "reset")
+        return {"cycle": reg.engine.cycle}
+
+    def op_delete(self, conn, request):
+        self.remove(self.register(request))
+        return {}
+
+    def op_list(self, conn, request):
+        return {"registers": [{"reg": reg.name, "type": reg.engine.kind, "width": reg.engine.num_bits,
+                               "cycle": reg.engine.cycle, "kept": reg.owner is None}
+                              for reg in self.registers.values()]}
+
+    def op_watch(self, conn, request):
+        reg = self.register(request)
+        reg.watchers[conn] = _format(request)
+        conn.watching.add(reg)
+        return {}
+
+    def op_unwatch(self, conn, request):
+        reg = self.register(request)
+        reg.watchers.pop(conn, None)
+        conn.watching.discard(reg)
+        return {}
+
+    def op_view(self, conn, request):
+        reg = self.register(request)
+        if self.root is None:
+            raise ValueError("Viewer windows need a server started with --gui")
+        self.open_viewer(reg)
+        return {}
+
+    # --- Changes ---
+    def remove(self, reg):
+        """Forgets a register; its viewer window keeps running the engine on its own."""
+        del self.registers[reg.name]
+        if reg.owner is not None:
+            reg.owner.owned.discard(reg)
+        for conn in reg.watchers:
+            conn.watching.discard(reg)
+            conn.push({"event": "delete", "reg": reg.name})
+        reg.watchers.clear()
+        reg.viewer = None
+
+    def changed(self, reg, event):
+        """Pushes the new state to watchers and repaints the viewer window."""
+        if reg.watchers:
+            engine = reg.engine
+            q = {}
+            for conn, fmt in list(reg.watchers.items()):
+                if fmt not in q:
+                    q[fmt] = _q(engine, fmt)
+                conn.push({"event": event, "reg": reg.name, "cycle": engine.cycle,
+                           "serial_out": engine.serial_out, "q": q[fmt]})
+        if reg.viewer is not None:
+            self.refresh_viewer(reg)
+
+    # --- Viewer windows ---
+    def open_viewer(self, reg):
+        """Opens the register's viewer, or raises it: a second window would replace the first one's trace."""
+        import tkinter as tk
+        if reg.viewer is not None:
+            self.refresh_viewer(reg)
+        if reg.viewer is not None:
+            reg.viewer.master.lift()
+            return
+        from shift_register_gui import (PIPO_Register, PISO_Register, SIPO_Register, SISO_Register,
+                                        Universal_Register)
+        views = {cls.engine_class.kind: cls
+                 for cls in (SISO_Register, SIPO_Register, PISO_Register, PIPO_Register, Universal_Register)}
+        reg.viewer = views[reg.engine.kind](tk.Toplevel(self.root), engine=reg.engine)
+
+    def settle(self, reg):
+        """Stops the viewer's free-running clock before the engine changes under it."""
+        if reg.viewer is not None:
+            reg.viewer.free_run.settle()
+
+    def refresh_viewer(self, reg):
+        import tkinter as tk
+        view = reg.viewer
+        try:
+            if view.master.winfo_exists():
+                view.sync_controls()
+                view.update_display()
+                return
+        except tk.TclError:
+            pass  # The window was closed
+        reg.viewer = None
+        reg.engine.recorder = reg.engine.history = None  # Stop logging cycles for a window that is gone
+
+    async def run_gui(self, address):
+        """Pumps Tk from the event loop until the status window is closed; one thread serves both."""
+        import tkinter as tk
+        self.status_label = tk.Label(self.root, padx=20, pady=10, justify=tk.LEFT)
+        self.status_label.pack()
+        self.root.title("Shift Register Control Server")
+        while True:
+            text = f"Listening on {address}\n{len(self.connections)} clients, {len(self.registers)} registers"
+            try:
+                if text != self.status_text:
+                    self.status_label.config(text=text)
+                    self.status_text = text
+                self.root.update()
+            except tk.TclError:
+                return  # The status window was closed
+            await asyncio.sleep(TK_INTERVAL)
+
+
+async def serve(server, port=DEFAULT_PORT, unix=None):
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle, path=unix)
+        address = unix
+    else:
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", port)
+        address = f"127.0.0.1:{listener.sockets[0].getsockname()[1]}"
+    print(f"Listening on {address}", flush=True)
+    async with listener:
+        if server.root is None:
+            await listener.serve_forever()
+        else:
+            await server.run_gui(address)
+
+
+# --- 3. CLIENT ---
+class Client:
+    """
+    Blocking client for test scripts. call() sends one request and waits for
+    its reply; send() only queues a request, for pipelining, and receive()
+    reads the next reply. Events that arrive meanwhile collect in `events`.
+    """
+
+    def __init__(self, port=DEFAULT_PORT, unix=None):
+        import socket
+        if unix:
+            sock = socket.socket(socket.AF_UNIX)
+            sock.connect(unix)
+        else:
+            sock = socket.create_connection(("127.0.0.1", port))
+        self.file = sock.makefile("rwb")
+        sock.close()  # The file keeps the connection open
+        self.events = []
+
+    def send(self, request):
+        self.file.write(_encode(request))
+
+    def receive(self):
+        self.file.flush()
+        while True:
+            line = self.file.readline()
+            if not line:
+                raise ConnectionError("The server closed the connection")
+            message = json.loads(line)
+            if isinstance(message, dict) and "event" in message:
+                self.events.append(message)
+            else:
+                return message
+
+    def call(self, op, **fields):
+        """Runs one request; returns its reply, or raises ValueError with the server's error."""
+        self.send(dict(fields, op=op))
+        reply = self.receive()
+        if not reply["ok"]:
+            raise ValueError(reply["error"])
+        return reply
+
+    def batch(self, requests):
+        """Sends a list of requests as one line; returns the list of replies."""
+        self.send(list(requests))
+        return self.receive()
+
+    def close(self):
+        self.file.close()
+
+
+# --- 4. COMMAND LINE ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve headless shift registers to local scripts over JSON lines.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port on 127.0.0.1 (0 picks a free one)")
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--gui", action="store_true", help="allow live viewer windows (the view op)")
+    args = parser.parse_args(argv)
+
+    root = None
+    if args.gui:
+        import tkinter as tk
+        root = tk.Tk()
+    try:
+        asyncio.run(serve(ControlServer(root), args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
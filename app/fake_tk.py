@@ -0,0 +1,293 @@
+"""
+Headless stand-in for the parts of tkinter the register windows use.
+
+benchmark.py installs it as the `tkinter` module when no display is
+available, so window construction and repaints can be timed without an X
+server. Widgets keep their options in a dict and the canvas keeps its items
+in a dict, counting created and configured items, so what is measured is
+the simulator's own Python work rather than Tk's.
+"""
+import sys
+import types
+
+LEFT, RIGHT, TOP, BOTTOM = "left", "right", "top", "bottom"
+X, Y, BOTH = "x", "y", "both"
+END, LAST, CENTER = "end", "last", "center"
+HORIZONTAL, VERTICAL = "horizontal", "vertical"
+NORMAL, HIDDEN, DISABLED = "normal", "hidden", "disabled"
+RAISED, SUNKEN = "raised", "sunken"
+N, S, E, W, NW = "n", "s", "e", "w", "nw"
+
+
+class TclError(Exception):
+    pass
+
+
+class _EventLoop:
+    """after()/after_idle() queues shared by every widget."""
+
+    def __init__(self):
+        self.next_id = 0
+        self.idle = {}
+        self.timers = {}
+
+    def add(self, queue, callback, args):
+        self.next_id += 1
+        key = f"after#{self.next_id}"
+        queue[key] = (callback, args)
+        return key
+
+    def run_idle(self):
+        while self.idle:
+            key = next(iter(self.idle))
+            callback, args = self.idle.pop(key)
+            callback(*args)
+
+
+loop = _EventLoop()
+
+
+class Widget:
+    def __init__(self, master=None, *args, **options):
+        self.master = master
+        self.options = options
+
+    def pack(self, *args, **kwargs):
+        pass
+
+    grid = place = pack_forget = pack
+
+    def config(self, **options):
+        self.options.update(options)
+
+    configure = config
+
+    def cget(self, key):
+        return self.options.get(key)
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def title(self, text=None):
+        self.options["title"] = text
+
+    def geometry(self, *args):
+        pass
+
+    def protocol(self, *args):
+        pass
+
+    def destroy(self):
+        pass
+
+    def focus_set(self):
+        pass
+
+    def lift(self):
+        pass
+
+    def after(self, ms, callback=None, *args):
+        return loop.add(loop.timers, callback, args)
+
+    def after_idle(self, callback, *args):
+        return loop.add(loop.idle, callback, args)
+
+    def after_cancel(self, key):
+        loop.idle.pop(key, None)
+        loop.timers.pop(key, None)
+
+    def update_idletasks(self):
+        loop.run_idle()
+
+    def update(self):
+        loop.run_idle()
+
+    def winfo_exists(self):
+        return True
+
+
+class Tk(Widget):
+    def __init__(self, *args, **kwargs):
+        super().__init__(None)
+
+    def mainloop(self):
+        pass
+
+
+class Toplevel(Widget):
+    pass
+
+
+class Frame(Widget):
+    pass
+
+
+class Label(Widget):
+    pass
+
+
+class Button(Widget):
+    def invoke(self):
+        return self.options["command"]()
+
+
+class Checkbutton(Widget):
+    pass
+
+
+class Spinbox(Widget):
+    pass
+
+
+class Scrollbar(Widget):
+    def set(self, first, last):
+        self.options["range"] = (first, last)
+
+
+class Scale(Widget):
+    def set(self, value):
+        self.options["value"] = value
+
+    def get(self):
+        return self.options.get("value", 0)
+
+
+class OptionMenu(Widget):
+    def __init__(self, master, variable, *values, **options):
+        super().__init__(master, **options)
+
+
+class Entry(Widget):
+    def __init__(self, master=None, **options):
+        super().__init__(master, **options)
+        self.text = ""
+
+    def get(self):
+        return self.text
+
+    def insert(self, index, text):
+        self.text += text
+
+    def delete(self, first, last=None):
+        self.text = ""
+
+
+class Variable:
+    def __init__(self, master=None, value=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class StringVar(Variable):
+    pass
+
+
+class BooleanVar(Variable):
+    pass
+
+
+class IntVar(Variable):
+    pass
+
+
+class Canvas(Widget):
+    """Items live in a dict; created/configured counts show how much work a repaint does."""
+
+    def __init__(self, master=None, **options):
+        super().__init__(master, **options)
+        self.items = {}
+        self.tags = {}
+        self.created = 0
+        self.configured = 0
+
+    def _create(self, kind, coords, options):
+        self.created += 1
+        item = self.created
+        self.items[item] = [kind, coords, options]
+        tags = options.get("tags", ())
+        for tag in (tags,) if isinstance(tags, str) else tags:
+            self.tags.setdefault(tag, set()).add(item)
+        return item
+
+    def create_line(self, *coords, **options):
+        return self._create("line", coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._create("text", coords, options)
+
+    def create_rectangle(self, *coords, **options):
+        return self._create("rectangle", coords, options)
+
+    def create_polygon(self, *coords, **options):
+        return self._create("polygon", coords, options)
+
+    def create_oval(self, *coords, **options):
+        return self._create("oval", coords, options)
+
+    def _targets(self, tag_or_id):
+        if isinstance(tag_or_id, int):
+            return (tag_or_id,)
+        if tag_or_id == "all":
+            return tuple(self.items)
+        return tuple(self.tags.get(tag_or_id, ()))
+
+    def itemconfig(self, tag_or_id, **options):
+        for item in self._targets(tag_or_id):
+            self.configured += 1
+            self.items[item][2].update(options)
+
+    itemconfigure = itemconfig
+
+    def itemcget(self, item, option):
+        return self.items[item][2].get(option)
+
+    def coords(self, item, *coords):
+        if coords:
+            self.configured += 1
+            self.items[item][1] = coords
+        return self.items[item][1]
+
+    def tag_raise(self, tag_or_id, above=None):
+        pass
+
+    tag_lower = tag_raise
+
+    def addtag_all(self, tag):
+        self.tags.setdefault(tag, set()).update(self.items)
+
+    def addtag_withtag(self, tag, tag_or_id):
+        self.tags.setdefault(tag, set()).update(self._targets(tag_or_id))
+
+    def find_withtag(self, tag_or_id):
+        return self._targets(tag_or_id)
+
+    def delete(self, tag_or_id):
+        for item in self._targets(tag_or_id):
+            self.items.pop(item, None)
+            for members in self.tags.values():
+                members.discard(item)
+
+
+def _dialog(*args, **kwargs):
+    return ""
+
+
+def install():
+    """Registers this module as `tkinter` (with messagebox/filedialog); call before importing the GUI."""
+    if "tkinter" in sys.modules and sys.modules["tkinter"] is not sys.modules[__name__]:
+        raise RuntimeError("The real tkinter is already imported")
+    module = sys.modules[__name__]
+    messagebox = types.ModuleType("tkinter.messagebox")
+    messagebox.showinfo = messagebox.showerror = messagebox.showwarning = _dialog
+    filedialog = types.ModuleType("tkinter.filedialog")
+    filedialog.askopenfilename = filedialog.asksaveasfilename = _dialog
+    module.messagebox, module.filedialog = messagebox, filedialog
+    sys.modules["tkinter"] = module
+    sys.modules["tkinter.messagebox"] = messagebox
+    sys.modules["tkinter.filedialog"] = filedialog
+    return module
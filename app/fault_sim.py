@@ -0,0 +1,239 @@
+"""
+Bit-parallel fault simulation for the SISO/SIPO/PISO/PIPO registers.
+
+Fault sites are every flip-flop output Qi and data input Di, the parallel
+input pins Pi (PISO/PIPO), the PISO serial input pin SI and the serial
+output pin SO (SISO/PISO); for SISO/SIPO the serial input is D1. Each site
+gets stuck-at-0 and stuck-at-1 faults, and each Qi also a bit-flip (single
+event upset) right after clock `flip_cycle`.
+
+Faulty machines are packed 64 to a uint64 word: flip-flop i of every machine
+in a chunk is one row of a (num_bits, groups) matrix, and faults are applied
+as per-lane AND/OR masks on the D and Q rows, so one cycle is a handful of
+NumPy operations for all machines. The good machine runs once on the
+register engine; a fault is detected by a vector when any observed output
+(serial out for SISO/PISO, all Q for SIPO/PIPO) differs from it after any
+clock. Fault lists are split into chunks across a ProcessPoolExecutor.
+
+    python app/fault_sim.py vectors.json -j 8
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from vector_runner import build_engine, iter_vector_files, load_vectors
+
+LANES = 64
+MIN_CHUNK_FAULTS = 8 * LANES   # Smallest worker task; smaller chunks waste the NumPy row width
+FAULT_KINDS = ("SISO", "SIPO", "PISO", "PIPO")
+ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+Fault = namedtuple("Fault", "site kind")        # kind: 'sa0', 'sa1' or 'flip'
+Stimulus = namedtuple("Stimulus", "initial parallel mode serial clocks")
+
+
+def fault_sites(kind, num_bits):
+    """Names of the fault sites of a register type, in report order."""
+    sites = [f"Q{i + 1}" for i in range(num_bits)] + [f"D{i + 1}" for i in range(num_bits)]
+    if kind in ("PISO", "PIPO"):
+        sites += [f"P{i + 1}" for i in range(num_bits)]
+    if kind == "PISO":
+        sites.append("SI")
+    if kind in ("SISO", "PISO"):
+        sites.append("SO")
+    return sites
+
+
+def enumerate_faults(kind, num_bits):
+    """Every stuck-at-0/1 fault, plus a bit-flip on each flip-flop."""
+    faults = []
+    for site in fault_sites(kind, num_bits):
+        faults.append(Fault(site, "sa0"))
+        faults.append(Fault(site, "sa1"))
+        if site[0] == "Q":
+            faults.append(Fault(site, "flip"))
+    return faults
+
+
+def _bit_words(state, num_bits):
+    """Packed state -> (num_bits,) uint64 array of all-0/all-1 words, Q1 first."""
+    raw = np.frombuffer(state.to_bytes((num_bits + 7) // 8, "little"), dtype=np.uint8)
+    bits = np.unpackbits(raw, bitorder="little")[:num_bits]
+    return np.where(bits.astype(bool), ONES, np.uint64(0))
+
+
+# --- 1. STIMULI AND THE GOOD MACHINE ---
+def prepare_vectors(vectors):
+    """Parses vectors for one circuit; returns (kind, num_bits, stimuli, good observations)."""
+    kind = num_bits = None
+    stimuli, good = [], []
+    for index, vector in enumerate(vectors, 1):
+        engine, serial, clocks, _, _ = build_engine(vector)
+        if engine.kind not in FAULT_KINDS:
+            raise ValueError(f"vector {index}: fault simulation supports {', '.join(FAULT_KINDS)}")
+        if kind is None:
+            kind, num_bits = engine.kind, engine.num_bits
+        elif (engine.kind, engine.num_bits) != (kind, num_bits):
+            raise ValueError(f"vector {index}: every vector must use the same register type and width")
+        # Per-cycle serial inputs, padded with serial_in like engine.step()
+        serial_bits = [int(b) for b in serial[:clocks]] + [engine.serial_in] * max(0, clocks - len(serial))
+        stimuli.append(Stimulus(engine.state, getattr(engine, "parallel_in", 0),
+                                getattr(engine, "load_shift_mode", None), serial_bits, clocks))
+        observed = []
+        for bit in serial_bits:
+            engine.serial_in = bit
+            engine.step(1)
+            observed.append(engine.serial_out if kind in ("SISO", "PISO") else engine.state)
+        good.append(observed)
+    if kind is None:
+        raise ValueError("no vectors")
+    return kind, num_bits, stimuli, good
+
+
+# --- 2. FAULT MASKS ---
+class FaultMasks:
+    """Per-lane AND/OR masks injecting one fault per machine for a chunk of faults."""
+
+    def __init__(self, faults, num_bits):
+        self.groups = groups = (len(faults) + LANES - 1) // LANES
+        shape = (num_bits, groups)
+        self.q_and, self.q_or = np.full(shape, ONES), np.zeros(shape, np.uint64)
+        self.d_and, self.d_or = np.full(shape, ONES), np.zeros(shape, np.uint64)
+        self.p_and, self.p_or = np.full(shape, ONES), np.zeros(shape, np.uint64)
+        self.si_and, self.si_or = np.full(groups, ONES), np.zeros(groups, np.uint64)
+        self.so_and, self.so_or = np.full(groups, ONES), np.zeros(groups, np.uint64)
+        self.flip = np.zeros(shape, np.uint64)
+        for j, fault in enumerate(faults):
+            group, lane = divmod(j, LANES)
+            bit = np.uint64(1 << lane)
+            site = fault.site
+            if site in ("SI", "SO"):
+                and_mask, or_mask = (self.si_and, self.si_or) if site == "SI" else (self.so_and, self.so_or)
+                index = group
+            else:
+                name = site[0].lower()
+                and_mask, or_mask = getattr(self, f"{name}_and"), getattr(self, f"{name}_or")
+                index = (int(site[1:]) - 1, group)
+            if fault.kind == "sa0":
+                and_mask[index] &= ~bit
+            elif fault.kind == "sa1":
+                or_mask[index] |= bit
+            else:
+                self.flip[index] |= bit
+
+
+# --- 3. SIMULATION ---
+def _simulate(kind, num_bits, stimulus, good, masks, flip_cycle):
+    """Runs one vector on every machine of a chunk; returns the (groups,) words of detecting lanes."""
+    groups = masks.groups
+    state = (_bit_words(stimulus.initial, num_bits)[:, None] & masks.q_and) | masks.q_or
+    parallel = (_bit_words(stimulus.parallel, num_bits)[:, None] & masks.p_and) | masks.p_or
+    mode = stimulus.mode
+    detected = np.zeros(groups, np.uint64)
+    serial_out = kind in ("SISO", "PISO")
+    data = np.empty((num_bits, groups), np.uint64)
+    for cycle, (bit, expected) in enumerate(zip(stimulus.serial, good), 1):
+        if kind == "PIPO" or mode == "Load":
+            data[:] = parallel
+            mode = "Shift" if mode is not None else None
+        else:
+            serial = ONES if bit else np.uint64(0)
+            if kind == "PISO":
+                data[0] = (serial & masks.si_and) | masks.si_or
+            else:
+                data[0] = serial
+            data[1:] = state[:-1]
+        data &= masks.d_and
+        data |= masks.d_or
+        state, data = data, state
+        state &= masks.q_and
+        state |= masks.q_or
+        if cycle == flip_cycle:
+            state ^= masks.flip
+        if serial_out:
+            out = (state[-1] & masks.so_and) | masks.so_or
+            detected |= out ^ (ONES if expected else np.uint64(0))
+        else:
+            detected |= np.bitwise_or.reduce(state ^ _bit_words(expected, num_bits)[:, None], axis=0)
+        if kind == "PIPO" and cycle > flip_cycle:
+            break  # Every later clock reloads the same parallel input, in every machine
+    return detected
+
+
+def simulate_faults(kind, num_bits, stimuli, good, faults, flip_cycle=1):
+    """For each fault, the 1-based indices of the vectors that detect it."""
+    masks = FaultMasks(faults, num_bits)
+    detections = [[] for _ in faults]
+    for index, (stimulus, observed) in enumerate(zip(stimuli, good), 1):
+        words = _simulate(kind, num_bits, stimulus, observed, masks, flip_cycle)
+        for group in np.flatnonzero(words):
+            word = int(words[group])
+            while word:
+                lane = (word & -word).bit_length() - 1
+                j = group * LANES + lane
+                if j < len(faults):
+                    detections[j].append(index)
+                word &= word - 1
+    return detections
+
+
+def run_campaign(vectors, faults=None, flip_cycle=1, jobs=None, chunk_faults=None):
+    """Fault-simulates every fault against every vector; returns [(fault, detecting vectors)]."""
+    kind, num_bits, stimuli, good = prepare_vectors(vectors)
+    if faults is None:
+        faults = enumerate_faults(kind, num_bits)
+    if chunk_faults is None:
+        # About four tasks per worker, in whole words of lanes
+        workers = jobs or os.cpu_count() or 1
+        share = -(-len(faults) // (4 * workers))
+        chunk_faults = max(MIN_CHUNK_FAULTS, -(-share // LANES) * LANES)
+    chunks = [faults[i:i + chunk_faults] for i in range(0, len(faults), chunk_faults)]
+    args = [(kind, num_bits, stimuli, good, chunk, flip_cycle) for chunk in chunks]
+    if jobs == 1 or len(chunks) <= 1:
+        results = [simulate_faults(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(simulate_faults, *zip(*args)))
+    detections = [d for chunk in results for d in chunk]
+    return list(zip(faults, detections))
+
+
+# --- 4. COMMAND LINE ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stuck-at and bit-flip fault simulation of a register.")
+    parser.add_argument("paths", nargs="+", help="vector files (.csv/.json) for one register type and width")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--flip-cycle", type=int, default=1, help="clock after which bit-flip faults strike")
+    parser.add_argument("--undetected", action="store_true", help="only list the faults no vector detects")
+    args = parser.parse_args(argv)
+
+    try:
+        vectors = [v for path in iter_vector_files(args.paths) for v in load_vectors(path)]
+        start = time.perf_counter()
+        report = run_campaign(vectors, flip_cycle=args.flip_cycle, jobs=args.jobs)
+    except (OSError, ValueError, TypeError, AttributeError, csv.Error) as e:  # Unreadable or malformed vectors
+        print(f"error: {e}")
+        return 2
+    elapsed = time.perf_counter() - start
+    detected = 0
+    for fault, hits in report:
+        if hits:
+            detected += 1
+            if not args.undetected:
+                print(f"{fault.site:>8} {fault.kind:<4}  detected by vectors {', '.join(map(str, hits))}")
+        else:
+            print(f"{fault.site:>8} {fault.kind:<4}  UNDETECTED")
+    total = len(report)
+    print(f"{total} faults, {detected} detected ({100.0 * detected / max(1, total):.1f}% coverage), "
+          f"{len(vectors)} vectors in {elapsed:.2f} s")
+    return 0 if detected == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
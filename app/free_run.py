@@ -0,0 +1,178 @@
+"""
+Free-running clock for the register windows.
+
+A Tk after() loop ticks every few milliseconds and runs as many cycles as the
+target frequency asks for since the previous tick, in one engine step, so the
+simulation rate is independent of the event loop. Repaints are requested at
+most FRAME_RATE times per second, and a readout shows the achieved rate.
+
+The Run on menu moves the simulation off the Tk thread: a worker thread or
+process (see sim_worker.py) runs the cycles and the Tk timer only picks up
+the newest snapshot each frame, so long runs never block the UI.
+"""
+import threading
+import time
+import tkinter as tk
+
+TICK_MS = 5              # Simulation tick interval
+FRAME_RATE = 60          # Display refreshes per second while running
+READOUT_INTERVAL = 0.5   # Seconds between updates of the cycles/s readout
+BACKENDS = {"Tk timer": None, "Worker thread": "thread", "Worker process": "process"}
+MAX_LAG = 0.1            # Seconds of backlog a slow tick may catch up on; older cycles are dropped
+
+
+class FreeRunClock:
+    """
+    Run / Pause / Step controls for a ShiftRegisterGUI. The view only has to
+    provide advance(n), clock_pulse() and update_display(), plus
+    read_inputs(), sync_controls() and set_status() for the worker backends.
+    While a worker thread runs, the engine belongs to it: the Tk thread holds
+    `lock` whenever it reads the engine, and settle() stops the worker before
+    the Tk thread changes it.
+    """
+    def __init__(self, view, master):
+        self.view = view
+        self.running = False
+        self.after_id = None
+        self.frequency = 1000.0
+        self.carry = 0.0         # Fraction of a cycle left over from the previous tick
+        self.last_tick = 0.0
+        self.last_frame = 0.0
+        self.readout_start = 0.0
+        self.readout_cycles = 0
+        self.lock = threading.Lock()
+        self.worker = None       # SimulationWorker while a background run is active
+
+        bar = tk.Frame(master, padx=10, pady=5, bg="#DCDCDC")
+        bar.pack(fill=tk.X, padx=10)
+        self.run_button = tk.Button(bar, text="Run", width=6, command=self.toggle, bg="#90EE90")
+        self.run_button.pack(side=tk.LEFT, padx=5)
+        tk.Button(bar, text="Step", command=self.step, bg="#A9A9A9").pack(side=tk.LEFT, padx=5)
+        tk.Label(bar, text="Clock (Hz):", bg="#DCDCDC").pack(side=tk.LEFT, padx=(15, 5))
+        self.frequency_entry = tk.Entry(bar, width=10)
+        self.frequency_entry.insert(0, "1000")
+        self.frequency_entry.pack(side=tk.LEFT)
+        self.frequency_entry.bind("<Return>", lambda event: self.read_frequency())
+        tk.Label(bar, text="Run on:", bg="#DCDCDC").pack(side=tk.LEFT, padx=(15, 5))
+        self.backend_var = tk.StringVar(value="Tk timer")
+        tk.OptionMenu(bar, self.backend_var, *BACKENDS).pack(side=tk.LEFT)
+        self.readout = tk.Label(bar, text="Paused", bg="#DCDCDC", width=24, anchor="w")
+        self.readout.pack(side=tk.LEFT, padx=15)
+
+    def read_frequency(self):
+        """Parses the frequency entry; accepts plain numbers and 1e6-style values."""
+        try:
+            frequency = float(self.frequency_entry.get())
+        except ValueError:
+            frequency = 0.0
+        if frequency <= 0:
+            self.readout.config(text="Frequency must be > 0")
+            return False
+        self.frequency = frequency
+        return True
+
+    def toggle(self):
+        if self.running:
+            self.pause()
+        else:
+            self.run()
+
+    def run(self):
+        if self.running or not self.read_frequency():
+            return
+        self.running = True
+        self.carry = 0.0
+        self.last_tick = self.last_frame = self.readout_start = time.perf_counter()
+        self.readout_cycles = 0
+        self.run_button.config(text="Pause", bg="#FFD700")
+        backend = BACKENDS.get(self.backend_var.get())
+        if backend is None:
+            self.after_id = self.view.master.after(TICK_MS, self.tick)
+            return
+        from sim_worker import SimulationWorker  # Pulls in multiprocessing; Tk-timer runs never need it
+        engine = self.view.engine
+        if backend == "process" and not SimulationWorker.can_fork(engine):
+            backend = "thread"
+            self.view.set_status("The serial input is an open stream; running on a worker thread instead.")
+        self.view.read_inputs()
+        self.worker = SimulationWorker(engine, self.frequency, backend, self.lock)
+        self.after_id = self.view.master.after(1000 // FRAME_RATE, self.poll)
+
+    def pause(self):
+        self.running = False
+        if self.after_id is not None:
+            self.view.master.after_cancel(self.after_id)
+            self.after_id = None
+        if self.worker is not None:
+            final = self.worker.stop()
+            self.worker = None
+            if final is None:
+                self.view.set_status("Run stopped: the worker exited unexpectedly.")
+            elif final.error:
+                self.view.set_status(f"Run stopped: {final.error}")
+            self.view.sync_controls()
+        self.run_button.config(text="Run", bg="#90EE90")
+        self.readout.config(text="Paused")
+        self.view.update_display()
+
+    def settle(self):
+        """Stops a background run, so the Tk thread may change the engine."""
+        if self.worker is not None:
+            self.pause()
+
+    def step(self):
+        if self.running:
+            self.pause()
+        self.view.clock_pulse()
+
+    def tick(self):
+        """Runs the cycles that are due since the last tick, then repaints if a frame is due."""
+        self.after_id = None
+        if not self.running:
+            return
+        now = time.perf_counter()
+        due = min(now - self.last_tick, MAX_LAG) * self.frequency + self.carry
+        cycles = int(due)
+        self.carry = due - cycles
+        self.last_tick = now
+        try:
+            if cycles:
+                self.view.advance(cycles)
+                self.readout_cycles += cycles
+            if now - self.last_frame >= 1.0 / FRAME_RATE:
+                self.last_frame = now
+                self.view.update_display()
+            if now - self.readout_start >= READOUT_INTERVAL:
+                rate = self.readout_cycles / (now - self.readout_start)
+                self.readout.config(text=f"{rate:,.0f} cycles/s")
+                self.readout_start = now
+                self.readout_cycles = 0
+            self.after_id = self.view.master.after(TICK_MS, self.tick)
+        except tk.TclError:
+            self.running = False  # The window was closed while running
+
+    def poll(self):
+        """Shows the newest worker snapshot, once per frame; older snapshots were dropped by the worker's queue."""
+        self.after_id = None
+        worker = self.worker
+        if not self.running or worker is None:
+            return
+        try:
+            snapshot = worker.latest()
+            if worker.finished:
+                self.pause()  # The worker stopped on its own: bad input further down the stream
+                return
+            with self.lock:
+                self.view.read_inputs()
+                if snapshot is not None:
+                    if worker.backend == "process":
+                        worker.apply(snapshot)
+                    self.view.sync_controls()
+            if snapshot is not None:
+                self.view.update_display()
+                self.readout.config(text=f"{snapshot.rate:,.0f} cycles/s")
+            self.after_id = self.view.master.after(1000 // FRAME_RATE, self.poll)
+        except tk.TclError:
+            self.worker.stop()  # The window was closed while running
+            self.worker = None
+            self.running = False
@@ -0,0 +1,351 @@
+"""
+Rewind and seek for register engines.
+
+The history keeps a snapshot every `interval` cycles (register state, input
+cursor and PISO load_shift_mode) plus a compact per-cycle delta log: one bit
+per cycle holding the serial input bit, and runs of (start, count, key) for
+cycles that are not plain right shifts. A run key is either the value a load
+copied in, or an engine transition key that engine.run_state(key, state, k,
+bits) replays (rotates and LFSRs of the universal register). Seeking to cycle N restores the nearest snapshot at or
+before N and replays at most `interval` cycles from the log, using one
+shift per run of shift cycles, so seek latency is O(interval) and memory is
+about one bit per cycle plus one snapshot per interval.
+
+The history is a sliding window: once it holds more than `limit` cycles the
+oldest snapshots and their log are dropped, an eighth of the window at a
+time so the cost stays amortized. By default the interval grows with the
+register width (a snapshot then costs about as much as the log between two
+snapshots) and the limit is whatever fits in `budget` bytes, so long runs
+and wide registers keep a bounded history instead of a growing one.
+
+Seeking is lazy: the log after N is kept, so the slider can move forward
+again, until the engine runs a new cycle; then everything after N is
+dropped. Input already consumed past N is handed back to the engine via a
+bit_stream.PrefixedBitSource, so the serial input resumes exactly at N.
+"""
+from bisect import bisect_right
+
+from bit_stream import PrefixedBitSource
+
+DEFAULT_INTERVAL = 1024         # Minimum cycles between snapshots
+DEFAULT_BUDGET = 16 << 20       # Bytes of snapshots and log kept by default
+CHECKPOINT_OVERHEAD = 128       # Approximate bytes per snapshot besides the state itself
+
+
+class Checkpoint:
+    """Engine snapshot at one cycle."""
+    __slots__ = ("cycle", "state", "source_position", "load_shift_mode")
+
+    def __init__(self, cycle, state, source_position, load_shift_mode):
+        self.cycle = cycle
+        self.state = state
+        self.source_position = source_position
+        self.load_shift_mode = load_shift_mode
+
+
+class History:
+    """
+    Checkpoints plus delta log for one engine. Attach with history.attach(engine);
+    the engine then reports every cycle it runs.
+    """
+    def __init__(self, interval=None, limit=None, budget=DEFAULT_BUDGET):
+        """
+        interval: cycles between snapshots (default: DEFAULT_INTERVAL or the
+        register width, whichever is larger); limit: cycles kept (default:
+        what fits in budget bytes).
+        """
+        if interval is not None and interval < 1:
+            raise ValueError("interval must be at least 1 cycle")
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be at least 1 cycle")
+        self.requested_interval = interval
+        self.requested_limit = limit
+        self.budget = budget
+        self.engine = None
+
+    def attach(self, engine):
+        """Starts a fresh history at the engine's current cycle."""
+        self.engine = engine
+        engine.history = self
+        width = engine.num_bits
+        self.interval = self.requested_interval or max(DEFAULT_INTERVAL, width)
+        limit = self.requested_limit
+        if limit is None:
+            bytes_per_cycle = 1 / 8 + (width / 8 + CHECKPOINT_OVERHEAD) / self.interval
+            limit = int(self.budget / bytes_per_cycle)
+        self.limit = max(limit, self.interval)
+        self._restart(engine.cycle, engine.state, self._source_position(), self._mode())
+
+    def _restart(self, cycle, state, position, mode):
+        """Empties the history down to one snapshot at cycle."""
+        self.base = cycle             # First cycle in the history
+        self.head = cycle             # Newest cycle in the history
+        self.position = position      # Input cursor at engine.cycle
+        self.head_position = position # Input cursor at head
+        self.log = bytearray()        # Input bit of every logged cycle, MSB first
+        self.skip = 0                 # Bits at the start of log[0] that precede base
+        self.tail = 0                 # Log bits not yet filling a whole byte
+        self.tail_len = 0
+        self.run_starts = []          # Runs of non-shift cycles, sorted by start cycle
+        self.runs = []                # [start, count, key, reads_input]; see the module docstring
+        self.checkpoints = [Checkpoint(cycle, state, position, mode)]
+
+    def _source_position(self):
+        source = self.engine.input_source
+        return source.position if source is not None else 0
+
+    def _mode(self):
+        return getattr(self.engine, "load_shift_mode", None)
+
+    def __len__(self):
+        return self.head - self.base
+
+    # --- Bit-packed log ---
+    def _append_bits(self, n, chunk):
+        total = self.tail_len + n
+        value = (self.tail << n) | chunk
+        full, rem = divmod(total, 8)
+        if full:
+            self.log += (value >> rem).to_bytes(full, "big")
+        self.tail = value & ((1 << rem) - 1)
+        self.tail_len = rem
+
+    def _read_bits(self, a, b):
+        """Log bits a..b-1 (counted from base) packed with bit a as MSB."""
+        a += self.skip
+        b += self.skip
+        stored = len(self.log) * 8
+        value = 0
+        if a < stored:
+            hi = min(b, stored)
+            first_byte, last_byte = a // 8, (hi + 7) // 8
+            chunk = int.from_bytes(self.log[first_byte:last_byte], "big") >> (last_byte * 8 - hi)
+            value = chunk & ((1 << (hi - a)) - 1)
+        if b > stored:
+            lo = max(a, stored)
+            value = (value << (b - lo)) | ((self.tail >> (stored + self.tail_len - b)) & ((1 << (b - lo)) - 1))
+        return value
+
+    def _truncate_bits(self, count):
+        count += self.skip
+        stored = len(self.log) * 8
+        if count <= stored:
+            full, rem = divmod(count, 8)
+            self.tail = self.log[full] >> (8 - rem) if rem else 0
+            self.tail_len = rem
+            del self.log[full:]
+        else:
+            keep = count - stored
+            self.tail >>= self.tail_len - keep
+            self.tail_len = keep
+
+    def _drop_bits(self, count):
+        """Drops the first count log bits after base."""
+        count += self.skip
+        del self.log[:count // 8]
+        self.skip = count % 8
+
+    # --- Retention ---
+    def _trim(self):
+        """Drops whole intervals from the front once the window is an eighth over its limit."""
+        excess = self.head - self.base - self.limit
+        if excess < max(self.interval, self.limit // 8):
+            return
+        k = excess // self.interval
+        base = self.base + k * self.interval
+        self._drop_bits(base - self.base)
+        del self.checkpoints[:k]
+        first = self._runs_from(base)
+        del self.runs[:first]
+        del self.run_starts[:first]
+        if self.runs and self.runs[0][0] < base:
+            run = self.runs[0]
+            run[1] -= base - run[0]
+            run[0] = self.run_starts[0] = base
+        self.base = base
+
+    def _skip_ahead(self, n):
+        """Cycles of an n-cycle step that fall out of the window at once, so they are not logged."""
+        return max(0, n - self.limit)
+
+    # --- Logging (called by the engine before it applies the cycles) ---
+    def _drop_future(self):
+        """After a seek, the first new cycle discards everything logged past the current cycle."""
+        cycle = self.engine.cycle
+        if cycle >= self.head:
+            return
+        self._truncate_bits(cycle - self.base)
+        del self.checkpoints[(cycle - self.base) // self.interval + 1:]
+        cut = bisect_right(self.run_starts, cycle - 1)
+        del self.run_starts[cut:]
+        del self.runs[cut:]
+        if self.runs:
+            run = self.runs[-1]
+            run[1] = min(run[1], cycle - run[0])
+        self.head = cycle
+        self.head_position = self.position
+
+    def _next_checkpoint(self):
+        return self.base + len(self.checkpoints) * self.interval
+
+    def log_shift(self, old_state, n, chunk):
+        """n shift cycles of chunk (first bit as MSB) into old_state."""
+        self._drop_future()
+        start = self.engine.cycle
+        p_start, p_end = self.position, self._source_position()
+        mask = self.engine.mask
+        mode = self._mode()
+        k = self._skip_ahead(n)
+        if k:
+            old_state = ((old_state << k) | (chunk >> (n - k))) & mask
+            n -= k
+            chunk &= (1 << n) - 1
+            start += k
+            p_start = min(p_start + k, p_end)
+            self._restart(start, old_state, p_start, mode)
+        cycle = self._next_checkpoint()
+        while cycle <= start + n:
+            k = cycle - start
+            state = ((old_state << k) | (chunk >> (n - k))) & mask
+            self.checkpoints.append(Checkpoint(cycle, state, min(p_start + k, p_end), mode))
+            cycle += self.interval
+        self._append_bits(n, chunk)
+        self.head = start + n
+        self.position = self.head_position = p_end
+        self._trim()
+
+    def log_load(self, n, value):
+        """n cycles that each load value."""
+        self._drop_future()
+        start = self.engine.cycle
+        mode = "Shift" if self._mode() is not None else None  # PISO switches to Shift on load
+        k = self._skip_ahead(n)
+        if k:
+            n -= k
+            start += k
+            self._restart(start, value, self.position, mode)
+        cycle = self._next_checkpoint()
+        while cycle <= start + n:
+            self.checkpoints.append(Checkpoint(cycle, value, self.position, mode))
+            cycle += self.interval
+        self._append_bits(n, 0)
+        self._add_run(start, n, value, False)
+        self._trim()
+
+    def log_run(self, n, key, old_state, chunk=0, reads_input=False):
+        """n cycles of engine transition key from old_state, fed chunk when reads_input."""
+        self._drop_future()
+        start = self.engine.cycle
+        p_start = self.position
+        p_end = self._source_position() if reads_input else p_start
+        mode = self._mode()
+        k = self._skip_ahead(n)
+        if k:
+            bits = chunk >> (n - k) if reads_input else 0
+            old_state = self.engine.run_state(key, old_state, k, bits)
+            n -= k
+            chunk &= (1 << n) - 1
+            start += k
+            p_start = min(p_start + k, p_end)
+            self._restart(start, old_state, p_start, mode)
+        done, state = 0, old_state
+        cycle = self._next_checkpoint()
+        while cycle <= start + n:
+            k = cycle - start
+            bits = ((chunk >> (n - k)) & ((1 << (k - done)) - 1)) if reads_input else 0
+            state = self.engine.run_state(key, state, k - done, bits)
+            done = k
+            self.checkpoints.append(Checkpoint(cycle, state, min(p_start + k, p_end), mode))
+            cycle += self.interval
+        self._append_bits(n, chunk if reads_input else 0)
+        self._add_run(start, n, key, reads_input)
+        self.position = self.head_position = p_end
+        self._trim()
+
+    def _add_run(self, start, n, key, reads_input):
+        last = self.runs[-1] if self.runs else None
+        if last is not None and last[0] + last[1] == start and last[2] == key and type(last[2]) is type(key):
+            last[1] += n
+        else:
+            self.run_starts.append(start)
+            self.runs.append([start, n, key, reads_input])
+        self.head = start + n
+
+    # --- Seeking ---
+    def _runs_from(self, cycle):
+        """Index of the first run that ends after cycle."""
+        index = bisect_right(self.run_starts, cycle) - 1
+        if index < 0 or self.runs[index][0] + self.runs[index][1] <= cycle:
+            index += 1
+        return index
+
+    def _replay(self, checkpoint, target):
+        """State, mode and number of shift cycles from checkpoint up to target, one shift per run."""
+        state, mode = checkpoint.state, checkpoint.load_shift_mode
+        mask = self.engine.mask
+        cycle, shifted = checkpoint.cycle, 0
+        index = self._runs_from(cycle)
+        while cycle < target:
+            if index < len(self.runs) and self.runs[index][0] <= cycle:
+                start, count, key, reads_input = self.runs[index]
+                stop = min(start + count, target)
+                if isinstance(key, int):
+                    state = key
+                    mode = "Shift" if mode is not None else None
+                else:
+                    bits = self._read_bits(cycle - self.base, stop - self.base) if reads_input else 0
+                    state = self.engine.run_state(key, state, stop - cycle, bits)
+                    if reads_input:
+                        shifted += stop - cycle
+                cycle = stop
+                index += 1
+                continue
+            stop = min(target, self.runs[index][0]) if index < len(self.runs) else target
+            n = stop - cycle
+            state = ((state << n) | self._read_bits(cycle - self.base, stop - self.base)) & mask
+            shifted += n
+            cycle = stop
+        return state, mode, shifted
+
+    def _input_after(self, cycle, count):
+        """The first `count` input bits of input-reading cycles logged after cycle, packed MSB first."""
+        value, taken = 0, 0
+        index = self._runs_from(cycle)
+        while taken < count and cycle < self.head:
+            if index < len(self.runs) and self.runs[index][0] <= cycle:
+                start, run_count, _, reads_input = self.runs[index]
+                index += 1
+                if not reads_input:
+                    cycle = start + run_count
+                    continue
+                stop = start + run_count
+            else:
+                stop = self.runs[index][0] if index < len(self.runs) else self.head
+            stop = min(stop, cycle + count - taken)
+            value = (value << (stop - cycle)) | self._read_bits(cycle - self.base, stop - self.base)
+            taken += stop - cycle
+            cycle = stop
+        return value, taken
+
+    def seek(self, target):
+        """Restores the engine to the state it had after cycle `target`."""
+        if not self.base <= target <= self.head:
+            raise ValueError(f"cycle {target} is outside the history ({self.base}..{self.head})")
+        engine = self.engine
+        checkpoint = self.checkpoints[(target - self.base) // self.interval]
+        state, mode, shifted = self._replay(checkpoint, target)
+        engine.state = state
+        engine.cycle = target
+        if mode is not None:
+            engine.load_shift_mode = mode
+
+        source = engine.input_source
+        if source is not None:
+            if isinstance(source, PrefixedBitSource) and source.position < self.head_position:
+                source = source.source  # Drop the replay of an earlier seek; the log still has those bits
+            self.position = min(checkpoint.source_position + shifted, self.head_position)
+            prefix, count = self._input_after(target, self.head_position - self.position)
+            engine.input_source = PrefixedBitSource(prefix, count, source)
+
+        if engine.recorder is not None:
+            engine.recorder.rewind(engine)
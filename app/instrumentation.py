@@ -0,0 +1,243 @@
+"""
+Optional instrumentation for the register windows.
+
+When enabled, the view's clock_pulse, advance, update_display, repaint and
+create_diagram and the canvas item calls are replaced by timing/counting
+wrappers stored as instance attributes; disabling deletes them again, so a
+window that is not being instrumented runs its plain methods with no
+per-call cost. (The Clock buttons look clock_pulse up on every click for
+the same reason.)
+
+A HUD in the corner of the canvas shows a timing histogram summary per hook,
+canvas items created/configured, and event-queue lag: how late the idle
+repaint runs after update_display() asks for it, and how late the HUD's own
+after() timer fires. create_diagram's items are counted from its return
+value, since on Tk they are made inside the template's Tcl proc, past the
+create_* hooks.
+
+    F12         toggle the hooks and the HUD
+    Shift-F12   start cProfile, or write a pstats snapshot of what it caught
+
+Setting SHIFT_REGISTER_INSTRUMENT=1 enables the hooks as each window opens
+(so create_diagram is timed too); =profile also starts the profiler. The
+window only imports this module then, or on the first F12.
+"""
+import os
+import time
+import tkinter as tk
+
+HOOKS = ("clock_pulse", "advance", "update_display", "repaint", "create_diagram")
+CANVAS_CREATE = ("create_line", "create_text", "create_rectangle", "create_polygon", "create_oval")
+CANVAS_CONFIGURE = ("itemconfig", "itemconfigure", "coords")
+HUD_INTERVAL_MS = 250     # HUD refresh period, also the timer-lag probe
+ENV_VARIABLE = "SHIFT_REGISTER_INSTRUMENT"
+
+
+class Histogram:
+    """Durations in power-of-two microsecond buckets: bucket k holds [2^(k-1), 2^k) us."""
+
+    def __init__(self):
+        self.buckets = []
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        k = int(seconds * 1e6).bit_length()
+        if k >= len(self.buckets):
+            self.buckets.extend([0] * (k + 1 - len(self.buckets)))
+        self.buckets[k] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """Upper bound, in seconds, of the bucket holding the given fraction of samples."""
+        rank = fraction * self.count
+        seen = 0
+        for k, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return (1 << k) / 1e6
+        return 0.0
+
+    def summary(self):
+        if not self.count:
+            return "-"
+        return (f"n={self.count:<7} mean {1000 * self.total / self.count:7.3f}  "
+                f"p50<{1000 * self.percentile(0.5):.3f}  p99<{1000 * self.percentile(0.99):.3f}  "
+                f"max {1000 * self.max:.3f} ms")
+
+
+class Instrumentation:
+    """Hooks, HUD and profiler for one ShiftRegisterGUI."""
+
+    def __init__(self, view):
+        self.view = view
+        self.enabled = False
+        self.timings = {}
+        self.lags = {}
+        self.created = 0
+        self.configured = 0
+        self.repaint_requested = None   # perf_counter() when update_display scheduled a repaint
+        self.hud_item = None
+        self.hud_after = None
+        self.hud_due = None             # perf_counter() when the HUD timer should fire
+        self.profiler = None
+        self.profile_dumps = 0
+        self.message = ""
+
+        setting = os.environ.get(ENV_VARIABLE, "")
+        if setting:
+            self.enable()
+            if setting == "profile":
+                self.profile()
+
+    # --- Hooks ---
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.timings = {name: Histogram() for name in HOOKS}
+        self.lags = {"repaint": Histogram(), "timer": Histogram()}
+        self.created = self.configured = 0
+        view, canvas = self.view, self.view.canvas
+        for name in HOOKS:
+            setattr(view, name, self._timed(name, getattr(view, name)))
+        for name in CANVAS_CREATE:
+            setattr(canvas, name, self._counted(getattr(canvas, name), "created"))
+        for name in CANVAS_CONFIGURE:
+            setattr(canvas, name, self._counted(getattr(canvas, name), "configured"))
+        # The HUD item is created on the first refresh, after the window finished drawing itself
+        self.hud_due = None
+        self.hud_after = view.master.after_idle(self.refresh_hud)
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        view, canvas = self.view, self.view.canvas
+        for name in HOOKS:
+            vars(view).pop(name, None)
+        for name in CANVAS_CREATE + CANVAS_CONFIGURE:
+            vars(canvas).pop(name, None)
+        if self.hud_after is not None:
+            view.master.after_cancel(self.hud_after)
+            self.hud_after = None
+        if self.hud_item is not None:
+            canvas.delete(self.hud_item)
+            self.hud_item = None
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler = None
+
+    def _timed(self, name, method):
+        histogram = self.timings[name]
+        view = self.view
+
+        if name == "update_display":
+            def wrapper(*args, **kwargs):
+                idle = view.redraw_pending is None
+                start = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    end = time.perf_counter()
+                    histogram.add(end - start)
+                    if idle and view.redraw_pending is not None:
+                        self.repaint_requested = end
+        elif name == "create_diagram":
+            def wrapper(*args, **kwargs):
+                created = self.created
+                start = time.perf_counter()
+                try:
+                    count = method(*args, **kwargs)
+                finally:
+                    histogram.add(time.perf_counter() - start)
+                self.created = created + count  # Whether or not the items went through the hooks
+                return count
+        elif name == "repaint":
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                if self.repaint_requested is not None:
+                    self.lags["repaint"].add(start - self.repaint_requested)
+                    self.repaint_requested = None
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    histogram.add(time.perf_counter() - start)
+        else:
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    histogram.add(time.perf_counter() - start)
+        return wrapper
+
+    def _counted(self, method, counter):
+        def wrapper(*args, **kwargs):
+            setattr(self, counter, getattr(self, counter) + 1)
+            return method(*args, **kwargs)
+        return wrapper
+
+    # --- HUD ---
+    def hud_text(self):
+        lines = [f"{name:<15} {self.timings[name].summary()}" for name in HOOKS]
+        lines.append(f"{'repaint lag':<15} {self.lags['repaint'].summary()}")
+        lines.append(f"{'timer lag':<15} {self.lags['timer'].summary()}")
+        lines.append(f"canvas items: {self.created} created, {self.configured} configured")
+        if self.profiler is not None:
+            lines.append("profiling (Shift-F12 writes a snapshot)")
+        if self.message:
+            lines.append(self.message)
+        return "\n".join(lines)
+
+    def refresh_hud(self):
+        """Redraws the HUD and measures how late this timer fired."""
+        if self.hud_due is not None:
+            self.lags["timer"].add(max(0.0, time.perf_counter() - self.hud_due))
+        canvas = self.view.canvas
+        Canvas = type(canvas)  # Unhooked methods, so the HUD does not count itself
+        try:
+            if self.hud_item is None:
+                self.hud_item = Canvas.create_text(canvas, 5, 5, anchor="nw", text="", fill="#000080",
+                                                   font=("Courier", 8))
+            Canvas.itemconfig(canvas, self.hud_item, text=self.hud_text())
+            canvas.tag_raise(self.hud_item)
+        except tk.TclError:
+            return  # The window was closed
+        self.hud_due = time.perf_counter() + HUD_INTERVAL_MS / 1000
+        self.hud_after = self.view.master.after(HUD_INTERVAL_MS, self.refresh_hud)
+
+    # --- Profiling ---
+    def profile(self):
+        """Starts the profiler, or writes a snapshot of it and keeps profiling."""
+        if self.profiler is None:
+            import cProfile
+            self.enable()
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+            self.message = "profiler started"
+        else:
+            self.message = f"profile written to {self.dump_profile()}"
+
+    def dump_profile(self, path=None):
+        """Writes the profile so far as a pstats file (cumulative top 20 on stdout); returns the path."""
+        import pstats
+        if path is None:
+            self.profile_dumps += 1
+            path = os.path.abspath(f"shift_register_{os.getpid()}_{self.profile_dumps}.prof")
+        self.profiler.disable()
+        stats = pstats.Stats(self.profiler)
+        stats.dump_stats(path)
+        stats.sort_stats("cumulative").print_stats(20)
+        self.profiler.enable()
+        return path
@@ -0,0 +1,204 @@
+"""
+Event-driven netlist of register engines.
+
+A Netlist wires engines together: serial out into the next register's serial
+input (cascaded 74HC595-style chains), Q bits into parallel inputs, and Q
+bits into clock enables for gated clocks. Registers are grouped on named
+clocks, and tick(clock, n) clocks every enabled register on that clock
+synchronously: all inputs are sampled from the states before the edge.
+
+Each cycle only registers on the event list are evaluated: the ones whose
+state changed in the cycle they were last clocked, or whose input nets
+changed since then. A register that did not change and whose inputs did
+not change would compute the same state again, so it is skipped; a long,
+mostly idle chain therefore costs time per cycle proportional to the
+registers that actually move, and nothing at all once it settles. Registers
+that are added, rewired or touched only join the list when a clock would
+change them (engine.steady()), and a register whose clock is gated off
+leaves the list until its enable bit changes.
+
+Engine cycle counters only count the cycles a register was evaluated;
+Netlist.cycles holds the ticks of each clock.
+"""
+from register_engine import create_engine
+
+
+class _Node:
+    """One register instance plus the wires into and out of it."""
+    __slots__ = ("name", "engine", "clock", "serial_driver", "parallel_wires", "parallel_base",
+                 "enable", "fanout")
+
+    def __init__(self, name, engine, clock):
+        self.name = name
+        self.engine = engine
+        self.clock = clock
+        self.serial_driver = None   # Node whose serial out feeds this serial input
+        self.parallel_wires = []    # (driver, src_lo, dst_lo, count)
+        self.parallel_base = 0      # Parallel input bits not driven by a wire
+        self.enable = None          # (driver, bit) gating the clock, or None
+        self.fanout = []            # (kind, node, src_lo, count) for wires leaving this register
+
+    def snapshot(self):
+        """Everything a clock can change: the state, plus PISO's pending load."""
+        return self.engine.state, getattr(self.engine, "load_shift_mode", None)
+
+
+class Netlist:
+    """
+    Registers, wires and clocks. Build it with add() and the connect_*()
+    methods, then drive it with tick(). After changing an engine by hand
+    (state, serial_in, mode...), call touch(name) so it is re-evaluated;
+    parallel inputs that no wire drives are set with set_parallel_in().
+    """
+    def __init__(self):
+        self.nodes = {}
+        self.cycles = {}     # Clock name -> ticks so far
+        self.pending = {}    # Clock name -> nodes on the event list of that clock
+        self.evaluations = 0  # Register evaluations, to check how idle the netlist is
+
+    def add(self, name, kind, num_bits=4, clock="clk"):
+        """Adds a register built from a type name ('SISO', 'PIPO'...) or an existing engine."""
+        if name in self.nodes:
+            raise ValueError(f"Duplicate register name: {name!r}")
+        engine = create_engine(kind, num_bits) if isinstance(kind, str) else kind
+        node = _Node(name, engine, clock)
+        node.parallel_base = getattr(engine, "parallel_in", 0)
+        self.nodes[name] = node
+        self.cycles.setdefault(clock, 0)
+        self.pending.setdefault(clock, set())
+        self._schedule(node)
+        return engine
+
+    def __getitem__(self, name):
+        return self.nodes[name].engine
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _node(self, name):
+        try:
+            return self.nodes[name]
+        except KeyError:
+            raise ValueError(f"Unknown register: {name!r}") from None
+
+    # --- Wiring ---
+    def connect_serial(self, source, target):
+        """Feeds source's serial out (Qn) into target's serial input."""
+        src, dst = self._node(source), self._node(target)
+        if dst.serial_driver is not None:
+            raise ValueError(f"{target!r} already has a serial input")
+        dst.serial_driver = src
+        src.fanout.append(("serial", dst, src.engine.num_bits - 1, 1))
+        self.touch(target)
+
+    def connect_parallel(self, source, target, src_lo=0, dst_lo=0, count=None):
+        """Drives target's parallel inputs D(dst_lo+1).. from source's Q(src_lo+1).. (count bits)."""
+        src, dst = self._node(source), self._node(target)
+        if not hasattr(dst.engine, "parallel_in"):
+            raise ValueError(f"{target!r} has no parallel inputs")
+        if count is None:
+            count = min(src.engine.num_bits - src_lo, dst.engine.num_bits - dst_lo)
+        if count < 1 or src_lo + count > src.engine.num_bits or dst_lo + count > dst.engine.num_bits:
+            raise ValueError("Parallel connection is outside the registers")
+        dst.parallel_wires.append((src, src_lo, dst_lo, count))
+        src.fanout.append(("parallel", dst, src_lo, count))
+        self.touch(target)
+
+    def connect_enable(self, source, bit, target):
+        """Gates target's clock with source's Q(bit+1): target only clocks while it is 1."""
+        src, dst = self._node(source), self._node(target)
+        if not 0 <= bit < src.engine.num_bits:
+            raise ValueError(f"{source!r} has no Q{bit + 1}")
+        dst.enable = (src, bit)
+        src.fanout.append(("enable", dst, bit, 1))
+        self.touch(target)
+
+    def chain(self, names):
+        """Daisy-chains registers: each one's serial out feeds the next one's serial input."""
+        for source, target in zip(names, names[1:]):
+            self.connect_serial(source, target)
+
+    def touch(self, name):
+        """Puts a register back on the event list after it was changed from outside."""
+        self._schedule(self._node(name))
+
+    def set_parallel_in(self, name, value):
+        """Sets the parallel input bits that no wire drives."""
+        node = self._node(name)
+        if not hasattr(node.engine, "parallel_in"):
+            raise ValueError(f"{name!r} has no parallel inputs")
+        node.parallel_base = value
+        self._schedule(node)
+
+    def _schedule(self, node):
+        """Adds node to the event list unless the next clock would leave it unchanged."""
+        if not node.engine.steady(*self._inputs(node)):
+            self.pending[node.clock].add(node)
+
+    # --- Simulation ---
+    def _inputs(self, node):
+        """Serial and parallel inputs of node, sampled from the current (pre-edge) states."""
+        serial = node.serial_driver.engine.serial_out if node.serial_driver is not None else None
+        parallel = None
+        if hasattr(node.engine, "parallel_in"):
+            parallel = node.parallel_base
+            for src, src_lo, dst_lo, count in node.parallel_wires:
+                field = ((1 << count) - 1) << dst_lo
+                parallel = (parallel & ~field) | (src.engine.window(src_lo, count) << dst_lo)
+        return serial, parallel
+
+    def tick(self, clock="clk", n=1):
+        """Clocks every enabled register on clock n times; returns the number of evaluations."""
+        if clock not in self.pending:
+            raise ValueError(f"Unknown clock: {clock!r}")
+        pending = self.pending
+        evaluations = 0
+        for _ in range(n):
+            active = pending[clock]
+            if not active:
+                break  # Settled: the remaining cycles cannot change anything
+            edge = []
+            for node in active:
+                if node.enable is not None:
+                    driver, bit = node.enable
+                    if not driver.engine.bit(bit):
+                        continue  # Off the list; a change of the enable bit schedules it again
+                edge.append((node, self._inputs(node)))
+            pending[clock] = set()
+
+            # Clock edge: every input was sampled before any state moves
+            changed = []
+            for node, (serial, parallel) in edge:
+                engine = node.engine
+                before = node.snapshot()
+                watched = [engine.window(lo, count) for _, _, lo, count in node.fanout]
+                if serial is not None:
+                    engine.serial_in = serial
+                if parallel is not None:
+                    engine.parallel_in = parallel
+                engine.step(1)
+                streaming = engine.input_source is not None and engine.input_source.peek() is not None
+                if node.snapshot() != before or streaming:
+                    changed.append((node, watched))
+            evaluations += len(edge)
+
+            # Schedule the registers whose own state or input nets changed
+            for node, watched in changed:
+                pending[node.clock].add(node)
+                engine = node.engine
+                for old, (_, dst, lo, count) in zip(watched, node.fanout):
+                    if engine.window(lo, count) != old:
+                        pending[dst.clock].add(dst)
+        self.cycles[clock] += n
+        self.evaluations += evaluations
+        return evaluations
+
+
+def cascade(kind, count, num_bits=8, clock="clk", prefix="U"):
+    """Builds a daisy chain of count registers named U1..Un on a shared clock, like cascaded 74HC595s."""
+    netlist = Netlist()
+    names = [f"{prefix}{i + 1}" for i in range(count)]
+    for name in names:
+        netlist.add(name, kind, num_bits, clock)
+    netlist.chain(names)
+    return netlist
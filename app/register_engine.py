@@ -0,0 +1,462 @@
+"""
+Headless simulation engine for the shift register simulator.
+
+The register state is stored as one packed integer: bit i holds Q(i+1), so
+Q1 (the flip-flop fed by the serial input) is the least significant bit and
+Qn (the serial output) is the most significant one. Advancing n cycles is a
+single shift-and-mask, which keeps the engine usable for millions of cycles
+without Tkinter and without allocating a list per clock.
+
+Serial input comes from explicit step() arguments, from a streaming
+`input_source` (see bit_stream.py), or from the constant `serial_in` bit.
+
+The universal register's rotate and LFSR modes are linear over GF(2); they
+jump ahead N cycles with powers of the w x w transition matrix (rows packed
+as ints), cached per mode and taps, in O(w^3 log N).
+"""
+
+
+def pack_bits(bits):
+    """Packs a sequence of 0/1 values (or a '0'/'1' string) into an int, first bit as MSB."""
+    if isinstance(bits, str):
+        return int(bits, 2) if bits else 0
+    value = 0
+    for b in bits:
+        value = (value << 1) | (int(b) & 1)
+    return value
+
+
+def list_to_state(bits):
+    """Converts a [Q1, Q2, ...] list into a packed state (Q1 is bit 0)."""
+    state = 0
+    for i, b in enumerate(bits):
+        if int(b):
+            state |= 1 << i
+    return state
+
+
+def state_to_list(state, num_bits):
+    """Converts a packed state back into a [Q1, Q2, ...] list."""
+    return [(state >> i) & 1 for i in range(num_bits)]
+
+
+def reverse_bits(value, n):
+    """Reverses the order of the low n bits of value."""
+    return int(format(value, f"0{n}b")[::-1], 2) if n else 0
+
+
+def parity(value):
+    return bin(value).count("1") & 1
+
+
+# --- GF(2) matrices: a list of row masks, new bit i = parity(rows[i] & state) ---
+def gf2_apply(rows, state):
+    value = 0
+    for i, row in enumerate(rows):
+        if parity(row & state):
+            value |= 1 << i
+    return value
+
+
+def gf2_multiply(a, b):
+    """Rows of the product a·b (apply b first, then a)."""
+    product = []
+    for row in a:
+        combined = 0
+        j = 0
+        while row:
+            if row & 1:
+                combined ^= b[j]
+            row >>= 1
+            j += 1
+        product.append(combined)
+    return product
+
+
+# --- 1. ABSTRACT ENGINE ---
+class RegisterEngine:
+    """
+    Tk-free base class holding the packed register state.
+    Children implement step(), the multi-cycle clock.
+    """
+    kind = None
+
+    def __init__(self, num_bits=4):
+        if num_bits < 1:
+            raise ValueError("num_bits must be at least 1")
+        self.num_bits = num_bits
+        self.mask = (1 << num_bits) - 1
+        self.state = 0
+        self.cycle = 0
+        self.serial_in = 0       # Used for cycles with no other input bit
+        self.input_source = None # Optional bit_stream source feeding the serial input
+        self.recorder = None     # Optional trace_recorder.TraceRecorder notified of every cycle
+        self.history = None      # Optional history.History logging cycles for rewind/seek
+
+    def reset(self):
+        self.state = 0
+        self.cycle = 0
+        if self.recorder is not None:
+            self.recorder.attach(self)  # Restart the trace from the reset state
+        if self.history is not None:
+            self.history.attach(self)
+
+    @property
+    def bits(self):
+        """The register as a [Q1, Q2, ...] list (allocates; meant for display and tests)."""
+        return state_to_list(self.state, self.num_bits)
+
+    @bits.setter
+    def bits(self, values):
+        self.state = list_to_state(values) & self.mask
+
+    def bit(self, i):
+        """Returns Q(i+1) without unpacking the whole register."""
+        return (self.state >> i) & 1
+
+    def window(self, lo, count):
+        """Returns Q(lo+1)..Q(lo+count) packed with Q(lo+1) as bit 0, for views of wide registers."""
+        return (self.state >> lo) & ((1 << count) - 1)
+
+    @property
+    def serial_out(self):
+        return (self.state >> (self.num_bits - 1)) & 1
+
+    def _input_chunk(self, n, input_bits, default_bit):
+        """
+        Normalizes input_bits to an n-bit packed chunk, first bit as MSB.
+        Without input_bits the chunk is read from input_source. Short input
+        is padded with default_bit for the remaining cycles.
+        """
+        if input_bits is None and self.input_source is not None:
+            value, count = self.input_source.read(n)
+            chunk = value << (n - count)
+            if default_bit and count < n:
+                chunk |= self.mask_for(n - count)
+            return chunk
+        if input_bits is None:
+            return self.mask_for(n) if default_bit else 0
+        if isinstance(input_bits, int):
+            return input_bits & self.mask_for(n)
+        count = len(input_bits)
+        if count > n:
+            input_bits = input_bits[:n]
+            count = n
+        chunk = pack_bits(input_bits) << (n - count)
+        if default_bit and count < n:
+            chunk |= self.mask_for(n - count)
+        return chunk
+
+    def next_input_bit(self):
+        """The bit the next shift cycle will take from input_source or serial_in."""
+        if self.input_source is not None:
+            bit = self.input_source.peek()
+            if bit is not None:
+                return bit
+        return self.serial_in
+
+    @staticmethod
+    def mask_for(n):
+        return (1 << n) - 1
+
+    def _shift(self, n, chunk):
+        """Shifts n bits of chunk in at Q1 and returns the n bits that left Qn (first out as MSB)."""
+        if self.recorder is not None:
+            self.recorder.record_shift(self.state, n, chunk)
+        if self.history is not None:
+            self.history.log_shift(self.state, n, chunk)
+        full = (self.state << n) | chunk
+        self.state = full & self.mask
+        self.cycle += n
+        return full >> self.num_bits
+
+    def _load(self, n, value):
+        """n cycles that each load value into the register."""
+        if self.history is not None:
+            self.history.log_load(n, value & self.mask)
+        self.state = value & self.mask
+        self.cycle += n
+        if self.recorder is not None:
+            self.recorder.record_repeat(self.state, n)
+
+    def step(self, n=1, input_bits=None):
+        raise NotImplementedError("Subclass must implement step")
+
+    def steady(self, serial_in=None, parallel_in=None):
+        """
+        Whether the next clock would leave the register unchanged, with the
+        given inputs or the engine's own; lets netlist.Netlist skip idle
+        registers without clocking them.
+        """
+        raise NotImplementedError("Subclass must implement steady")
+
+    def _shift_steady(self, serial_in):
+        """A shift leaves the state alone only when every flip-flop already holds the incoming bit."""
+        if self.input_source is not None and self.input_source.peek() is not None:
+            return False
+        bit = self.serial_in if serial_in is None else serial_in
+        return self.state == (self.mask if bit else 0)
+
+
+# --- 2. SERIAL IN, SERIAL OUT (SISO) ---
+class SISO_Engine(RegisterEngine):
+    """
+    Serial-in shift register. Each cycle Q1 takes the serial input and
+    every other flip-flop takes its left neighbour.
+    """
+    kind = "SISO"
+
+    def step(self, n=1, input_bits=None):
+        """
+        Advances n cycles. input_bits is a '0'/'1' string, a bit sequence, or
+        an n-bit packed int (first bit as MSB); without it bits come from
+        input_source, and missing bits use serial_in.
+        Returns the bits shifted out of Qn, packed with the first out as MSB.
+        """
+        if n <= 0:
+            return 0
+        return self._shift(n, self._input_chunk(n, input_bits, self.serial_in))
+
+    def steady(self, serial_in=None, parallel_in=None):
+        return self._shift_steady(serial_in)
+
+
+# --- 3. SERIAL IN, PARALLEL OUT (SIPO) ---
+class SIPO_Engine(SISO_Engine):
+    """Same shifting as SISO; only the way outputs are observed differs."""
+    kind = "SIPO"
+
+
+# --- 4. PARALLEL IN, SERIAL OUT (PISO) ---
+class PISO_Engine(RegisterEngine):
+    """
+    Parallel-load register. In Load mode the next clock copies parallel_in
+    into the register and switches to Shift mode; later clocks shift serial_in.
+    """
+    kind = "PISO"
+
+    def __init__(self, num_bits=4):
+        super().__init__(num_bits)
+        self.parallel_in = 0
+        self.load_shift_mode = "Load"
+
+    def reset(self):
+        self.load_shift_mode = "Load"  # Before the base reset restarts the history, which snapshots the mode
+        super().reset()
+
+    def step(self, n=1, input_bits=None):
+        """
+        Advances n cycles. A pending load consumes the first cycle; the rest
+        shift input_bits (or serial_in). Returns the bits shifted out of Qn.
+        """
+        if n <= 0:
+            return 0
+        if self.load_shift_mode == "Load":
+            self._load(1, self.parallel_in)
+            self.load_shift_mode = "Shift"
+            n -= 1
+            if n == 0:
+                return 0
+            if input_bits is not None and not isinstance(input_bits, int):
+                input_bits = input_bits[1:]
+        return self._shift(n, self._input_chunk(n, input_bits, self.serial_in))
+
+    def steady(self, serial_in=None, parallel_in=None):
+        return self.load_shift_mode == "Shift" and self._shift_steady(serial_in)
+
+
+# --- 5. PARALLEL IN, PARALLEL OUT (PIPO) ---
+class PIPO_Engine(RegisterEngine):
+    """Every clock copies parallel_in into the register, so n cycles cost one load."""
+    kind = "PIPO"
+
+    def __init__(self, num_bits=4):
+        super().__init__(num_bits)
+        self.parallel_in = 0
+
+    def step(self, n=1, input_bits=None):
+        if n <= 0:
+            return 0
+        self._load(n, self.parallel_in)
+        return 0
+
+    def steady(self, serial_in=None, parallel_in=None):
+        value = self.parallel_in if parallel_in is None else parallel_in
+        return value & self.mask == self.state
+
+
+# --- 6. UNIVERSAL SHIFT REGISTER ---
+UNIVERSAL_MODES = ("Shift Right", "Shift Left", "Rotate Right", "Rotate Left",
+                   "Fibonacci LFSR", "Galois LFSR", "Parallel Load")
+LFSR_MODES = ("Fibonacci LFSR", "Galois LFSR")
+MAX_JUMP_WIDTH = 512  # Widest LFSR the front ends jump: the first jump squares w x w matrices, about 1 s at 512
+
+
+class Universal_Engine(RegisterEngine):
+    """
+    Universal shift register. Shift Right is the SISO shift (serial input into
+    Q1, out of Qn); Shift Left feeds Qn and shifts toward Q1; the rotates feed
+    the end bit back around; Parallel Load copies parallel_in like PIPO.
+
+    The LFSR modes take taps as flip-flop numbers, e.g. (16, 14, 13, 11) for
+    x^16 + x^14 + x^13 + x^11 + 1. Fibonacci XORs the tapped Q outputs into
+    Q1; Galois feeds Qn into Q1 and XORs it into the stages the same
+    polynomial gives, so both modes share a tap list and a period.
+    """
+    kind = "UNIVERSAL"
+
+    def __init__(self, num_bits=4):
+        super().__init__(num_bits)
+        self.parallel_in = 0
+        self.mode = "Shift Right"
+        self.set_taps((num_bits, num_bits - 1) if num_bits > 1 else (1,))
+        self.matrix_powers = {}  # transition key -> [M, M^2, M^4, ...]
+
+    def set_taps(self, taps):
+        """Sets the LFSR taps from flip-flop numbers 1..num_bits."""
+        taps = sorted(set(int(t) for t in taps), reverse=True)
+        if not taps or taps[-1] < 1 or taps[0] > self.num_bits:
+            raise ValueError(f"Taps must be flip-flop numbers from 1 to {self.num_bits}.")
+        self.taps = tuple(taps)
+        self.fibonacci_mask = sum(1 << (t - 1) for t in taps)
+        self.galois_mask = sum(1 << (self.num_bits - t) for t in taps)
+
+    @property
+    def key(self):
+        """Transition key of the current mode, as logged by history.History."""
+        if self.mode == "Fibonacci LFSR":
+            return (self.mode, self.fibonacci_mask)
+        if self.mode == "Galois LFSR":
+            return (self.mode, self.galois_mask)
+        return (self.mode, 0)
+
+    # --- Transitions ---
+    def transition_matrix(self, key):
+        mode, taps = key
+        w = self.num_bits
+        if mode == "Fibonacci LFSR":
+            return [taps] + [1 << (i - 1) for i in range(1, w)]
+        top = 1 << (w - 1)
+        return [(1 << (i - 1) if i else 0) | (top if (taps >> i) & 1 else 0) for i in range(w)]
+
+    def _lfsr_jump(self, key, state, k):
+        """M^k · state using cached squarings of the transition matrix."""
+        powers = self.matrix_powers.setdefault(key, [self.transition_matrix(key)])
+        i = 0
+        while k:
+            if i == len(powers):
+                powers.append(gf2_multiply(powers[-1], powers[-1]))
+            if k & 1:
+                state = gf2_apply(powers[i], state)
+            k >>= 1
+            i += 1
+        return state
+
+    def run_state(self, key, state, k, chunk=0):
+        """
+        State after k cycles of transition key, fed chunk (k bits, first bit
+        as MSB; only the last num_bits matter) in the shift modes.
+        """
+        mode, taps = key
+        w, mask = self.num_bits, self.mask
+        if k <= 0:
+            return state
+        if mode == "Shift Right":
+            return chunk & mask if k >= w else ((state << k) | chunk) & mask
+        if mode == "Shift Left":
+            if k >= w:
+                return reverse_bits(chunk & mask, w)
+            return (state >> k) | (reverse_bits(chunk, k) << (w - k))
+        if mode == "Rotate Right":
+            r = k % w
+            return ((state << r) | (state >> (w - r))) & mask
+        if mode == "Rotate Left":
+            r = k % w
+            return ((state >> r) | (state << (w - r))) & mask
+        if k > 2 * w:
+            return self._lfsr_jump(key, state, k)
+        top = w - 1
+        if mode == "Fibonacci LFSR":
+            for _ in range(k):
+                state = ((state << 1) | parity(state & taps)) & mask
+        else:
+            for _ in range(k):
+                state = ((state << 1) & mask) ^ (taps if state >> top else 0)
+        return state
+
+    def step(self, n=1, input_bits=None):
+        """
+        Advances n cycles in the current mode. The shift modes read input_bits,
+        input_source or serial_in like SISO; Shift Right returns the bits that
+        left Qn, the other modes return 0.
+        """
+        if n <= 0:
+            return 0
+        if self.mode == "Shift Right":
+            return self._shift(n, self._input_chunk(n, input_bits, self.serial_in))
+        if self.mode == "Parallel Load":
+            self._load(n, self.parallel_in)
+            return 0
+        if self.mode not in UNIVERSAL_MODES:
+            raise ValueError(f"Unknown mode: {self.mode!r}")
+        reads_input = self.mode == "Shift Left"
+        chunk = self._input_chunk(n, input_bits, self.serial_in) if reads_input else 0
+        self._run(n, self.key, chunk, reads_input)
+        return 0
+
+    def steady(self, serial_in=None, parallel_in=None):
+        if self.mode == "Parallel Load":
+            value = self.parallel_in if parallel_in is None else parallel_in
+            return value & self.mask == self.state
+        if self.mode in ("Shift Right", "Shift Left"):
+            return self._shift_steady(serial_in)
+        return self.run_state(self.key, self.state, 1) == self.state
+
+    def _run(self, n, key, chunk, reads_input):
+        old_state = self.state
+        if self.history is not None:
+            self.history.log_run(n, key, old_state, chunk, reads_input)
+        if self.recorder is not None:  # The trace needs every intermediate state
+            state, top = old_state, self.num_bits - 1
+            for k in range(1, n + 1):
+                bit = (chunk >> (n - k)) & 1 if reads_input else 0
+                state = self.run_state(key, state, 1, bit)
+                self.recorder.record(state, bit, state >> top)
+        self.state = self.run_state(key, old_state, n, chunk)
+        self.cycle += n
+
+    def jump(self, n):
+        """
+        Jumps n cycles ahead without stepping through them (shift modes use
+        the constant serial_in). The trace and history restart at the target.
+        """
+        if n < 0:
+            raise ValueError("Cannot jump backwards; use history.History.seek")
+        if self.mode == "Parallel Load":
+            if n:
+                self.state = self.parallel_in & self.mask
+        else:
+            fill = self.mask_for(min(n, self.num_bits)) if self.serial_in else 0
+            self.state = self.run_state(self.key, self.state, n, fill)
+        self.cycle += n
+        if self.recorder is not None:
+            self.recorder.attach(self)
+        if self.history is not None:
+            self.history.attach(self)
+
+
+ENGINE_TYPES = {
+    "SISO": SISO_Engine,
+    "SIPO": SIPO_Engine,
+    "PISO": PISO_Engine,
+    "PIPO": PIPO_Engine,
+    "UNIVERSAL": Universal_Engine,
+}
+
+
+def create_engine(kind, num_bits=4):
+    """Builds an engine from its short type name ('SISO', 'SIPO', 'PISO', 'PIPO' or 'UNIVERSAL')."""
+    try:
+        return ENGINE_TYPES[kind.upper()](num_bits)
+    except KeyError:
+        raise ValueError(f"Unknown register type: {kind!r}") from None
@@ -1,44 +1,222 @@
+import os
+import re
 import tkinter as tk
-from tkinter import messagebox
+from collections import namedtuple
+from functools import lru_cache
+
+from bit_stream import StringBitSource, open_bit_source
+from free_run import FreeRunClock
+from register_engine import (SISO_Engine, SIPO_Engine, PISO_Engine, PIPO_Engine, Universal_Engine,
+                             UNIVERSAL_MODES, LFSR_MODES, MAX_JUMP_WIDTH, list_to_state)
+
+# --- Viewport Parameters ---
+MAX_CANVAS_WIDTH = 1000  # Wider registers scroll through a fixed pool of flip-flop drawings
+CHECKBUTTON_LIMIT = 16   # Wider registers take parallel data from an entry instead of one checkbutton per bit
+STRIP_COLUMNS = 256      # Columns of the zoomed-out density strip
+MAX_JUMP_BITS = 256      # Jumps stay below 2^256 cycles, so parsing one cannot build a huge number
+
+
+def _blend(color_a, color_b, t):
+    """Linear blend between two #RRGGBB colors."""
+    a = [int(color_a[k:k + 2], 16) for k in (1, 3, 5)]
+    b = [int(color_b[k:k + 2], 16) for k in (1, 3, 5)]
+    return "#" + "".join(f"{round(x + (y - x) * t):02X}" for x, y in zip(a, b))
+
+# Density strip palette: all 0s (box color) to all 1s (Q label color)
+STRIP_SHADES = [_blend("#F0F8FF", "#DC143C", k / 15) for k in range(16)]
+
+
+def iter_set_bits(mask):
+    """Yields the positions of the 1 bits in mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+# --- Diagram Templates ---
+# Canvas item ids a window keeps for repaints: lists of per-slot items, and single items
+ITEM_LISTS = ("ff_labels", "q_output_labels", "d_input_labels", "tap_labels")
+ITEM_IDS = ("input_label_id", "output_label_id", "input_caption_id", "output_caption_id")
+_TCL_PLAIN = re.compile(r"[\w.#+-]+")
+_TCL_SPECIAL = re.compile(r'[\\{}\[\]$";\s]')
+
+DiagramTemplate = namedtuple("DiagramTemplate", "items proc_name proc_body lists ids box_centers")
+
+
+class _RecordingCanvas:
+    """Stands in for the canvas while draw_diagram() is recorded; item ids are indices into items."""
+
+    def __init__(self):
+        self.items = []
+
+    def _create(self, kind, coords, options):
+        self.items.append((kind, coords, options))
+        return len(self.items) - 1
+
+    def create_line(self, *coords, **options):
+        return self._create("line", coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._create("text", coords, options)
+
+    def create_rectangle(self, *coords, **options):
+        return self._create("rectangle", coords, options)
+
+    def create_polygon(self, *coords, **options):
+        return self._create("polygon", coords, options)
+
+
+def _tcl_word(value):
+    """Quotes a coordinate or option value as one Tcl word; tuples (fonts, tags) become Tcl lists."""
+    if isinstance(value, (tuple, list)):
+        value = " ".join(_tcl_word(v) for v in value)
+    text = str(value)
+    if _TCL_PLAIN.fullmatch(text):
+        return text
+    if "{" in text or "}" in text or "\\" in text:
+        return _TCL_SPECIAL.sub(lambda m: "\\n" if m.group() == "\n" else "\\" + m.group(), text)
+    return "{" + text + "}"
+
+
+@lru_cache(maxsize=64)
+def diagram_template(register_class, visible_bits, scrolls):
+    """
+    Records register_class.draw_diagram() for a viewport of visible_bits
+    slots (scrolls: the register is wider than the viewport) as a list of
+    items tagged "detail", plus which of them the window keeps ids of.
+    Windows of the same type and viewport share it, so only the first one
+    runs the drawing code.
+    """
+    view = register_class.__new__(register_class)
+    view.visible_bits = visible_bits
+    view.num_bits = visible_bits + scrolls
+    view.canvas = _RecordingCanvas()
+    view.box_centers = []
+    for name in ITEM_LISTS:
+        setattr(view, name, [])
+    view.draw_diagram()
+    items = tuple((kind, coords, {**options, "tags": ("detail",)}) for kind, coords, options in view.canvas.items)
+    # The same items as a Tcl proc that creates them on canvas $c and returns their ids, so Tk
+    # parses the template once and each window makes its whole diagram in one call
+    creates = (" ".join(["[$c create", kind, *map(_tcl_word, coords)] + [f"-{k} {_tcl_word(v)}" for k, v in options.items()]) + "]"
+               for kind, coords, options in items)
+    proc_name = f"::shift_register_diagram_{register_class.__name__}_{visible_bits}_{int(scrolls)}"
+    return DiagramTemplate(items, proc_name, "list " + " ".join(creates),
+                           {name: tuple(getattr(view, name)) for name in ITEM_LISTS},
+                           {name: getattr(view, name, None) for name in ITEM_IDS},
+                           tuple(view.box_centers))
+
 
 # --- 1. ABSTRACT PARENT CLASS ---
 class ShiftRegisterGUI:
     """
     Parent class for all shift register simulations.
-    Handles basic Tkinter setup, common drawing utilities, and register state.
+    Handles basic Tkinter setup and common drawing utilities. The register
+    state itself lives in a headless engine (see register_engine.py); this
+    class and its children are thin views over it.
+
+    Only the flip-flops that fit in the viewport are drawn. Children draw a
+    fixed pool of slots, and scrolling relabels those slots instead of
+    creating items, so canvas size and draw time do not grow with num_bits.
+
+    update_display() only schedules a repaint. The repaint runs once per idle
+    moment, diffs the visible Q bits against the previous repaint and touches
+    only the canvas items whose text actually changes.
     """
+    engine_class = None  # Set by children to the matching register_engine class
+
+    # --- Common Layout Parameters ---
+    y_center = 150
+    y_box_top = y_center - 40
+    y_box_bot = y_center + 40
+    box_width = 80
+    box_spacing = 60 # Increased spacing for clarity
+    x_start = 60
+    ff_label_dy = -15  # "FF n" label above the box; PISO/PIPO put it inside
+    history_interval = None            # Cycles between seek checkpoints; None scales with the width
+    history_budget = None              # Bytes of rewind history kept, older cycles dropped; None uses history's default
+
     # FIX: Use __init__ instead of _init_
-    def __init__(self, master, title, num_bits=4):
+    def __init__(self, master, title, num_bits=4, engine=None):
         self.master = master
         self.master.title(title)
-        self.num_bits = num_bits
-        self.register = [0] * num_bits  # Stores the state of Q1, Q2, Q3, Q4...
+        # Packed state of Q1, Q2, Q3, Q4...; an existing engine makes the window a live view of it
+        self.engine = engine if engine is not None else self.engine_class(num_bits)
+        self.num_bits = num_bits = self.engine.num_bits
+        self.history = None                        # Behind the seek slider, from attach_features() on
+        self.timing = None
+        self.instrumentation = None                # F12 HUD, see instrument()
+        self.seek_scale = None
+        self.shown_seek = None                     # (base, head, cycle) last written to the slider
 
-        # Lists to hold Tkinter canvas IDs for dynamic updating
+        # Lists to hold Tkinter canvas IDs for dynamic updating (one entry per visible slot)
         self.d_input_labels = []
         self.q_output_labels = []
+        self.ff_labels = []
         self.box_centers = []  # To align the clock line taps
+        self.strip_columns = []
+        self.strip_caption_id = None
+        self.scrollbar = None
+
+        # --- Render State ---
+        self.redraw_pending = None  # after_idle id while a repaint is scheduled
+        self.shown_items = {}       # (item, option) -> value last written to the canvas
+        self.shown_window = None    # (view_offset, window) painted by the last repaint
+        self.view_window = 0        # Visible Q bits, slot 0 as bit 0 (valid during a repaint)
+        self.view_changes = 0       # Slots whose Q changed since the last repaint
 
-        # --- Common Layout Parameters ---
-        self.y_center = 150
-        self.y_box_top = self.y_center - 40
-        self.y_box_bot = self.y_center + 40
-        self.box_width = 80
-        self.box_spacing = 60 # Increased spacing for clarity
-        self.x_start = 60
+        # --- Viewport State ---
+        self.view_offset = 0  # Index of the flip-flop drawn in the first slot
+        self.zoom_level = 0   # 0 draws flip-flops; higher levels draw a density strip
 
-        # Calculate canvas width based on number of bits
-        canvas_width = self.x_start * 2 + (self.num_bits * self.box_width) + ((self.num_bits -1) * self.box_spacing) + 100
+        # Number of flip-flop slots that fit in the viewport
+        pitch = self.box_width + self.box_spacing
+        max_slots = max(1, (MAX_CANVAS_WIDTH - self.x_start * 2 - 100 + self.box_spacing) // pitch)
+        self.visible_bits = min(self.num_bits, max_slots)
+
+        # Calculate canvas width based on number of visible bits
+        self.canvas_width = self.x_start * 2 + (self.visible_bits * self.box_width) + ((self.visible_bits - 1) * self.box_spacing) + 100
         
         # Initialize the main frames
         self.create_controls_frame()
-        self.canvas = tk.Canvas(self.master, width=canvas_width, height=350, bg="#E6E6FA")  # Lavender background
+        self.create_status_bar()
+        self.free_run = FreeRunClock(self, self.master)
+        self.canvas = tk.Canvas(self.master, width=self.canvas_width, height=350, bg="#E6E6FA")  # Lavender background
         self.canvas.pack(pady=10, padx=10)
+        self.master.bind("<F12>", lambda event: self.instrument().toggle())
+        self.master.bind("<Shift-F12>", lambda event: self.instrument().profile())
+        if os.environ.get("SHIFT_REGISTER_INSTRUMENT"):
+            self.instrument()  # Before create_diagram, so it is timed too
+        if self.num_bits > self.visible_bits:
+            self.create_view_controls()
 
         # Initialization methods (must be defined in children)
         self.create_specific_controls(self.top)
-        self.draw_diagram()
+        self.create_seek_controls(self.top)
+        self.create_diagram()
+        self.sync_controls()
         self.update_display()
+        self.master.after_idle(self.attach_features)  # Queued behind the first repaint
+
+    def attach_features(self):
+        """Seek history and the timing-diagram pane, imported once the first frame is painted."""
+        from history import DEFAULT_BUDGET, History
+        from timing_diagram import TimingDiagram
+        try:
+            self.timing = TimingDiagram(self, self.master)
+        except tk.TclError:
+            return  # The window was closed before the first frame
+        self.history = History(self.history_interval, budget=self.history_budget or DEFAULT_BUDGET)
+        self.history.attach(self.engine)
+        self.update_display()
+
+    def instrument(self):
+        """The window's Instrumentation, imported on first use; its hooks cost nothing until enabled."""
+        if self.instrumentation is None:
+            from instrumentation import Instrumentation
+            self.instrumentation = Instrumentation(self)
+        return self.instrumentation
 
     def create_controls_frame(self):
         """Creates the frame for controls, common to all register types."""
@@ -47,14 +225,100 @@ class ShiftRegisterGUI:
         tk.Button(self.top, text="Close Simulation", command=self.master.destroy,
                   bg="#FF6347", fg="white", activebackground="#CD5C5C").pack(side=tk.RIGHT, padx=15)
 
+    def create_status_bar(self):
+        """Non-modal messages (mode changes, stopped runs) along the bottom of the window."""
+        self.status_label = tk.Label(self.master, text="", anchor="w", bg="#DCDCDC", relief=tk.SUNKEN, padx=5)
+        self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
+
+    def set_status(self, text):
+        self.status_label.config(text=text)
+
+    def create_view_controls(self):
+        """Scrollbar and zoom buttons, only shown when the register is wider than the viewport."""
+        bar = tk.Frame(self.master, padx=10, pady=5, bg="#DCDCDC")
+        bar.pack(fill=tk.X, padx=10, pady=(0, 10))
+        tk.Button(bar, text="Zoom Out", command=lambda: self.set_zoom(self.zoom_level + 1), bg="#A9A9A9").pack(side=tk.LEFT, padx=5)
+        tk.Button(bar, text="Zoom In", command=lambda: self.set_zoom(self.zoom_level - 1), bg="#A9A9A9").pack(side=tk.LEFT, padx=5)
+        self.view_label = tk.Label(bar, text="", bg="#DCDCDC", width=36, anchor="w")
+        self.view_label.pack(side=tk.LEFT, padx=10)
+        self.scrollbar = tk.Scrollbar(bar, orient=tk.HORIZONTAL, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+    def create_parallel_controls(self, parent_frame):
+        """Parallel data inputs: one checkbutton per bit for narrow registers, a bit-string entry otherwise."""
+        tk.Label(parent_frame, text="Parallel Data:", bg="#DCDCDC").pack(side=tk.LEFT, padx=(5, 10))
+        self.parallel_vars = []
+        if self.num_bits <= CHECKBUTTON_LIMIT:
+            parallel = self.engine.parallel_in
+            self.parallel_vars = [tk.StringVar(value=str((parallel >> i) & 1)) for i in range(self.num_bits)]
+            for i in range(self.num_bits):
+                tk.Checkbutton(parent_frame, text=f"D{i+1}", variable=self.parallel_vars[i], onvalue='1', offvalue='0',
+                               command=self.on_parallel_change, bg="#DCDCDC").pack(side=tk.LEFT)
+        else:
+            self.parallel_entry = tk.Entry(parent_frame, width=16)
+            self.parallel_entry.pack(side=tk.LEFT, padx=5)
+            tk.Button(parent_frame, text="Set", command=self.on_parallel_change, bg="#A9A9A9").pack(side=tk.LEFT, padx=5)
+
+    def on_parallel_change(self):
+        """Copies the parallel data controls into the engine's parallel input."""
+        if self.parallel_vars:
+            self.engine.parallel_in = list_to_state(var.get() for var in self.parallel_vars)
+        else:
+            bits = self.parallel_entry.get().strip()
+            if not bits or len(bits) > self.num_bits or not all(b in "01" for b in bits):
+                from tkinter import messagebox
+                messagebox.showerror("Invalid Input", f"Parallel data must be 1 to {self.num_bits} 0s and 1s, D1 first.")
+                return
+            self.engine.parallel_in = list_to_state(bits)
+        self.update_display()
+
+    def sync_parallel_controls(self):
+        """Copies the engine's parallel input back into the checkbuttons, e.g. after a control-server load."""
+        parallel = self.engine.parallel_in
+        for i, var in enumerate(self.parallel_vars):
+            bit = str((parallel >> i) & 1)
+            if var.get() != bit:
+                var.set(bit)
+
+    def create_diagram(self):
+        """
+        Creates the canvas items of draw_diagram() from the cached template for
+        this type and viewport; returns how many it created.
+        """
+        template = diagram_template(type(self), self.visible_bits, self.num_bits > self.visible_bits)
+        canvas = self.canvas
+        if hasattr(canvas, "tk"):
+            try:
+                result = canvas.tk.call(template.proc_name, str(canvas))
+            except tk.TclError:  # First window of this layout in this Tcl interpreter
+                canvas.tk.call("proc", template.proc_name, "c", template.proc_body)
+                result = canvas.tk.call(template.proc_name, str(canvas))
+            ids = [int(item) for item in canvas.tk.splitlist(result)]
+        else:
+            ids = [getattr(canvas, "create_" + kind)(*coords, **options) for kind, coords, options in template.items]
+        for name, indices in template.lists.items():
+            if hasattr(self, name):
+                setattr(self, name, [ids[k] for k in indices])
+        for name, index in template.ids.items():
+            if index is not None:
+                setattr(self, name, ids[index])
+        self.box_centers = list(template.box_centers)
+        return len(ids)
+
+    def slot_x(self, slot):
+        """Left edge of the flip-flop box drawn in the given slot."""
+        return self.x_start + slot * (self.box_width + self.box_spacing)
+
     def draw_flip_flop(self, i, x_pos):
         """Helper function to draw a single Flip-Flop box."""
         box_x1 = x_pos
         box_x2 = box_x1 + self.box_width
         self.canvas.create_rectangle(box_x1, self.y_box_top, box_x2, self.y_box_bot,
                                      outline="#4682B4", width=2, fill="#F0F8FF")
-        self.canvas.create_text((box_x1 + box_x2) / 2, self.y_box_top - 15,
-                                text=f"FF {i + 1}", fill="#4682B4", font=("Arial", 10, "bold"))
+        self.ff_labels.append(
+            self.canvas.create_text((box_x1 + box_x2) / 2, self.y_box_top + self.ff_label_dy,
+                                    text=f"FF {i + 1}", fill="#4682B4", font=("Arial", 10, "bold"))
+        )
         self.box_centers.append((box_x1 + box_x2) / 2)
         return box_x1, box_x2
 
@@ -74,6 +338,146 @@ class ShiftRegisterGUI:
                                        center_x - 6, self.y_box_bot + 20, fill="#800080")
             self.canvas.create_line(center_x, self.y_box_bot + 20, center_x, clock_y, fill="#800080", width=1)
 
+    # --- VIEWPORT: scrolling and level of detail ---
+    def bits_per_column(self):
+        return 1 << (self.zoom_level - 1) if self.zoom_level else 1
+
+    def max_zoom_level(self):
+        """Smallest strip level whose columns cover the whole register."""
+        if self.num_bits <= self.visible_bits:
+            return 0
+        level = 1
+        while STRIP_COLUMNS << (level - 1) < self.num_bits:
+            level += 1
+        return level
+
+    def view_span(self):
+        """Number of flip-flops covered by the viewport at the current zoom level."""
+        if not self.zoom_level:
+            return self.visible_bits
+        return min(self.num_bits, STRIP_COLUMNS * self.bits_per_column())
+
+    def on_scroll(self, *args):
+        """Scrollbar callback ('moveto', fraction) or ('scroll', n, 'units'/'pages')."""
+        span = self.view_span()
+        if args[0] == "moveto":
+            offset = int(float(args[1]) * self.num_bits)
+        else:
+            step = span if args[2] == "pages" else max(1, span // 8)
+            offset = self.view_offset + int(args[1]) * step
+        self.set_view(offset)
+
+    def set_view(self, offset):
+        """Moves the viewport so its first slot shows flip-flop `offset`, recycling the slot items."""
+        self.view_offset = max(0, min(offset, self.num_bits - self.view_span()))
+        if not self.zoom_level:
+            for slot, label in enumerate(self.ff_labels):
+                self.set_text(label, f"FF {self.view_offset + slot + 1}")
+        self.update_display()
+
+    def set_zoom(self, level):
+        level = max(0, min(level, self.max_zoom_level()))
+        if level == self.zoom_level:
+            return
+        if level and not self.strip_columns:
+            self.draw_density_strip()
+        self.canvas.itemconfig("detail", state=tk.HIDDEN if level else tk.NORMAL)
+        self.canvas.itemconfig("strip", state=tk.NORMAL if level else tk.HIDDEN)
+        self.zoom_level = level
+        self.set_view(self.view_offset)
+
+    def draw_density_strip(self):
+        """Fixed pool of strip columns; each one is shaded by the share of 1s in the bits it covers."""
+        x_end = self.canvas_width - self.x_start
+        column_width = (x_end - self.x_start) / STRIP_COLUMNS
+        for c in range(STRIP_COLUMNS):
+            x1 = self.x_start + c * column_width
+            self.strip_columns.append(
+                self.canvas.create_rectangle(x1, self.y_box_top, x1 + column_width, self.y_box_bot,
+                                             outline="", fill=STRIP_SHADES[0], tags=("strip",))
+            )
+        self.canvas.create_rectangle(self.x_start, self.y_box_top, x_end, self.y_box_bot,
+                                     outline="#4682B4", width=2, tags=("strip",))
+        self.strip_caption_id = self.canvas.create_text(self.x_start, self.y_box_top - 15, text="", anchor="w",
+                                                        fill="#4682B4", font=("Arial", 10, "bold"), tags=("strip",))
+
+    def column_densities(self):
+        """Share of 1s per strip column (None past the last flip-flop)."""
+        per_column = self.bits_per_column()
+        span = min(STRIP_COLUMNS * per_column, self.num_bits - self.view_offset)
+        window = self.engine.window(self.view_offset, span)
+        densities = []
+        if per_column % 8 == 0:
+            # Byte-aligned columns: popcount byte slices instead of shifting the whole window per column
+            data = window.to_bytes((span + 7) // 8, "little")
+            step = per_column // 8
+            for c in range(STRIP_COLUMNS):
+                count = min(per_column, span - c * per_column)
+                if count <= 0:
+                    densities.append(None)
+                    continue
+                densities.append(int.from_bytes(data[c * step:(c + 1) * step], "little").bit_count() / count)
+        else:
+            mask = (1 << per_column) - 1
+            for c in range(STRIP_COLUMNS):
+                count = min(per_column, span - c * per_column)
+                if count <= 0:
+                    densities.append(None)
+                    continue
+                densities.append(((window >> (c * per_column)) & mask).bit_count() / count)
+        return densities
+
+    def update_strip(self):
+        for column, density in zip(self.strip_columns, self.column_densities()):
+            fill = "#E6E6FA" if density is None else STRIP_SHADES[round(density * (len(STRIP_SHADES) - 1))]
+            self.set_item(column, "fill", fill)
+        last = min(self.num_bits, self.view_offset + self.view_span())
+        self.set_text(self.strip_caption_id, f"Q{self.view_offset + 1}..Q{last} (darker = more 1s)")
+
+    def update_view_controls(self):
+        span = self.view_span()
+        self.scrollbar.set(self.view_offset / self.num_bits, (self.view_offset + span) / self.num_bits)
+        last = min(self.num_bits, self.view_offset + span)
+        if self.zoom_level:
+            text = f"FF {self.view_offset + 1}-{last} of {self.num_bits}, {self.bits_per_column()} per column"
+        else:
+            text = f"FF {self.view_offset + 1}-{last} of {self.num_bits}"
+        self.view_label.config(text=text)
+
+    # --- REWIND / SEEK ---
+    def create_seek_controls(self, parent_frame):
+        """Cycle slider next to the clock controls; dragging it rewinds or replays the register."""
+        tk.Label(parent_frame, text="Cycle:", bg="#DCDCDC").pack(side=tk.LEFT, padx=(15, 5))
+        self.seek_scale = tk.Scale(parent_frame, from_=0, to=0, orient=tk.HORIZONTAL, length=160,
+                                   command=self.on_seek, bg="#DCDCDC", highlightthickness=0)
+        self.seek_scale.pack(side=tk.LEFT)
+
+    def on_seek(self, value):
+        cycle = int(float(value))
+        if cycle == self.engine.cycle or self.history is None:
+            return  # Echo of update_seek_controls() moving the slider
+        if self.free_run.running:
+            self.free_run.pause()
+        self.history.seek(cycle)
+        self.sync_controls()
+        self.update_display()
+
+    def sync_controls(self):
+        """Refreshes widgets that mirror engine state after a seek or a change made elsewhere. Overridden by children."""
+
+    def update_seek_controls(self):
+        if self.history is None:
+            return
+        current = (self.history.base, self.history.head, self.engine.cycle)
+        if current != self.shown_seek:
+            self.shown_seek = current
+            self.seek_scale.config(from_=current[0], to=current[1])
+            self.seek_scale.set(current[2])
+
+    @property
+    def register(self):
+        """The register as a [Q1, Q2, ...] list, unpacked from the engine state."""
+        return self.engine.bits
 
     # --- ABSTRACT METHODS (To be implemented by children) ---
     def create_specific_controls(self, parent_frame):
@@ -82,63 +486,167 @@ class ShiftRegisterGUI:
     def draw_diagram(self):
         raise NotImplementedError("Subclass must implement draw_diagram")
 
+    def advance(self, n):
+        """Runs n clock cycles on the engine without repainting."""
+        raise NotImplementedError("Subclass must implement advance")
+
+    def read_inputs(self):
+        """Copies input widgets into the engine, for runs that step it without advance(). Overridden by children."""
+
     def clock_pulse(self):
-        raise NotImplementedError("Subclass must implement clock_pulse")
+        """A single manual clock: one cycle, then a repaint."""
+        self.free_run.settle()
+        self.advance(1)
+        self.update_display()
 
+    # --- RENDERING: coalesced, diff-based repaints ---
     def update_display(self):
+        """Schedules a repaint for the next idle moment; calls made before it runs are merged into it."""
+        if self.redraw_pending is None:
+            self.redraw_pending = self.master.after_idle(self.repaint)
+
+    def repaint(self):
+        """Refreshes the viewport: the D/Q labels of the visible slots, or the density strip when zoomed out."""
+        self.redraw_pending = None
+        try:
+            with self.free_run.lock:  # A worker thread may be stepping the engine
+                if self.zoom_level:
+                    self.update_strip()
+                else:
+                    self.diff_view()
+                    self.update_labels()
+                if self.scrollbar is not None:
+                    self.update_view_controls()
+                self.update_seek_controls()
+                if self.timing is not None:
+                    self.timing.refresh()
+        except tk.TclError:
+            pass  # The window was closed before the repaint ran
+
+    def diff_view(self):
+        """Reads the visible Q bits and marks the slots that changed since the last repaint."""
+        self.view_window = self.engine.window(self.view_offset, self.visible_bits)
+        previous = self.shown_window
+        if previous is None or previous[0] != self.view_offset:
+            self.view_changes = (1 << self.visible_bits) - 1  # Scrolled: every slot shows another flip-flop
+        else:
+            self.view_changes = previous[1] ^ self.view_window
+        self.shown_window = (self.view_offset, self.view_window)
+
+    def set_item(self, item, option, value):
+        """itemconfig that skips the Tk call when the item already shows this value."""
+        key = (item, option)
+        if self.shown_items.get(key) != value:
+            self.shown_items[key] = value
+            self.canvas.itemconfig(item, **{option: value})
+
+    def set_text(self, item, text):
+        self.set_item(item, "text", text)
+
+    def update_labels(self):
         """Updates the D/Q labels on the canvas. Overridden by children for specific logic."""
-        # Update all Q labels (Common for all registers)
-        for i in range(self.num_bits):
-            if i < len(self.q_output_labels): # Defensive check
-                q_val = self.register[i]
-                self.canvas.itemconfig(self.q_output_labels[i], text=f"Q{i+1}={q_val}")
+        # Update the Q labels of the slots that changed (Common for all registers)
+        for slot in iter_set_bits(self.view_changes):
+            self.set_text(self.q_output_labels[slot], f"Q{self.view_offset + slot + 1}={(self.view_window >> slot) & 1}")
 
 # --- 2. CHILD CLASS: SERIAL IN, SERIAL OUT (SISO) ---
 
 class SISO_Register(ShiftRegisterGUI):
+    engine_class = SISO_Engine
+
     # FIX: Use __init__ instead of _init_
-    def __init__(self, master):
-        self.input_bits = []
+    def __init__(self, master, num_bits=4, engine=None):
+        num_bits = engine.num_bits if engine is not None else num_bits
         self.serial_input_entry = None
         self.input_label_id = None
         self.output_label_id = None
+        self.output_caption_id = None
         self.next_serial_in = '0' # Tracks the next bit to enter D1
-        super().__init__(master, "4-bit Serial-In, Serial-Out (SISO)")
+        super().__init__(master, f"{num_bits}-bit Serial-In, Serial-Out (SISO)", num_bits, engine)
 
     def create_specific_controls(self, parent_frame):
         tk.Label(parent_frame, text="Serial Input (e.g. 1010):", bg="#DCDCDC").pack(side=tk.LEFT, padx=5)
         self.serial_input_entry = tk.Entry(parent_frame, width=12)
         self.serial_input_entry.pack(side=tk.LEFT, padx=5)
         tk.Button(parent_frame, text="Load String", command=self.load_input_string, bg="#A9A9A9").pack(side=tk.LEFT, padx=5)
-        tk.Button(parent_frame, text="Clock (Shift)", command=self.clock_pulse, bg="#90EE90").pack(side=tk.LEFT, padx=15)
+        tk.Button(parent_frame, text="Load File...", command=self.load_input_file, bg="#A9A9A9").pack(side=tk.LEFT, padx=5)
+        tk.Button(parent_frame, text="Clock (Shift)", command=lambda: self.clock_pulse(), bg="#90EE90").pack(side=tk.LEFT, padx=15)
 
     def load_input_string(self):
         bits = self.serial_input_entry.get().strip()
         if not bits or not all(b in "01" for b in bits):
+            from tkinter import messagebox
             messagebox.showerror("Invalid Input", "Input must be a non-empty string of 0s and 1s.")
             self.serial_input_entry.delete(0, tk.END)
             return
             
-        self.input_bits = list(bits)
-        self.register = [0] * self.num_bits
-        self.next_serial_in = self.input_bits[0]
-        self.update_display()
+        self.set_input_source(StringBitSource(bits))
 
-    def clock_pulse(self):
-        new_bit = int(self.input_bits.pop(0)) if self.input_bits else 0
-        self.register = [new_bit] + self.register[:-1]
-        self.next_serial_in = self.input_bits[0] if self.input_bits else '0'
+    def load_input_file(self):
+        """Streams the serial input from an ASCII 0/1 file or a packed binary file."""
+        from tkinter import filedialog
+        path = filedialog.askopenfilename(parent=self.master, title="Open Serial Input Stream")
+        if not path:
+            return
+        try:
+            source = open_bit_source(path)
+        except (OSError, ValueError) as e:
+            from tkinter import messagebox
+            messagebox.showerror("Invalid Input", f"Could not open {path}: {e}")
+            return
+        self.set_input_source(source)
+
+    def set_input_source(self, source):
+        """Resets the register and feeds its serial input from source, once its first block decodes."""
+        try:
+            source.peek()  # open_bit_source only sniffs the start of a file; the first block may still be bad
+        except ValueError as e:
+            source.close()
+            from tkinter import messagebox
+            messagebox.showerror("Invalid Input", str(e))
+            return
+        self.free_run.settle()
+        if self.engine.input_source is not None:
+            self.engine.input_source.close()
+        self.engine.input_source = source
+        self.engine.reset()
+        self.next_serial_in = str(self.engine.next_input_bit())
         self.update_display()
 
-    def draw_diagram(self):
+    def advance(self, n):
+        # Bits past the end of the stream shift in as 0 (engine.serial_in)
+        try:
+            self.engine.step(n)
+        except ValueError as e:  # Bad characters further down an ASCII file
+            self.engine.input_source = None
+            self.set_status(f"Invalid input: {e}")
+        self.next_serial_in = str(self.engine.next_input_bit())
+
+    def sync_controls(self):
+        self.next_serial_in = str(self.engine.next_input_bit())
+
+    def draw_serial_input(self):
+        """Draws the serial input arrow in front of the first slot."""
         # --- Serial Input Line ---
         self.canvas.create_line(self.x_start - 40, self.y_center, self.x_start, self.y_center, arrow=tk.LAST, fill="green", width=2)
         self.input_label_id = self.canvas.create_text(self.x_start - 45, self.y_center - 15, text="D1=0", anchor="w", fill="blue")
 
-        # --- Draw all components sequentially ---
-        for i in range(self.num_bits):
+    def draw_serial_output(self):
+        """Draws the serial output arrow after the last slot."""
+        # --- Serial Output ---
+        last_box_x2 = self.slot_x(self.visible_bits - 1) + self.box_width
+        output_end_x = last_box_x2 + 60
+        self.canvas.create_line(last_box_x2, self.y_center, output_end_x, self.y_center, arrow=tk.LAST, fill="red", width=2)
+        self.output_label_id = self.canvas.create_text(output_end_x + 5, self.y_center, text="0", anchor="w", fill="black", font=("Arial", 10, "bold"))
+        self.output_caption_id = self.canvas.create_text(output_end_x + 5, self.y_center - 15, text="Serial Out", anchor="w", fill="black", font=("Arial", 8))
+
+    def draw_diagram(self):
+        self.draw_serial_input()
+
+        # --- Draw all visible slots sequentially ---
+        for i in range(self.visible_bits):
             # FIX: Standardized calculation for x_pos for consistent spacing
-            x_pos = self.x_start + i * (self.box_width + self.box_spacing)
+            x_pos = self.slot_x(i)
             box_x1, box_x2 = self.draw_flip_flop(i, x_pos)
             
             # Q Output Label (stored value)
@@ -150,7 +658,7 @@ class SISO_Register(ShiftRegisterGUI):
             )
             
             # Connecting wire (Q[i] -> D[i+1])
-            if i < self.num_bits - 1:
+            if i < self.visible_bits - 1:
                 line_start_x = box_x2
                 line_end_x = line_start_x + self.box_spacing
                 self.canvas.create_line(line_start_x, self.y_center, line_end_x, self.y_center, arrow=tk.LAST, fill="green", width=2)
@@ -161,41 +669,42 @@ class SISO_Register(ShiftRegisterGUI):
                     self.canvas.create_text(d_x_center, self.y_center - 15, text=f"D{i+2}=0", fill="blue", font=("Arial", 9))
                 )
                 
-        # --- Serial Output ---
-        last_box_x2 = self.x_start + (self.num_bits - 1) * (self.box_width + self.box_spacing) + self.box_width
-        output_end_x = last_box_x2 + 60
-        self.canvas.create_line(last_box_x2, self.y_center, output_end_x, self.y_center, arrow=tk.LAST, fill="red", width=2)
-        self.output_label_id = self.canvas.create_text(output_end_x + 5, self.y_center, text="0", anchor="w", fill="black", font=("Arial", 10, "bold"))
-        self.canvas.create_text(output_end_x + 5, self.y_center - 15, text="Serial Out", anchor="w", fill="black", font=("Arial", 8))
-        
+        self.draw_serial_output()
         self.draw_common_clock()
 
-    def update_display(self):
-        super().update_display() # Updates Q labels
-        # Update D1 (Serial Input)
-        self.canvas.itemconfig(self.input_label_id, text=f"D1={self.next_serial_in}")
-        # Update D2, D3, D4
-        for i in range(len(self.d_input_labels)):
-            self.canvas.itemconfig(self.d_input_labels[i], text=f"D{i+2}={self.register[i]}")
-        # Update Serial Output (Q4)
-        self.canvas.itemconfig(self.output_label_id, text=f"{self.register[self.num_bits - 1]}")
+    def update_labels(self):
+        super().update_labels() # Updates Q labels
+        first = self.view_offset
+        window = self.view_window
+        # Update the first D: the serial input, or the Q feeding it when scrolled
+        d_first = self.next_serial_in if first == 0 else self.engine.bit(first - 1)
+        self.set_text(self.input_label_id, f"D{first+1}={d_first}")
+        # Update the D labels between visible slots; each one follows the Q to its left
+        for i in iter_set_bits(self.view_changes & ((1 << len(self.d_input_labels)) - 1)):
+            self.set_text(self.d_input_labels[i], f"D{first+i+2}={(window >> i) & 1}")
+        # Update Serial Output (last visible Q); narrow SIPO registers have none
+        if self.output_label_id is None:
+            return
+        last = first + self.visible_bits - 1
+        self.set_text(self.output_label_id, f"{(window >> (self.visible_bits - 1)) & 1}")
+        self.set_text(self.output_caption_id, "Serial Out" if last == self.num_bits - 1 else f"To FF {last + 2}")
 
 
 # --- 3. CHILD CLASS: SERIAL IN, PARALLEL OUT (SIPO) ---
 class SIPO_Register(SISO_Register): # Inherits logic from SISO
+    engine_class = SIPO_Engine
+
     # FIX: Use __init__ instead of _init_
-    def __init__(self, master):
+    def __init__(self, master, num_bits=4, engine=None):
         # FIX: Call parent __init__ using standard super()
-        super().__init__(master)
-        self.master.title("4-bit Serial-In, Parallel-Out (SIPO)")
+        super().__init__(master, num_bits, engine)
+        self.master.title(f"{self.num_bits}-bit Serial-In, Parallel-Out (SIPO)")
         
     def draw_diagram(self):
-        # --- Serial Input Line ---
-        self.canvas.create_line(self.x_start - 40, self.y_center, self.x_start, self.y_center, arrow=tk.LAST, fill="green", width=2)
-        self.input_label_id = self.canvas.create_text(self.x_start - 45, self.y_center - 15, text="D1=0", anchor="w", fill="blue")
+        self.draw_serial_input()
 
-        for i in range(self.num_bits):
-            x_pos = self.x_start + i * (self.box_width + self.box_spacing)
+        for i in range(self.visible_bits):
+            x_pos = self.slot_x(i)
             box_x1, box_x2 = self.draw_flip_flop(i, x_pos)
             
             q_x_center = (box_x1 + box_x2) / 2
@@ -208,7 +717,7 @@ class SIPO_Register(SISO_Register): # Inherits logic from SISO
             self.canvas.create_line(q_x_center, self.y_box_bot, q_x_center, self.y_box_bot + 40, arrow=tk.LAST, fill="red", width=2)
             
             # Connecting wire (Q[i] -> D[i+1])
-            if i < self.num_bits - 1:
+            if i < self.visible_bits - 1:
                 line_start_x = box_x2
                 line_end_x = line_start_x + self.box_spacing
                 self.canvas.create_line(line_start_x, self.y_center, line_end_x, self.y_center, arrow=tk.LAST, fill="green", width=2)
@@ -217,32 +726,38 @@ class SIPO_Register(SISO_Register): # Inherits logic from SISO
                 self.d_input_labels.append(
                     self.canvas.create_text(d_x_center, self.y_center - 15, text=f"D{i+2}=0", fill="blue", font=("Arial", 9))
                 )
+        if self.visible_bits < self.num_bits:
+            # Wide registers scroll, so the last visible slot still feeds the next flip-flop
+            self.draw_serial_output()
         self.draw_common_clock()
     
-    def update_display(self):
+    def update_labels(self):
         # Inherits logic from SISO, which is correct for SIPO's shifting and input display.
-        # The Q labels are automatically updated by the super().update_display() call.
-        super().update_display()
+        # The Q labels are automatically updated by the super().update_labels() call.
+        super().update_labels()
 
 
 # --- 4. CHILD CLASS: PARALLEL IN, SERIAL OUT (PISO) ---
 class PISO_Register(ShiftRegisterGUI):
-    def __init__(self, master):
-        self.parallel_vars = [tk.StringVar(value='0') for _ in range(4)]
+    engine_class = PISO_Engine
+    ff_label_dy = 15  # "FF n" label inside the box, clear of the parallel input lines
+
+    def __init__(self, master, num_bits=4, engine=None):
+        num_bits = engine.num_bits if engine is not None else num_bits
+        self.parallel_vars = []
         self.load_shift_mode = tk.StringVar(value="Load")
         self.serial_in_var = tk.StringVar(value='0') 
+        self.input_caption_id = None
         self.output_label_id = None
-        super().__init__(master, "4-bit Parallel-In, Serial-Out (PISO)")
+        self.output_caption_id = None
+        super().__init__(master, f"{num_bits}-bit Parallel-In, Serial-Out (PISO)", num_bits, engine)
 
     def create_specific_controls(self, parent_frame):
         # --- Parallel Input Controls ---
-        tk.Label(parent_frame, text="Parallel Data:", bg="#DCDCDC").pack(side=tk.LEFT, padx=(5, 10))
-        for i in range(self.num_bits):
-            tk.Checkbutton(parent_frame, text=f"D{i+1}", variable=self.parallel_vars[i], onvalue='1', offvalue='0',
-                           command=self.update_display, bg="#DCDCDC").pack(side=tk.LEFT)
+        self.create_parallel_controls(parent_frame)
         
         # --- Mode and Clock Controls ---
-        tk.Button(parent_frame, text="Clock (Load/Shift)", command=self.clock_pulse, bg="#ADD8E6").pack(side=tk.LEFT, padx=15)
+        tk.Button(parent_frame, text="Clock (Load/Shift)", command=lambda: self.clock_pulse(), bg="#ADD8E6").pack(side=tk.LEFT, padx=15)
         tk.Label(parent_frame, text="Mode:", bg="#DCDCDC").pack(side=tk.LEFT)
         tk.Label(parent_frame, textvariable=self.load_shift_mode, font=("Arial", 10, "bold"), fg="#FF4500", bg="#DCDCDC").pack(side=tk.LEFT)
         
@@ -252,37 +767,29 @@ class PISO_Register(ShiftRegisterGUI):
         tk.Checkbutton(parent_frame, text="Serial In", variable=self.serial_in_var, onvalue='1', offvalue='0',
                        command=self.update_display, bg="#DCDCDC").pack(side=tk.LEFT)
 
-    def clock_pulse(self):
-        if self.load_shift_mode.get() == "Load":
-            self.register = [int(var.get()) for var in self.parallel_vars]
-            self.load_shift_mode.set("Shift")
-            messagebox.showinfo("Mode Change", "Data loaded. Register is now in SHIFT mode.")
-        else: # Shift mode
-            new_bit = int(self.serial_in_var.get())
-            self.register = [new_bit] + self.register[:-1]
-        self.update_display()
+    def read_inputs(self):
+        self.engine.serial_in = int(self.serial_in_var.get())
 
-    # FIX 1: Override draw_flip_flop specifically for PISO
-    def draw_flip_flop(self, i, x_pos):
-        """Overrides parent method to draw the FF label inside the box."""
-        box_x1 = x_pos
-        box_x2 = box_x1 + self.box_width
-        self.canvas.create_rectangle(box_x1, self.y_box_top, box_x2, self.y_box_bot,
-                                     outline="#4682B4", width=2, fill="#F0F8FF")
-        # Draw the "FF n" label INSIDE the box at the top to avoid all overlaps
-        self.canvas.create_text((box_x1 + box_x2) / 2, self.y_box_top + 15,
-                                text=f"FF {i + 1}", fill="#4682B4", font=("Arial", 10, "bold"))
-        self.box_centers.append((box_x1 + box_x2) / 2)
-        return box_x1, box_x2
+    def advance(self, n):
+        self.read_inputs()
+        self.engine.step(n)
+        self.sync_controls()
+
+    def sync_controls(self):
+        self.sync_parallel_controls()
+        self.serial_in_var.set(str(self.engine.serial_in))
+        mode = self.engine.load_shift_mode
+        if mode != self.load_shift_mode.get():
+            self.load_shift_mode.set(mode)
+            self.set_status("Data loaded. Register is now in SHIFT mode." if mode == "Shift" else "Register is in LOAD mode.")
 
-    # FIX 2: Cleaned up draw_diagram to use the new method
+    # FIX 2: Cleaned up draw_diagram to use the shared draw_flip_flop
     def draw_diagram(self):
-        self.canvas.create_text(self.x_start - 35, self.y_center, text="Serial\nInput", fill="blue", justify=tk.CENTER)
+        self.input_caption_id = self.canvas.create_text(self.x_start - 35, self.y_center, text="Serial\nInput", fill="blue", justify=tk.CENTER)
         
-        for i in range(self.num_bits):
-            x_pos = self.x_start + i * (self.box_width + self.box_spacing)
+        for i in range(self.visible_bits):
+            x_pos = self.slot_x(i)
             
-            # This now calls the PISO-specific draw_flip_flop method above
             box_x1, box_x2 = self.draw_flip_flop(i, x_pos)
             
             d_x_center = (box_x1 + box_x2) / 2
@@ -299,74 +806,67 @@ class PISO_Register(ShiftRegisterGUI):
             )
             
             # Connecting wire (for SHIFTING)
-            if i < self.num_bits - 1:
+            if i < self.visible_bits - 1:
                 line_start_x = box_x2
                 line_end_x = line_start_x + self.box_spacing
                 self.canvas.create_line(line_start_x, self.y_center, line_end_x, self.y_center, arrow=tk.LAST, fill="green", width=2)
         
         # Serial Output
-        last_box_x2 = self.x_start + (self.num_bits - 1) * (self.box_width + self.box_spacing) + self.box_width
+        last_box_x2 = self.slot_x(self.visible_bits - 1) + self.box_width
         output_end_x = last_box_x2 + 60
         self.canvas.create_line(last_box_x2, self.y_center, output_end_x, self.y_center, arrow=tk.LAST, fill="red", width=2)
         self.output_label_id = self.canvas.create_text(output_end_x + 5, self.y_center, text="0", anchor="w", fill="black", font=("Arial", 10, "bold"))
-        self.canvas.create_text(output_end_x + 5, self.y_center - 15, text="Serial Out", anchor="w", fill="black", font=("Arial", 8))
+        self.output_caption_id = self.canvas.create_text(output_end_x + 5, self.y_center - 15, text="Serial Out", anchor="w", fill="black", font=("Arial", 8))
 
         self.draw_common_clock()
 
-    def update_display(self):
-        # Update Q labels
-        for i in range(self.num_bits):
-            self.canvas.itemconfig(self.q_output_labels[i], text=f"Q{i+1}={self.register[i]}")
+    def update_labels(self):
+        super().update_labels() # Updates Q labels
+        first = self.view_offset
+        last = first + self.visible_bits - 1
+        window = self.view_window
 
-        # Update D labels based on mode
+        # Update D labels based on mode (set_text skips the ones that already show the value)
         if self.load_shift_mode.get() == "Load":
-            for i in range(self.num_bits):
-                d_val = self.parallel_vars[i].get()
-                self.canvas.itemconfig(self.d_input_labels[i], text=f"D{i+1}={d_val}")
+            parallel = self.engine.parallel_in >> first
+            for i in range(self.visible_bits):
+                self.set_text(self.d_input_labels[i], f"D{first+i+1}={(parallel >> i) & 1}")
         else: # Shift Mode
-            serial_in_val = self.serial_in_var.get()
-            self.canvas.itemconfig(self.d_input_labels[0], text=f"D1={serial_in_val}")
-            for i in range(1, self.num_bits):
-                self.canvas.itemconfig(self.d_input_labels[i], text=f"D{i+1}={self.register[i-1]}")
+            # D of the first slot is the serial input, or the Q feeding it when scrolled
+            d_first = self.serial_in_var.get() if first == 0 else self.engine.bit(first - 1)
+            self.set_text(self.d_input_labels[0], f"D{first+1}={d_first}")
+            for i in range(1, self.visible_bits):
+                self.set_text(self.d_input_labels[i], f"D{first+i+1}={(window >> (i-1)) & 1}")
                 
-        # Update Serial Output label (always shows Q4)
-        self.canvas.itemconfig(self.output_label_id, text=f"{self.register[self.num_bits - 1]}")
-# --- 5. CHILD CLASS: PARALLEL IN, PARALLEL OUT (PIPO) ---
+        # Update Serial Output label (always shows the last visible Q)
+        self.set_text(self.input_caption_id, "Serial\nInput" if first == 0 else f"From\nFF {first}")
+        self.set_text(self.output_label_id, f"{(window >> (self.visible_bits - 1)) & 1}")
+        self.set_text(self.output_caption_id, "Serial Out" if last == self.num_bits - 1 else f"To FF {last + 2}")
+
 # --- 5. CHILD CLASS: PARALLEL IN, PARALLEL OUT (PIPO) ---
 class PIPO_Register(ShiftRegisterGUI):
-    def __init__(self, master):
-        self.parallel_vars = [tk.StringVar(value='0') for _ in range(4)]
-        super().__init__(master, "4-bit Parallel-In, Parallel-Out (PIPO)")
+    engine_class = PIPO_Engine
+    ff_label_dy = 15  # "FF n" label inside the box, clear of the parallel input lines
+
+    def __init__(self, master, num_bits=4, engine=None):
+        num_bits = engine.num_bits if engine is not None else num_bits
+        self.parallel_vars = []
+        super().__init__(master, f"{num_bits}-bit Parallel-In, Parallel-Out (PIPO)", num_bits, engine)
 
     def create_specific_controls(self, parent_frame):
-        tk.Label(parent_frame, text="Parallel Data:", bg="#DCDCDC").pack(side=tk.LEFT, padx=(5, 10))
-        for i in range(self.num_bits):
-            tk.Checkbutton(parent_frame, text=f"D{i+1}", variable=self.parallel_vars[i], onvalue='1', offvalue='0',
-                           command=self.update_display, bg="#DCDCDC").pack(side=tk.LEFT)
-        tk.Button(parent_frame, text="Clock (Load)", command=self.clock_pulse, bg="#ADD8E6").pack(side=tk.LEFT, padx=20)
+        self.create_parallel_controls(parent_frame)
+        tk.Button(parent_frame, text="Clock (Load)", command=lambda: self.clock_pulse(), bg="#ADD8E6").pack(side=tk.LEFT, padx=20)
 
-    def clock_pulse(self):
-        self.register = [int(var.get()) for var in self.parallel_vars]
-        self.update_display()
+    def advance(self, n):
+        self.engine.step(n)
 
-    # FIX 1: Override draw_flip_flop to move the "FF n" label inside.
-    def draw_flip_flop(self, i, x_pos):
-        """Overrides parent method to draw the FF label inside the box."""
-        box_x1 = x_pos
-        box_x2 = box_x1 + self.box_width
-        self.canvas.create_rectangle(box_x1, self.y_box_top, box_x2, self.y_box_bot,
-                                     outline="#4682B4", width=2, fill="#F0F8FF")
-        # Draw the "FF n" label INSIDE the box at the top to avoid all overlaps
-        self.canvas.create_text((box_x1 + box_x2) / 2, self.y_box_top + 15,
-                                text=f"FF {i + 1}", fill="#4682B4", font=("Arial", 10, "bold"))
-        self.box_centers.append((box_x1 + box_x2) / 2)
-        return box_x1, box_x2
+    def sync_controls(self):
+        self.sync_parallel_controls()
 
     # FIX 2: Cleaned up draw_diagram for clarity and correctness.
     def draw_diagram(self):
-        for i in range(self.num_bits):
-            x_pos = self.x_start + i * (self.box_width + self.box_spacing)
-            # Calls the PIPO-specific draw_flip_flop method above
+        for i in range(self.visible_bits):
+            x_pos = self.slot_x(i)
             box_x1, box_x2 = self.draw_flip_flop(i, x_pos)
             d_x_center = (box_x1 + box_x2) / 2
 
@@ -386,30 +886,177 @@ class PIPO_Register(ShiftRegisterGUI):
         
         self.draw_common_clock()
 
-    def update_display(self):
-        super().update_display() # Updates Q labels
-        # Update D labels from checkbuttons
-        for i in range(self.num_bits):
-            d_val = self.parallel_vars[i].get()
-            self.canvas.itemconfig(self.d_input_labels[i], text=f"D{i+1}={d_val}")
+    def update_labels(self):
+        super().update_labels() # Updates Q labels
+        # Update D labels from the parallel input
+        parallel = self.engine.parallel_in >> self.view_offset
+        for i in range(self.visible_bits):
+            self.set_text(self.d_input_labels[i], f"D{self.view_offset+i+1}={(parallel >> i) & 1}")
+
+# --- 6. CHILD CLASS: UNIVERSAL SHIFT REGISTER (SHIFT / ROTATE / LFSR) ---
+class Universal_Register(ShiftRegisterGUI):
+    engine_class = Universal_Engine
 
-# --- 6. MAIN MENU CLASS ---
+    def __init__(self, master, num_bits=4, engine=None):
+        num_bits = engine.num_bits if engine is not None else num_bits
+        self.parallel_vars = []
+        self.mode_var = tk.StringVar(value=UNIVERSAL_MODES[0])
+        self.serial_in_var = tk.StringVar(value='0')
+        self.tap_labels = []
+        self.input_caption_id = None
+        self.output_label_id = None
+        self.output_caption_id = None
+        super().__init__(master, f"{num_bits}-bit Universal Shift Register", num_bits, engine)
+
+    def create_specific_controls(self, parent_frame):
+        tk.Label(parent_frame, text="Mode:", bg="#DCDCDC").pack(side=tk.LEFT, padx=5)
+        tk.OptionMenu(parent_frame, self.mode_var, *UNIVERSAL_MODES, command=self.on_mode_change).pack(side=tk.LEFT)
+        tk.Label(parent_frame, text="Taps:", bg="#DCDCDC").pack(side=tk.LEFT, padx=(10, 5))
+        self.taps_entry = tk.Entry(parent_frame, width=12)
+        self.taps_entry.insert(0, ",".join(str(t) for t in self.engine.taps))
+        self.taps_entry.pack(side=tk.LEFT)
+        tk.Button(parent_frame, text="Set", command=self.on_taps_change, bg="#A9A9A9").pack(side=tk.LEFT, padx=5)
+        tk.Checkbutton(parent_frame, text="Serial In", variable=self.serial_in_var, onvalue='1', offvalue='0',
+                       command=self.update_display, bg="#DCDCDC").pack(side=tk.LEFT, padx=5)
+        tk.Button(parent_frame, text="Clock", command=lambda: self.clock_pulse(), bg="#90EE90").pack(side=tk.LEFT, padx=15)
+
+        # --- Parallel load and jump-ahead ---
+        bar = tk.Frame(self.master, padx=10, pady=5, bg="#DCDCDC")
+        bar.pack(fill=tk.X, padx=10, pady=(5, 10))
+        self.create_parallel_controls(bar)
+        tk.Label(bar, text="Jump cycles (e.g. 2^40):", bg="#DCDCDC").pack(side=tk.LEFT, padx=(15, 5))
+        self.jump_entry = tk.Entry(bar, width=12)
+        self.jump_entry.pack(side=tk.LEFT)
+        tk.Button(bar, text="Jump", command=self.on_jump, bg="#ADD8E6").pack(side=tk.LEFT, padx=5)
+
+    def on_mode_change(self, mode):
+        self.free_run.settle()
+        self.engine.mode = mode
+        self.update_display()
+
+    def on_taps_change(self):
+        try:
+            taps = [int(t) for t in self.taps_entry.get().replace(",", " ").split()]
+            self.free_run.settle()
+            self.engine.set_taps(taps)
+        except ValueError:
+            from tkinter import messagebox
+            messagebox.showerror("Invalid Taps", f"Taps must be flip-flop numbers from 1 to {self.num_bits}, e.g. 16,14,13,11.")
+            return
+        self.shown_window = None  # Tap markers changed on every slot
+        self.update_display()
+
+    def on_jump(self):
+        text = self.jump_entry.get().strip()
+        try:
+            if "^" in text:
+                base, exponent = (int(part) for part in text.split("^"))
+                if base < 0 or exponent < 0 or (base > 1 and exponent * (base.bit_length() - 1) >= MAX_JUMP_BITS):
+                    raise ValueError(text)  # Checked before the power is built
+                cycles = base ** exponent
+            else:
+                cycles = int(float(text)) if "e" in text.lower() else int(text)
+        except (ValueError, OverflowError):
+            cycles = -1
+        if not 0 <= cycles < 1 << MAX_JUMP_BITS:
+            from tkinter import messagebox
+            messagebox.showerror("Invalid Jump", f"Jump cycles must be a whole number below 2^{MAX_JUMP_BITS}, "
+                                                 "such as 1000000, 1e9 or 2^40.")
+            return
+        if self.engine.mode in LFSR_MODES and self.num_bits > MAX_JUMP_WIDTH and cycles > 2 * self.num_bits:
+            from tkinter import messagebox
+            messagebox.showerror("Jump Too Costly", f"LFSR jumps are limited to registers of {MAX_JUMP_WIDTH} "
+                                                    f"flip-flops; jump at most {2 * self.num_bits} cycles at a time.")
+            return
+        if self.free_run.running:
+            self.free_run.pause()
+        self.read_inputs()
+        self.engine.jump(cycles)
+        self.update_display()
+
+    def read_inputs(self):
+        self.engine.serial_in = int(self.serial_in_var.get())
+
+    def advance(self, n):
+        self.read_inputs()
+        self.engine.step(n)
+
+    def sync_controls(self):
+        self.sync_parallel_controls()
+        self.mode_var.set(self.engine.mode)
+        self.serial_in_var.set(str(self.engine.serial_in))
+
+    def draw_diagram(self):
+        self.canvas.create_line(self.x_start - 40, self.y_center, self.x_start, self.y_center, arrow=tk.LAST, fill="green", width=2)
+        self.input_caption_id = self.canvas.create_text(self.x_start - 45, self.y_center - 15, text="", anchor="w", fill="blue", font=("Arial", 8))
+        for i in range(self.visible_bits):
+            box_x1, box_x2 = self.draw_flip_flop(i, self.slot_x(i))
+            x_center = (box_x1 + box_x2) / 2
+            # D label above the box: the value the next clock stores in this flip-flop
+            self.d_input_labels.append(
+                self.canvas.create_text(x_center, self.y_box_top - 35, text=f"D{i+1}=0", fill="blue", font=("Arial", 9))
+            )
+            self.q_output_labels.append(
+                self.canvas.create_text(x_center, self.y_center, text=f"Q{i+1}=0", fill="#DC143C", font=("Arial", 12, "bold"))
+            )
+            self.tap_labels.append(
+                self.canvas.create_text(x_center, self.y_box_bot - 12, text="", fill="#8B008B", font=("Arial", 9, "bold"))
+            )
+            if i < self.visible_bits - 1:
+                self.canvas.create_line(box_x2, self.y_center, box_x2 + self.box_spacing, self.y_center, fill="green", width=2)
+        last_box_x2 = self.slot_x(self.visible_bits - 1) + self.box_width
+        self.canvas.create_line(last_box_x2, self.y_center, last_box_x2 + 60, self.y_center, arrow=tk.LAST, fill="red", width=2)
+        self.output_label_id = self.canvas.create_text(last_box_x2 + 65, self.y_center, text="0", anchor="w", font=("Arial", 10, "bold"))
+        self.output_caption_id = self.canvas.create_text(last_box_x2 + 65, self.y_center - 15, text="Qn", anchor="w", font=("Arial", 8))
+        self.draw_common_clock()
+
+    def update_labels(self):
+        super().update_labels() # Updates Q labels
+        engine = self.engine
+        first = self.view_offset
+        mode = engine.mode
+        if mode == "Parallel Load":
+            upcoming = engine.parallel_in
+        else:
+            serial_in = int(self.serial_in_var.get())
+            upcoming = engine.run_state(engine.key, engine.state, 1, serial_in)
+        for i in range(self.visible_bits):
+            self.set_text(self.d_input_labels[i], f"D{first+i+1}={(upcoming >> (first + i)) & 1}")
+            tapped = mode in LFSR_MODES and (first + i + 1) in engine.taps
+            self.set_text(self.tap_labels[i], "tap" if tapped else "")
+        captions = {"Shift Right": "Serial In", "Shift Left": "Serial In at Qn", "Rotate Right": "From Qn",
+                    "Rotate Left": "To Qn", "Fibonacci LFSR": "Feedback", "Galois LFSR": "From Qn",
+                    "Parallel Load": "Parallel"}
+        self.set_text(self.input_caption_id, captions[mode] if first == 0 else f"From FF {first}")
+        last = first + self.visible_bits - 1
+        self.set_text(self.output_label_id, f"{(self.view_window >> (self.visible_bits - 1)) & 1}")
+        self.set_text(self.output_caption_id, "Serial Out" if last == self.num_bits - 1 else f"To FF {last + 2}")
+
+# --- 7. MAIN MENU CLASS ---
 class MainMenu:
     # FIX: Use __init__ instead of _init_
     def __init__(self, master):
         self.master = master
         self.master.title("Shift Register Simulator")
-        self.master.geometry("400x300")
+        self.master.geometry("400x420")
         self.master.config(bg="#F0F0F0")
 
         tk.Label(master, text="Select Shift Register Type",
                  font=("Arial", 16, "bold"), bg="#F0F0F0").pack(pady=20)
 
+        # Register width shared by every window opened from the menu
+        width_row = tk.Frame(master, bg="#F0F0F0")
+        width_row.pack(pady=(0, 10))
+        tk.Label(width_row, text="Register width (bits):", bg="#F0F0F0").pack(side=tk.LEFT)
+        self.width_var = tk.StringVar(value="4")
+        tk.Spinbox(width_row, from_=1, to=1 << 20, width=8, textvariable=self.width_var).pack(side=tk.LEFT, padx=5)
+
         self.register_types = {
             "Serial-In, Serial-Out (SISO)": SISO_Register,
             "Serial-In, Parallel-Out (SIPO)": SIPO_Register,
             "Parallel-In, Serial-Out (PISO)": PISO_Register,
-            "Parallel-In, Parallel-Out (PIPO)": PIPO_Register
+            "Parallel-In, Parallel-Out (PIPO)": PIPO_Register,
+            "Universal (Shift / Rotate / LFSR)": Universal_Register
         }
 
         for name, cls in self.register_types.items():
@@ -417,8 +1064,16 @@ class MainMenu:
                       width=30, height=2, bg="#FFFFFF", relief=tk.RAISED, bd=2).pack(pady=5)
 
     def open_simulation(self, RegisterClass):
+        try:
+            num_bits = int(self.width_var.get())
+        except ValueError:
+            num_bits = 0
+        if num_bits < 1:
+            from tkinter import messagebox
+            messagebox.showerror("Invalid Width", "Register width must be a positive whole number.")
+            return
         new_window = tk.Toplevel(self.master)
-        app = RegisterClass(new_window)
+        app = RegisterClass(new_window, num_bits)
 
 # FIX: Use __name__ and __main__
 if __name__ == "__main__":
@@ -0,0 +1,163 @@
+"""
+Background simulation for the free-running clock.
+
+A SimulationWorker runs engine cycles off the Tk thread, paced to a target
+frequency, and posts Snapshots through a bounded queue. The Tk thread calls
+latest() on a timer: it drains the queue and keeps only the newest snapshot,
+and a full queue drops its oldest entry instead of blocking the worker, so a
+slow or busy UI never holds the simulation back.
+
+Two backends:
+
+    thread   steps the view's own engine, holding `lock` for each batch; the
+             history, trace and input streams keep working, and the Tk thread
+             takes the same lock while it reads the engine.
+    process  steps a copy of the engine in a child process, for heavy batches
+             where the GIL would starve the UI. Inputs are read when the run
+             starts. Cycles run elsewhere cannot be logged, so, like
+             Universal_Engine.jump, the trace and history restart at every
+             snapshot the Tk thread applies.
+"""
+import copy
+import multiprocessing
+import queue
+import threading
+import time
+from collections import namedtuple
+
+QUEUE_SIZE = 4          # Snapshots in flight; older ones are dropped
+TICK = 0.005            # Seconds between worker batches
+MAX_LAG = 0.1           # Seconds of backlog a slow batch may catch up on; older cycles are dropped
+RATE_INTERVAL = 0.5     # Seconds over which the reported cycles/s is measured
+
+# error is None, or the message of the ValueError that stopped the run
+Snapshot = namedtuple("Snapshot", "cycle state load_shift_mode rate final error")
+
+
+def _post(snapshots, snapshot):
+    """Puts without blocking; when the queue is full the oldest snapshot makes room."""
+    while True:
+        try:
+            snapshots.put_nowait(snapshot)
+            return
+        except queue.Full:
+            try:
+                snapshots.get_nowait()
+            except queue.Empty:
+                pass
+
+
+def _run(engine, frequency, snapshots, stop, lock):
+    """Worker loop shared by both backends: paced batches of engine.step(), one snapshot per batch."""
+    last = rate_start = time.perf_counter()
+    carry = 0.0
+    rate = 0.0
+    rate_cycles = 0
+    error = None
+    while not stop.is_set():
+        time.sleep(TICK)
+        now = time.perf_counter()
+        due = min(now - last, MAX_LAG) * frequency + carry
+        cycles = int(due)
+        carry = due - cycles
+        last = now
+        with lock:
+            try:
+                if cycles:
+                    engine.step(cycles)
+            except ValueError as e:  # Bad characters further down an ASCII input file
+                error = str(e)
+            snapshot = (engine.cycle, engine.state, getattr(engine, "load_shift_mode", None))
+        rate_cycles += cycles
+        if now - rate_start >= RATE_INTERVAL:
+            rate = rate_cycles / (now - rate_start)
+            rate_start = now
+            rate_cycles = 0
+        if error is not None:
+            break
+        _post(snapshots, Snapshot(*snapshot, rate, False, None))
+    with lock:
+        snapshot = (engine.cycle, engine.state, getattr(engine, "load_shift_mode", None))
+    _post(snapshots, Snapshot(*snapshot, rate, True, error))
+
+
+def _process_main(engine, frequency, snapshots, stop):
+    _run(engine, frequency, snapshots, stop, threading.Lock())
+
+
+class SimulationWorker:
+    """Runs an engine in the background until stop(); poll latest() from the Tk thread."""
+
+    def __init__(self, engine, frequency, backend="thread", lock=None):
+        self.engine = engine
+        self.backend = backend
+        self.lock = lock if lock is not None else threading.Lock()
+        self.final = None
+        if backend == "thread":
+            self.stop_event = threading.Event()
+            self.snapshots = queue.Queue(QUEUE_SIZE)
+            self.runner = threading.Thread(target=_run, daemon=True,
+                                           args=(engine, frequency, self.snapshots, self.stop_event, self.lock))
+        elif backend == "process":
+            clone = copy.copy(engine)
+            clone.recorder = clone.history = clone.input_source = None
+            context = multiprocessing.get_context("spawn")  # No fork of the Tk process
+            self.stop_event = context.Event()
+            self.snapshots = context.Queue(QUEUE_SIZE)
+            self.runner = context.Process(target=_process_main, daemon=True,
+                                          args=(clone, frequency, self.snapshots, self.stop_event))
+        else:
+            raise ValueError(f"Unknown backend: {backend!r}")
+        self.runner.start()
+
+    @staticmethod
+    def can_fork(engine):
+        """Whether the process backend can run this engine: its serial input is not an open stream."""
+        source = engine.input_source
+        return source is None or source.peek() is None
+
+    def latest(self):
+        """Newest snapshot posted since the last call, or None; stale ones are dropped."""
+        snapshot = None
+        while True:
+            try:
+                snapshot = self.snapshots.get_nowait()
+            except queue.Empty:
+                break
+        if snapshot is not None and snapshot.final:
+            self.final = snapshot
+        return snapshot
+
+    @property
+    def finished(self):
+        """The run ended on its own: a ValueError from the engine, or a worker that died."""
+        return self.final is not None or not self.runner.is_alive()
+
+    def stop(self):
+        """Stops the run and waits for it; returns the final snapshot."""
+        self.stop_event.set()
+        while self.final is None:
+            try:
+                snapshot = self.snapshots.get(timeout=0.1)
+            except queue.Empty:
+                if not self.runner.is_alive():
+                    break  # The worker died without a final snapshot
+                continue
+            if snapshot.final:
+                self.final = snapshot
+        self.runner.join()
+        if self.backend == "process" and self.final is not None:
+            self.apply(self.final)
+        return self.final
+
+    def apply(self, snapshot):
+        """Copies a process snapshot into the engine; the trace and history restart there."""
+        engine = self.engine
+        engine.state = snapshot.state
+        engine.cycle = snapshot.cycle
+        if snapshot.load_shift_mode is not None:
+            engine.load_shift_mode = snapshot.load_shift_mode
+        if engine.recorder is not None:
+            engine.recorder.attach(engine)
+        if engine.history is not None:
+            engine.history.attach(engine)
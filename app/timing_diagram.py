@@ -0,0 +1,152 @@
+"""
+Timing-diagram pane shown under a register window's canvas.
+
+The pane draws only the visible time window: one polyline per signal row
+(serial in, the Q outputs of the flip-flops in the viewport, serial out),
+whose coordinates are replaced on every refresh. Item count therefore
+depends on the number of rows, not on the length of the trace.
+"""
+import tkinter as tk
+
+from trace_recorder import TraceRecorder, cycles_in
+
+TIME_COLUMNS = 64       # Cycles visible at once
+COLUMN_WIDTH = 12
+ROW_HEIGHT = 24
+LABEL_WIDTH = 90
+DEFAULT_LIMIT = 1000000   # Cycles kept by the ring buffer unless the user asks otherwise...
+DEFAULT_BUDGET = 64 << 20  # ...or fewer, for wide registers, so the default ring fits in this many bytes
+
+
+class TimingDiagram:
+    """Record / Export controls plus the waveform canvas for one ShiftRegisterGUI."""
+
+    def __init__(self, view, master):
+        self.view = view
+        self.master = master
+        self.recorder = None
+        self.canvas = None
+        self.scrollbar = None
+        self.start = 0         # First cycle in the time window
+        self.follow = True     # Keep the newest cycle in view while recording
+        self.rows = []         # (label item, waveform item) per signal row
+        self.shown_labels = {}
+
+        bar = tk.Frame(master, padx=10, pady=5, bg="#DCDCDC")
+        bar.pack(fill=tk.X, padx=10, pady=(5, 0))
+        self.record_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(bar, text="Record Trace", variable=self.record_var, command=self.toggle,
+                       bg="#DCDCDC").pack(side=tk.LEFT, padx=5)
+        tk.Label(bar, text="Keep cycles:", bg="#DCDCDC").pack(side=tk.LEFT, padx=(15, 5))
+        self.limit_entry = tk.Entry(bar, width=10)
+        self.limit_entry.insert(0, str(min(DEFAULT_LIMIT, cycles_in(DEFAULT_BUDGET, view.num_bits))))
+        self.limit_entry.pack(side=tk.LEFT)
+        tk.Button(bar, text="Export...", command=self.export, bg="#A9A9A9").pack(side=tk.LEFT, padx=15)
+
+    # --- Recording ---
+    def toggle(self):
+        if self.record_var.get():
+            self.start_recording()
+        else:
+            self.view.free_run.settle()  # A worker thread may be inside a recorder call
+            self.view.engine.recorder = None
+
+    def start_recording(self):
+        try:
+            limit = int(self.limit_entry.get())
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            from tkinter import messagebox
+            messagebox.showerror("Invalid Limit", "Keep cycles must be a positive whole number.")
+            self.record_var.set(False)
+            return
+        self.view.free_run.settle()  # Attach between cycles, not in the middle of a worker's step
+        self.recorder = TraceRecorder(self.view.num_bits, limit=limit)
+        self.recorder.attach(self.view.engine)
+        self.follow = True
+        if self.canvas is None:
+            self.create_canvas()
+        self.refresh()
+
+    def export(self):
+        if self.recorder is None or not len(self.recorder):
+            from tkinter import messagebox
+            messagebox.showerror("No Trace", "Enable Record Trace and run some cycles first.")
+            return
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(parent=self.master, defaultextension=".vcd",
+                                            filetypes=[("Value Change Dump", "*.vcd"), ("CSV", "*.csv")])
+        if path:
+            self.recorder.export(path)
+
+    # --- Drawing ---
+    def create_canvas(self):
+        num_rows = self.view.visible_bits + 2
+        width = LABEL_WIDTH + TIME_COLUMNS * COLUMN_WIDTH + 20
+        self.canvas = tk.Canvas(self.master, width=width, height=num_rows * ROW_HEIGHT + 30, bg="white")
+        self.canvas.pack(padx=10, pady=(5, 0))
+        self.scrollbar = tk.Scrollbar(self.master, orient=tk.HORIZONTAL, command=self.on_scroll)
+        self.scrollbar.pack(fill=tk.X, padx=10, pady=(0, 10))
+        for r in range(num_rows):
+            y = 10 + r * ROW_HEIGHT
+            label = self.canvas.create_text(5, y + ROW_HEIGHT / 2, text="", anchor="w", font=("Arial", 9))
+            wave = self.canvas.create_line(LABEL_WIDTH, y + ROW_HEIGHT - 4, LABEL_WIDTH, y + ROW_HEIGHT - 4,
+                                           fill="#4682B4", width=2)
+            self.rows.append((label, wave))
+        self.ruler_id = self.canvas.create_text(LABEL_WIDTH, num_rows * ROW_HEIGHT + 20, text="", anchor="w",
+                                                font=("Arial", 8))
+
+    def on_scroll(self, *args):
+        """Scrollbar callback ('moveto', fraction) or ('scroll', n, 'units'/'pages')."""
+        if self.recorder is None:
+            return
+        first, total = self.recorder.first_cycle, len(self.recorder)
+        if args[0] == "moveto":
+            start = first + int(float(args[1]) * total)
+        else:
+            step = TIME_COLUMNS if args[2] == "pages" else TIME_COLUMNS // 8
+            start = self.start + int(args[1]) * step
+        self.start = max(first, min(start, self.recorder.last_cycle + 1 - TIME_COLUMNS))
+        self.follow = self.start + TIME_COLUMNS > self.recorder.last_cycle
+        self.refresh()
+
+    def set_label(self, item, text):
+        if self.shown_labels.get(item) != text:
+            self.shown_labels[item] = text
+            self.canvas.itemconfig(item, text=text)
+
+    def refresh(self):
+        """Redraws the visible time window; called from the view's repaint."""
+        if self.canvas is None or self.recorder is None:
+            return
+        recorder = self.recorder
+        stop = recorder.last_cycle + 1
+        if self.follow:
+            self.start = max(recorder.first_cycle, stop - TIME_COLUMNS)
+        self.start = max(self.start, recorder.first_cycle)
+        stop = min(stop, self.start + TIME_COLUMNS)
+        window = list(recorder.rows(self.start, stop))
+
+        first_bit = self.view.view_offset
+        signals = [("Serial In", lambda row: row[2])]
+        for slot in range(self.view.visible_bits):
+            bit = first_bit + slot
+            signals.append((f"Q{bit + 1}", lambda row, bit=bit: (row[1] >> bit) & 1))
+        signals.append(("Serial Out", lambda row: row[3]))
+
+        for r, ((name, value_of), (label, wave)) in enumerate(zip(signals, self.rows)):
+            self.set_label(label, name)
+            y_low = 10 + r * ROW_HEIGHT + ROW_HEIGHT - 4
+            points = []
+            for k, row in enumerate(window):
+                y = y_low - value_of(row) * (ROW_HEIGHT - 8)
+                x = LABEL_WIDTH + k * COLUMN_WIDTH
+                points.extend((x, y, x + COLUMN_WIDTH, y))
+            if len(points) < 4:
+                points = [LABEL_WIDTH, y_low, LABEL_WIDTH, y_low]
+            self.canvas.coords(wave, *points)
+
+        self.set_label(self.ruler_id, f"cycles {self.start}..{stop - 1} of {recorder.first_cycle}..{recorder.last_cycle}")
+        total = max(1, len(recorder))
+        self.scrollbar.set((self.start - recorder.first_cycle) / total, (stop - recorder.first_cycle) / total)
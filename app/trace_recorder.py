@@ -0,0 +1,176 @@
+"""
+Waveform trace recorder.
+
+Each recorded cycle is one bit-packed row: the Q vector in the low num_bits
+bits, then serial in and serial out, stored little-endian in
+ceil((num_bits + 2) / 8) bytes. Rows live in bytearray chunks of about
+CHUNK_BYTES each (so a chunk of a 1M-bit register holds a handful of cycles,
+and one of a 4-bit register a million), and an optional ring limit drops the
+oldest chunks, so a 10^7-cycle trace costs about num_bits / 8 bytes per
+cycle. VCD and CSV exports stream row by row.
+
+Attach a recorder to an engine with recorder.attach(engine); the engine
+then reports every cycle it runs, including multi-cycle step() calls.
+"""
+from collections import deque
+
+CHUNK_BYTES = 1 << 20   # Size of each preallocated chunk of rows
+
+
+def row_bytes(num_bits):
+    """Bytes per recorded cycle: the Q vector plus serial in and serial out."""
+    return (num_bits + 2 + 7) // 8
+
+
+def cycles_in(budget, num_bits):
+    """How many cycles of a num_bits-wide trace fit in budget bytes (at least 1)."""
+    return max(1, budget // row_bytes(num_bits))
+
+
+class TraceRecorder:
+    """
+    Chunked, optionally bounded record of (Q vector, serial in, serial out)
+    per cycle. Cycle numbers are absolute engine cycles.
+    """
+    def __init__(self, num_bits, limit=None, chunk_cycles=None):
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be at least 1 cycle")
+        self.num_bits = num_bits
+        self.limit = limit
+        self.row_bytes = row_bytes(num_bits)
+        if chunk_cycles is None:
+            chunk_cycles = cycles_in(CHUNK_BYTES, num_bits)
+            if limit is not None:
+                chunk_cycles = min(chunk_cycles, limit)  # A short ring needs no bigger chunk
+        self.chunk_cycles = chunk_cycles
+        self.chunks = deque()
+        self.fill = chunk_cycles  # Rows used in the newest chunk (full: next record opens a chunk)
+        self.first_cycle = 0      # Cycle of the oldest retained row
+        self.count = 0            # Retained rows
+
+    # --- Recording ---
+    def attach(self, engine):
+        """Starts recording engine, with its current state as the first row."""
+        self.clear(engine.cycle)
+        engine.recorder = self
+        self.record(engine.state, 0, engine.serial_out)
+
+    def clear(self, first_cycle=0):
+        self.chunks.clear()
+        self.fill = self.chunk_cycles
+        self.first_cycle = first_cycle
+        self.count = 0
+
+    @property
+    def last_cycle(self):
+        """Cycle of the newest row (first_cycle - 1 when empty)."""
+        return self.first_cycle + self.count - 1
+
+    def record(self, state, serial_in, serial_out):
+        """Appends one cycle."""
+        if self.fill == self.chunk_cycles:
+            self.chunks.append(bytearray(self.chunk_cycles * self.row_bytes))
+            self.fill = 0
+        row = state | (serial_in << self.num_bits) | (serial_out << (self.num_bits + 1))
+        start = self.fill * self.row_bytes
+        self.chunks[-1][start:start + self.row_bytes] = row.to_bytes(self.row_bytes, "little")
+        self.fill += 1
+        self.count += 1
+        if self.limit is not None and self.count - self.chunk_cycles >= self.limit:
+            # The oldest chunk is no longer needed to keep `limit` cycles
+            self.chunks.popleft()
+            self.first_cycle += self.chunk_cycles
+            self.count -= self.chunk_cycles
+
+    def record_shift(self, old_state, n, chunk):
+        """Appends the n cycles of a multi-cycle shift of chunk (first bit as MSB) into old_state."""
+        top = self.num_bits - 1
+        mask = (1 << self.num_bits) - 1
+        for k in range(1, n + 1):
+            incoming = chunk >> (n - k)
+            state = ((old_state << k) | incoming) & mask
+            self.record(state, incoming & 1, (state >> top) & 1)
+
+    def record_repeat(self, state, n, serial_in=0):
+        """Appends n cycles that all end in the same state (loads)."""
+        serial_out = (state >> (self.num_bits - 1)) & 1
+        for _ in range(n):
+            self.record(state, serial_in, serial_out)
+
+    def rewind(self, engine):
+        """
+        Drops the rows after engine.cycle once history.History has seeked the
+        engine; a seek outside the retained rows restarts the trace there.
+        """
+        count = engine.cycle - self.first_cycle + 1
+        if not 0 < count <= self.count:
+            self.clear(engine.cycle)
+            self.record(engine.state, 0, engine.serial_out)
+            return
+        kept_chunks = (count + self.chunk_cycles - 1) // self.chunk_cycles
+        while len(self.chunks) > kept_chunks:
+            self.chunks.pop()
+        self.fill = count - (kept_chunks - 1) * self.chunk_cycles
+        self.count = count
+
+    # --- Reading ---
+    def __len__(self):
+        return self.count
+
+    def row(self, cycle):
+        """Returns (Q state, serial in, serial out) recorded for cycle."""
+        index = cycle - self.first_cycle
+        if not 0 <= index < self.count:
+            raise IndexError(f"cycle {cycle} is not in the trace ({self.first_cycle}..{self.last_cycle})")
+        chunk, offset = divmod(index, self.chunk_cycles)
+        start = offset * self.row_bytes
+        row = int.from_bytes(self.chunks[chunk][start:start + self.row_bytes], "little")
+        return row & ((1 << self.num_bits) - 1), (row >> self.num_bits) & 1, (row >> (self.num_bits + 1)) & 1
+
+    def rows(self, start=None, stop=None):
+        """Yields (cycle, Q state, serial in, serial out) for start <= cycle < stop."""
+        start = self.first_cycle if start is None else max(start, self.first_cycle)
+        stop = self.last_cycle + 1 if stop is None else min(stop, self.last_cycle + 1)
+        for cycle in range(start, stop):
+            yield (cycle,) + self.row(cycle)
+
+    def bit_series(self, bit, start, stop):
+        """Values of Q(bit+1) for start <= cycle < stop, for timing-diagram rows."""
+        return [(state >> bit) & 1 for _, state, _, _ in self.rows(start, stop)]
+
+    # --- Export ---
+    def export_vcd(self, out, timescale="1 ns", module="shift_register", start=None, stop=None):
+        """Streams the trace to a text file object as VCD, one timestep per cycle, changes only."""
+        w = self.num_bits
+        out.write(f"$timescale {timescale} $end\n$scope module {module} $end\n")
+        out.write(f"$var wire {w} ! Q [{w}:1] $end\n")
+        out.write("$var wire 1 \" serial_in $end\n$var wire 1 # serial_out $end\n")
+        out.write("$upscope $end\n$enddefinitions $end\n")
+        previous = None
+        for cycle, state, serial_in, serial_out in self.rows(start, stop):
+            current = (state, serial_in, serial_out)
+            if current == previous:
+                continue
+            out.write(f"#{cycle}\n")
+            if previous is None or state != previous[0]:
+                out.write(f"b{state:0{w}b} !\n")
+            if previous is None or serial_in != previous[1]:
+                out.write(f"{serial_in}\"\n")
+            if previous is None or serial_out != previous[2]:
+                out.write(f"{serial_out}#\n")
+            previous = current
+
+    def export_csv(self, out, start=None, stop=None):
+        """Streams the trace as CSV; q is written Q1 first, like the GUI's bit-string inputs."""
+        out.write("cycle,q,serial_in,serial_out\n")
+        w = self.num_bits
+        for cycle, state, serial_in, serial_out in self.rows(start, stop):
+            out.write(f"{cycle},{format(state, f'0{w}b')[::-1]},{serial_in},{serial_out}\n")
+
+    def export(self, path, **kwargs):
+        """Writes VCD or CSV depending on the file extension."""
+        with open(path, "w", newline="") as out:
+            if path.lower().endswith(".csv"):
+                self.export_csv(out, **kwargs)
+            else:
+                self.export_vcd(out, **kwargs)
@@ -0,0 +1,290 @@
+"""
+Headless test-vector runner.
+
+Runs vector files through the SISO/SIPO/PISO/PIPO engines and compares the
+results with the expected values, without importing Tkinter:
+
+    python app/vector_runner.py vectors/ more.csv -j 8
+
+Files are spread over a ProcessPoolExecutor, one task per file, and results
+are printed as each file finishes, followed by a vectors/s summary. The exit
+status is 1 when any vector fails or any file cannot be read.
+
+A vector has these fields (CSV columns, or keys of JSON objects):
+
+    type          SISO, SIPO, PISO, PIPO or UNIVERSAL
+    width         number of flip-flops (default: length of parallel/initial/expected_q)
+    initial       register contents before the first clock, Q1 first (default all 0)
+    parallel      parallel input, Q1 first (PISO/PIPO)
+    mode          PISO starting mode, Load or Shift (default Load), or a
+                  universal mode such as Rotate Left or Galois LFSR
+    taps          universal LFSR taps as flip-flop numbers, e.g. 16 14 13 11
+    serial        serial input bit per clock, first clock first
+    serial_in     bit used once serial runs out (default 0)
+    clocks        number of clock cycles (default len(serial), at least 1)
+    expected_q    register contents after the clocks, Q1 first
+    expected_out  serial out (Qn) after each clock, first clock first
+
+Bit strings are '0'/'1' like the GUI inputs; expected values may use 'x' for
+don't-care bits. A JSON file holds a list of vectors, or an object with a
+"vectors" list whose other keys are defaults for every vector.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from register_engine import ENGINE_TYPES, UNIVERSAL_MODES, create_engine, list_to_state
+
+VECTOR_SUFFIXES = (".csv", ".json")
+
+FileResult = namedtuple("FileResult", "path vectors failures error")
+
+
+class SerialOutProbe:
+    """
+    Engine recorder that keeps Qn after every cycle, packed first cycle as
+    MSB; it uses the same record_shift/record_repeat hooks as TraceRecorder,
+    so multi-cycle steps stay one shift.
+    """
+    def __init__(self, num_bits):
+        self.top = num_bits - 1
+        self.value = 0
+        self.count = 0
+
+    def record_shift(self, old_state, n, chunk):
+        full = (old_state << n) | chunk
+        self.value = (self.value << n) | ((full >> self.top) & ((1 << n) - 1))
+        self.count += n
+
+    def record(self, state, serial_in, serial_out):
+        self.value = (self.value << 1) | serial_out
+        self.count += 1
+
+    def record_repeat(self, state, n, serial_in=0):
+        bits = (1 << n) - 1 if (state >> self.top) & 1 else 0
+        self.value = (self.value << n) | bits
+        self.count += n
+
+    def bits(self):
+        return format(self.value, f"0{self.count}b") if self.count else ""
+
+
+# --- 1. PARSING ---
+def _bit_string(value, field, allow_dont_care=False):
+    text = "" if value is None else str(value).strip()
+    allowed = "01xX" if allow_dont_care else "01"
+    if text.strip(allowed):
+        raise ValueError(f"{field} must contain only {'0, 1 and x' if allow_dont_care else '0s and 1s'}")
+    return text
+
+
+def _int_field(value, field, default):
+    if value is None or str(value).strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{field} must be a whole number") from None
+
+
+def load_vectors(path):
+    """Reads the vectors of a .csv or .json file as a list of dicts (empty fields become None)."""
+    if path.lower().endswith(".json"):
+        with open(path) as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            defaults = {k: v for k, v in data.items() if k != "vectors"}
+            return [{**defaults, **vector} for vector in data.get("vectors", [])]
+        return list(data)
+    with open(path, newline="") as f:
+        return [{k.strip(): (v if v is None or v.strip() else None) for k, v in row.items() if k}
+                for row in csv.DictReader(f)]
+
+
+# --- 2. RUNNING ---
+def _matches(expected, actual):
+    return len(expected) == len(actual) and all(e in "xX" or e == a for e, a in zip(expected, actual))
+
+
+def build_engine(vector):
+    """
+    Parses a vector. Returns (engine, serial, clocks, expected_q, expected_out)
+    with the engine set up for the first clock.
+    """
+    kind = str(vector.get("type") or "").upper()
+    if kind not in ENGINE_TYPES:
+        raise ValueError(f"type must be one of {', '.join(ENGINE_TYPES)}")
+    initial = _bit_string(vector.get("initial"), "initial")
+    parallel = _bit_string(vector.get("parallel"), "parallel")
+    serial = _bit_string(vector.get("serial"), "serial")
+    expected_q = _bit_string(vector.get("expected_q"), "expected_q", allow_dont_care=True)
+    expected_out = _bit_string(vector.get("expected_out"), "expected_out", allow_dont_care=True)
+    width = _int_field(vector.get("width"), "width", len(parallel) or len(initial) or len(expected_q))
+    clocks = _int_field(vector.get("clocks"), "clocks", max(1, len(serial)))
+    if width < 1:
+        raise ValueError("width is missing")
+    for name, bits in (("initial", initial), ("parallel", parallel)):
+        if len(bits) > width:
+            raise ValueError(f"{name} has {len(bits)} bits for a {width}-bit register")
+
+    engine = create_engine(kind, width)
+    engine.state = list_to_state(initial)
+    engine.serial_in = _int_field(vector.get("serial_in"), "serial_in", 0) & 1
+    if hasattr(engine, "parallel_in"):
+        engine.parallel_in = list_to_state(parallel)
+    if hasattr(engine, "load_shift_mode"):
+        set_mode(engine, vector.get("mode") or "Load")
+    if hasattr(engine, "mode"):
+        set_mode(engine, vector.get("mode") or UNIVERSAL_MODES[0])
+        if vector.get("taps"):
+            set_taps(engine, vector["taps"])
+    return engine, serial, clocks, expected_q, expected_out
+
+
+def parse_mode(engine, mode):
+    """PISO's Load/Shift mode or a universal mode from its name in any case, spelled as the engine expects."""
+    if hasattr(engine, "load_shift_mode"):
+        mode = str(mode).capitalize()
+        if mode not in ("Load", "Shift"):
+            raise ValueError("mode must be Load or Shift")
+        return mode
+    if hasattr(engine, "mode"):
+        modes = {m.lower(): m for m in UNIVERSAL_MODES}
+        mode = str(mode).lower()
+        if mode not in modes:
+            raise ValueError(f"mode must be one of {', '.join(UNIVERSAL_MODES)}")
+        return modes[mode]
+    raise ValueError(f"{engine.kind} registers have no mode")
+
+
+def set_mode(engine, mode):
+    """Sets PISO's Load/Shift mode or a universal mode from its name, in any case."""
+    mode = parse_mode(engine, mode)
+    if hasattr(engine, "load_shift_mode"):
+        engine.load_shift_mode = mode
+    else:
+        engine.mode = mode
+
+
+def parse_taps(engine, taps):
+    """Universal LFSR taps from a list or a string such as '16 14 13 11' or '16,14,13,11'."""
+    if not hasattr(engine, "set_taps"):
+        raise ValueError(f"{engine.kind} registers have no taps")
+    try:
+        taps = [int(t) for t in (taps if isinstance(taps, list) else str(taps).replace(",", " ").split())]
+    except (TypeError, ValueError):
+        raise ValueError("taps must be flip-flop numbers") from None
+    if not taps or min(taps) < 1 or max(taps) > engine.num_bits:
+        raise ValueError(f"Taps must be flip-flop numbers from 1 to {engine.num_bits}.")
+    return taps
+
+
+def set_taps(engine, taps):
+    """Sets universal LFSR taps from a list or a string such as '16 14 13 11' or '16,14,13,11'."""
+    engine.set_taps(parse_taps(engine, taps))
+
+
+def run_vector(vector):
+    """Runs one vector; returns None on success or a message describing the mismatch."""
+    engine, serial, clocks, expected_q, expected_out = build_engine(vector)
+    probe = SerialOutProbe(engine.num_bits) if expected_out else None
+    engine.recorder = probe
+    engine.step(clocks, input_bits=serial or None)
+
+    problems = []
+    if expected_q:
+        actual = "".join(str(b) for b in engine.bits)
+        if not _matches(expected_q, actual):
+            problems.append(f"Q expected {expected_q}, got {actual}")
+    if probe is not None and not _matches(expected_out, probe.bits()):
+        problems.append(f"serial out expected {expected_out}, got {probe.bits()}")
+    return "; ".join(problems) or None
+
+
+def run_file(path):
+    """Runs every vector of one file. Worker entry point, so it never raises."""
+    try:
+        vectors = load_vectors(path)
+    except (OSError, ValueError, csv.Error) as e:
+        return FileResult(path, 0, [], str(e))
+    except Exception as e:  # Anything else escaping here would abort the whole pool run
+        return FileResult(path, 0, [], f"{type(e).__name__}: {e}")
+    failures = []
+    for index, vector in enumerate(vectors, 1):
+        label = (vector.get("name") if isinstance(vector, dict) else None) or f"vector {index}"
+        try:
+            message = run_vector(vector)
+        except (ValueError, TypeError, AttributeError) as e:
+            message = f"invalid vector: {e}"
+        except Exception as e:
+            message = f"invalid vector: {type(e).__name__}: {e}"
+        if message:
+            failures.append(f"{label}: {message}")
+    return FileResult(path, len(vectors), failures, None)
+
+
+def iter_vector_files(paths):
+    """Expands directories into the .csv/.json files below them, in sorted order."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(VECTOR_SUFFIXES):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def run_files(paths, jobs=None):
+    """Yields a FileResult per file as soon as it finishes; jobs=1 runs in this process."""
+    paths = list(paths)
+    if jobs == 1 or len(paths) <= 1:
+        for path in paths:
+            yield run_file(path)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(run_file, path) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+# --- 3. COMMAND LINE ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run shift register test vectors without the GUI.")
+    parser.add_argument("paths", nargs="+", help="vector files (.csv/.json) or directories holding them")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print failures and the summary")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    files = vectors = failed = broken = 0
+    for result in run_files(iter_vector_files(args.paths), args.jobs):
+        files += 1
+        vectors += result.vectors
+        if result.error:
+            broken += 1
+            print(f"ERROR {result.path}: {result.error}")
+            continue
+        failed += len(result.failures)
+        if result.failures:
+            print(f"FAIL  {result.path}: {len(result.failures)} of {result.vectors} vectors")
+            for message in result.failures:
+                print(f"      {message}")
+        elif not args.quiet:
+            print(f"ok    {result.path}: {result.vectors} vectors")
+        sys.stdout.flush()
+    elapsed = time.perf_counter() - start
+    rate = vectors / elapsed if elapsed > 0 else 0.0
+    print(f"{files} files, {vectors} vectors, {failed} failed, {broken} unreadable "
+          f"in {elapsed:.2f} s ({rate:,.0f} vectors/s)")
+    return 1 if failed or broken else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
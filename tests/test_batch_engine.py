@@ -0,0 +1,61 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from batch_engine import INPUT_SLAB_BYTES, create_batch_engine
+from register_engine import create_engine, state_to_list
+
+
+@pytest.mark.parametrize("width", [1, 7, 63, 64, 65, 200])
+@pytest.mark.parametrize("kind", ["SISO", "SIPO", "PISO", "PIPO"])
+def test_batch_matches_scalar_engines(kind, width):
+    rng = np.random.default_rng(width)
+    count = 6
+    batch = create_batch_engine(kind, count, width)
+    initial = rng.integers(0, 2, (count, width))
+    parallel = rng.integers(0, 2, (count, width))
+    batch.bits = initial
+    batch.serial_in = rng.integers(0, 2, count).astype(np.uint8)
+    if hasattr(batch, "set_parallel_bits"):
+        batch.set_parallel_bits(parallel)
+    if kind == "PISO":
+        batch.loading = rng.integers(0, 2, count).astype(bool)
+
+    engines = []
+    for r in range(count):
+        engine = create_engine(kind, width)
+        engine.bits = list(initial[r])
+        engine.serial_in = int(batch.serial_in[r])
+        if hasattr(engine, "parallel_in"):
+            engine.parallel_in = int("".join(map(str, parallel[r][::-1])), 2)
+        if kind == "PISO":
+            engine.load_shift_mode = "Load" if batch.loading[r] else "Shift"
+        engines.append(engine)
+
+    for n, with_inputs in ((1, True), (150, True), (70, False), (3, True)):
+        inputs = rng.integers(0, 2, (n, count)).astype(np.uint8) if with_inputs else None
+        outputs = batch.step(n, inputs, collect_output=True)
+        for r, engine in enumerate(engines):
+            column = [] if inputs is None else inputs[:, r]
+            for cycle in range(n):
+                # The batch reports the bit leaving Qn on each clock; a PISO load shifts nothing out
+                leaving = engine.serial_out if getattr(engine, "load_shift_mode", "Shift") == "Shift" else 0
+                engine.step(1, str(column[cycle]) if with_inputs else None)
+                if kind != "PIPO":
+                    assert outputs[cycle, r] == leaving, (n, r, cycle)
+            assert batch.register_bits(r) == state_to_list(engine.state, width), (n, r)
+    assert batch.cycle == engines[0].cycle
+
+
+def test_input_packing_memory_is_bounded():
+    count, cycles = 4000, 16000
+    batch = create_batch_engine("SISO", count, 64)
+    inputs = np.random.default_rng(0).integers(0, 2, (cycles, count), dtype=np.uint8)
+    tracemalloc.start()
+    try:
+        batch.step(cycles, inputs)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak <= 4 * INPUT_SLAB_BYTES < inputs.nbytes
@@ -0,0 +1,58 @@
+from control_server import MAX_CYCLES, MAX_WIDTH, ControlServer, Connection
+
+
+def serve():
+    return ControlServer(), Connection(writer=None)
+
+
+def test_oversized_requests_are_refused_quickly():
+    server, conn = serve()
+    assert "limited" in server.execute(conn, {"op": "create", "type": "SISO", "width": MAX_WIDTH + 1})["error"]
+    server.execute(conn, {"op": "create", "type": "SISO", "width": 8})
+    reply = server.execute(conn, {"op": "clock", "reg": "r1", "n": MAX_CYCLES + 1})
+    assert not reply["ok"] and "limited" in reply["error"]
+    server.execute(conn, {"op": "create", "type": "UNIVERSAL", "width": 1000, "mode": "Galois LFSR", "taps": "1000 3"})
+    assert not server.execute(conn, {"op": "clock", "reg": "r2", "n": 2001})["ok"]
+    assert server.execute(conn, {"op": "clock", "reg": "r2", "n": 2000})["cycle"] == 2000
+
+
+def test_unexpected_errors_become_error_replies(monkeypatch):
+    server, conn = serve()
+    server.execute(conn, {"op": "create", "type": "SISO", "width": 8})
+
+    def broken(*args):
+        raise KeyError("boom")
+    monkeypatch.setattr(server.registers["r1"].engine, "step", broken)
+    reply = server.execute(conn, {"id": 7, "op": "clock", "reg": "r1"})
+    assert reply == {"id": 7, "ok": False, "error": "KeyError: 'boom'"}
+
+
+def test_failed_load_changes_nothing():
+    server, conn = serve()
+    server.execute(conn, {"op": "create", "type": "UNIVERSAL", "width": 8})
+    server.execute(conn, {"op": "watch", "reg": "r1"})
+    events = []
+    conn.push = events.append
+    reply = server.execute(conn, {"op": "load", "reg": "r1", "q": "1111", "taps": "9"})
+    assert not reply["ok"]
+    assert server.execute(conn, {"op": "read", "reg": "r1"})["q"] == "00000000"
+    assert events == []
+    reply = server.execute(conn, {"op": "load", "reg": "r1", "q": "1111", "mode": "galois lfsr", "taps": "8,6"})
+    assert reply["ok"] and [e["event"] for e in events] == ["load"]
+    assert server.registers["r1"].engine.mode == "Galois LFSR" and server.registers["r1"].engine.taps == (8, 6)
+
+
+def test_piso_mode_loads_survive_a_seek():
+    from history import History
+    server, conn = serve()
+    server.execute(conn, {"op": "create", "type": "PISO", "width": 4, "parallel": "1010"})
+    engine = server.registers["r1"].engine
+    History(interval=4).attach(engine)
+    server.execute(conn, {"op": "clock", "reg": "r1", "n": 3})
+    server.execute(conn, {"op": "load", "reg": "r1", "mode": "load"})
+    server.execute(conn, {"op": "clock", "reg": "r1", "n": 1})
+    engine.history.seek(3)
+    assert engine.load_shift_mode == "Load"
+    server.execute(conn, {"op": "load", "reg": "r1", "mode": "shift", "reset": True})
+    engine.history.seek(engine.history.base)
+    assert engine.load_shift_mode == "Shift" and engine.cycle == 0
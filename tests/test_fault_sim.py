@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from fault_sim import Fault, enumerate_faults, main, prepare_vectors, run_campaign
+from register_engine import state_to_list
+
+
+def naive_detects(kind, width, stimulus, good, fault, flip_cycle):
+    """One faulty machine, one flip-flop at a time, straight from the fault model in fault_sim's docstring."""
+    def pin(site, value):
+        if fault.site == site and fault.kind != "flip":
+            return int(fault.kind == "sa1")
+        return value
+
+    q = [pin(f"Q{i + 1}", b) for i, b in enumerate(state_to_list(stimulus.initial, width))]
+    p = [pin(f"P{i + 1}", b) for i, b in enumerate(state_to_list(stimulus.parallel, width))]
+    mode = stimulus.mode
+    for cycle, (bit, expected) in enumerate(zip(stimulus.serial, good), 1):
+        if kind == "PIPO" or mode == "Load":
+            d = list(p)
+            if mode is not None:
+                mode = "Shift"
+        else:
+            d = [pin("SI", bit) if kind == "PISO" else bit] + q[:-1]
+        q = [pin(f"Q{i + 1}", pin(f"D{i + 1}", b)) for i, b in enumerate(d)]
+        if cycle == flip_cycle and fault.kind == "flip":
+            q[int(fault.site[1:]) - 1] ^= 1
+        if kind in ("SISO", "PISO"):
+            if pin("SO", q[-1]) != expected:
+                return True
+        elif q != state_to_list(expected, width):
+            return True
+    return False
+
+
+@pytest.mark.parametrize("kind", ["SISO", "SIPO", "PISO", "PIPO"])
+def test_campaign_matches_naive_simulation(kind):
+    rng = random.Random(kind)
+    width = 5
+    vectors = []
+    for _ in range(6):
+        vectors.append({"type": kind, "width": width,
+                        "initial": "".join(rng.choice("01") for _ in range(width)),
+                        "parallel": "".join(rng.choice("01") for _ in range(width)),
+                        "mode": rng.choice(("Load", "Shift")),
+                        "serial": "".join(rng.choice("01") for _ in range(rng.randint(1, 12)))})
+    _, _, stimuli, good = prepare_vectors(vectors)
+    flip_cycle = 2
+    for stimulus, observed in zip(stimuli, good):
+        assert not naive_detects(kind, width, stimulus, observed, Fault("none", "sa0"), flip_cycle)
+    report = run_campaign(vectors, flip_cycle=flip_cycle, jobs=1, chunk_faults=64)
+    assert [fault for fault, _ in report] == enumerate_faults(kind, width)
+    for fault, hits in report:
+        expected = [index for index, (stimulus, observed) in enumerate(zip(stimuli, good), 1)
+                    if naive_detects(kind, width, stimulus, observed, fault, flip_cycle)]
+        assert hits == expected, fault
+
+
+@pytest.mark.parametrize("content", [None, "[1, 2]", "{not json", "type,width\nSISO,x\n"])
+def test_unreadable_vector_files_are_reported(tmp_path, capsys, content):
+    path = tmp_path / ("vectors.csv" if content and content.startswith("type") else "vectors.json")
+    if content is not None:
+        path.write_text(content)
+    assert main([str(path)]) == 2
+    assert capsys.readouterr().out.startswith("error: ")
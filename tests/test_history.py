@@ -0,0 +1,96 @@
+import random
+
+import pytest
+
+from history import History
+from register_engine import create_engine
+
+
+def run_and_record(engine, steps, seed):
+    """Steps engine with random batch sizes and inputs; returns the state after every cycle."""
+    rng = random.Random(seed)
+    states = {engine.cycle: engine.state}
+    for _ in range(steps):
+        n = rng.choice((1, 1, 3, 17, 100, 700))
+        if hasattr(engine, "parallel_in") and rng.random() < 0.2:
+            engine.parallel_in = rng.getrandbits(engine.num_bits)
+            if hasattr(engine, "load_shift_mode"):
+                engine.load_shift_mode = "Load"
+        if hasattr(engine, "mode") and rng.random() < 0.2:
+            engine.mode = rng.choice(("Shift Right", "Shift Left", "Rotate Left", "Galois LFSR", "Parallel Load"))
+        bits = "".join(rng.choice("01") for _ in range(n))
+        for bit in bits:  # One cycle at a time, so every intermediate state is known
+            engine.step(1, bit)
+            states[engine.cycle] = engine.state
+    return states
+
+
+@pytest.mark.parametrize("kind", ["SISO", "PISO", "PIPO", "UNIVERSAL"])
+def test_seek_matches_recorded_states(kind):
+    engine = create_engine(kind, 12)
+    history = History(interval=64)
+    history.attach(engine)
+    states = run_and_record(engine, 60, seed=kind)
+    for cycle in random.Random(1).sample(sorted(states), 200):
+        history.seek(cycle)
+        assert engine.state == states[cycle], cycle
+
+
+def test_seek_after_batched_steps():
+    engine = create_engine("SISO", 8)
+    history = History(interval=16)
+    history.attach(engine)
+    reference = create_engine("SISO", 8)
+    states = {0: 0}
+    rng = random.Random(5)
+    for _ in range(50):
+        n = rng.randint(1, 40)
+        bits = "".join(rng.choice("01") for _ in range(n))
+        engine.step(n, bits)
+        for bit in bits:
+            reference.step(1, bit)
+            states[reference.cycle] = reference.state
+    for cycle in range(0, engine.cycle + 1, 7):
+        history.seek(cycle)
+        assert engine.state == states[cycle]
+
+
+def test_window_is_bounded_and_still_seekable():
+    engine = create_engine("SISO", 4)
+    history = History(interval=32, limit=1000)
+    history.attach(engine)
+    states = run_and_record(engine, 400, seed=2)
+    assert engine.cycle > 10 * history.limit
+    assert len(history) <= history.limit + max(history.interval, history.limit // 8)
+    assert len(history.checkpoints) <= len(history) // history.interval + 1
+    for cycle in range(history.base, history.head + 1, 13):
+        history.seek(cycle)
+        assert engine.state == states[cycle]
+    with pytest.raises(ValueError):
+        history.seek(history.base - 1)
+
+
+def test_step_longer_than_the_window_keeps_only_its_end():
+    engine = create_engine("SISO", 8)
+    history = History(interval=16, limit=100)
+    history.attach(engine)
+    engine.step(10_000_000, 0b1011)
+    assert history.head - history.base == 100
+    assert len(history.log) <= 100 // 8 + 1
+    # The packed input is 0 except for its last four cycles, which shift in 1, 0, 1, 1
+    history.seek(history.base)
+    assert engine.state == 0 and engine.cycle == history.base
+    history.seek(history.head - 2)
+    assert engine.state == 0b10
+    history.seek(history.head)
+    assert engine.state == 0b1011
+
+
+def test_default_budget_scales_interval_with_width():
+    narrow, wide = create_engine("SISO", 4), create_engine("SISO", 1 << 20)
+    History(budget=1 << 20).attach(narrow)
+    History(budget=1 << 20).attach(wide)
+    assert narrow.history.interval == 1024
+    assert wide.history.interval == 1 << 20
+    wide_bytes = (wide.history.limit / wide.history.interval) * (1 << 17)
+    assert wide_bytes <= 1 << 20
@@ -0,0 +1,50 @@
+from netlist import Netlist, cascade
+
+
+def test_set_parallel_in_without_wires():
+    netlist = Netlist()
+    netlist.add("P", "PIPO", 4)
+    netlist.set_parallel_in("P", 0b1011)
+    netlist.tick()
+    assert netlist["P"].state == 0b1011
+
+
+def test_set_parallel_in_keeps_bits_no_wire_drives():
+    netlist = Netlist()
+    netlist.add("A", "PIPO", 2)
+    netlist.add("B", "PIPO", 4)
+    netlist.connect_parallel("A", "B", dst_lo=0, count=2)
+    netlist.set_parallel_in("A", 0b11)
+    netlist.set_parallel_in("B", 0b1000)
+    netlist.tick(n=2)
+    assert netlist["B"].state == 0b1011
+
+
+def test_idle_cascade_costs_nothing():
+    netlist = cascade("SISO", 1000)
+    assert netlist.tick(n=100) == 0
+
+
+def test_gated_register_leaves_event_list_until_enabled():
+    netlist = cascade("SISO", 100)
+    netlist.add("G", "SISO", 4)
+    netlist.connect_enable("U1", 0, "G")
+    netlist["G"].serial_in = 1
+    netlist.touch("G")
+    assert netlist.tick(n=1000) == 0  # G is gated off, so the netlist settles at once
+    assert netlist["G"].cycle == 0
+
+    netlist["U1"].serial_in = 1
+    netlist.touch("U1")
+    netlist.tick(n=2)
+    assert netlist["G"].cycle == 1  # Enabled on the second edge, after U1.Q1 rose
+    assert netlist["G"].state == 0b1
+
+
+def test_cascade_matches_one_long_register():
+    netlist = cascade("SISO", 3, num_bits=4)
+    netlist["U1"].serial_in = 1
+    netlist.touch("U1")
+    netlist.tick(n=6)
+    combined = sum(netlist[f"U{i + 1}"].state << (4 * i) for i in range(3))
+    assert combined == 0b111111
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from register_engine import UNIVERSAL_MODES, create_engine
+
+WIDTHS = (1, 5, 64, 130)
+
+
+def setup(kind, width, seed, mode=None):
+    rng = random.Random(seed)
+    engine = create_engine(kind, width)
+    engine.state = rng.getrandbits(width)
+    engine.serial_in = rng.getrandbits(1)
+    if hasattr(engine, "parallel_in"):
+        engine.parallel_in = rng.getrandbits(width)
+    if mode is not None:
+        engine.mode = mode
+        if mode.endswith("LFSR"):
+            engine.set_taps([width, max(1, width // 2)])
+    return engine
+
+
+@pytest.mark.parametrize("width", WIDTHS)
+@pytest.mark.parametrize("kind", ["SISO", "SIPO", "PISO", "PIPO"])
+def test_step_n_matches_single_steps(kind, width):
+    rng = random.Random(f"{kind}{width}")
+    batched, single = setup(kind, width, width), setup(kind, width, width)
+    for n in (1, 3, width, 2 * width + 1, 300):
+        bits = "".join(rng.choice("01") for _ in range(n - n // 3))  # Short input: serial_in fills the rest
+        out = batched.step(n, bits)
+        padded = bits + str(single.serial_in) * (n - len(bits))
+        single_out = 0
+        for bit in padded:
+            single_out = (single_out << 1) | single.step(1, bit)
+        assert (batched.state, batched.cycle) == (single.state, single.cycle), n
+        assert out == single_out, n
+
+
+@pytest.mark.parametrize("width", WIDTHS)
+@pytest.mark.parametrize("mode", UNIVERSAL_MODES)
+def test_universal_step_n_matches_single_steps(mode, width):
+    rng = random.Random(f"{mode}{width}")
+    batched, single = setup("UNIVERSAL", width, width, mode), setup("UNIVERSAL", width, width, mode)
+    for n in (1, 3, width, 2 * width + 1, 300):
+        bits = "".join(rng.choice("01") for _ in range(n - n // 3))
+        batched.step(n, bits)
+        for bit in bits + str(single.serial_in) * (n - len(bits)):
+            single.step(1, bit)
+        assert (batched.state, batched.cycle) == (single.state, single.cycle), n
+
+
+@pytest.mark.parametrize("mode", ["Fibonacci LFSR", "Galois LFSR"])
+@pytest.mark.parametrize("taps", [(16, 14, 13, 11), (7, 6), (33, 20)])
+def test_lfsr_jump_matches_stepping(mode, taps):
+    engine, reference = create_engine("UNIVERSAL", taps[0]), create_engine("UNIVERSAL", taps[0])
+    for e in (engine, reference):
+        e.mode = mode
+        e.set_taps(taps)
+        e.state = 1
+    for n in (2 * taps[0] + 1, 1000, 4097):
+        engine.jump(n)
+        for _ in range(n):
+            reference.step(1)
+        assert engine.state == reference.state and engine.cycle == reference.cycle
+
+
+def test_rotate_jump_matches_stepping():
+    engine, reference = create_engine("UNIVERSAL", 10), create_engine("UNIVERSAL", 10)
+    engine.mode = reference.mode = "Rotate Left"
+    engine.state = reference.state = 0b1100100111
+    engine.jump(12345)
+    for _ in range(12345):
+        reference.step(1)
+    assert engine.state == reference.state
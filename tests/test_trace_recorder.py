@@ -0,0 +1,23 @@
+from register_engine import create_engine
+from trace_recorder import CHUNK_BYTES, TraceRecorder
+
+
+def test_chunks_are_sized_by_bytes():
+    wide = TraceRecorder(1 << 20)
+    narrow = TraceRecorder(4)
+    assert wide.chunk_cycles * wide.row_bytes <= CHUNK_BYTES
+    assert narrow.chunk_cycles * narrow.row_bytes <= CHUNK_BYTES
+    assert wide.chunk_cycles >= 1 and narrow.chunk_cycles > 4096
+
+
+def test_ring_keeps_limit_across_small_chunks():
+    engine = create_engine("SISO", 6)
+    recorder = TraceRecorder(6, limit=50, chunk_cycles=8)
+    recorder.attach(engine)
+    reference = [engine.state]
+    for bit in "1101001110" * 20:
+        engine.step(1, bit)
+        reference.append(engine.state)
+    assert 50 <= len(recorder) < 50 + 8
+    for cycle in range(recorder.first_cycle, recorder.last_cycle + 1):
+        assert recorder.row(cycle)[0] == reference[cycle]
@@ -0,0 +1,24 @@
+import csv
+import json
+
+from vector_runner import run_file, run_files
+
+
+def test_malformed_csv_is_reported_not_raised(tmp_path):
+    path = tmp_path / "huge.csv"
+    path.write_text("type,width,serial\nSISO,4," + "1" * (csv.field_size_limit() + 10) + "\n")
+    result = run_file(str(path))
+    assert result.error and result.vectors == 0
+
+
+def test_bad_file_does_not_abort_the_pool_run(tmp_path):
+    good = tmp_path / "good.json"
+    good.write_text(json.dumps([{"type": "SISO", "width": 4, "serial": "1011", "expected_q": "1101"}]))
+    bad = tmp_path / "bad.csv"
+    bad.write_text("type,width,serial\nSISO,4," + "1" * (csv.field_size_limit() + 10) + "\n")
+    odd = tmp_path / "odd.json"
+    odd.write_text("[1, 2]")
+    results = {r.path: r for r in run_files([str(good), str(bad), str(odd)], jobs=2)}
+    assert results[str(good)].error is None and not results[str(good)].failures
+    assert results[str(bad)].error
+    assert len(results[str(odd)].failures) == 2